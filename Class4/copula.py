@@ -0,0 +1,193 @@
+"""Class 4 – Wide correlated-feature generation with a Gaussian copula.
+
+Columns are drawn as correlated standard normals (z @ L.T, where L is the
+Cholesky factor of the target correlation matrix) and then pushed through each
+column's marginal: z -> Phi(z) -> inverse CDF. Rank correlations survive the
+marginal transform, so you can ask for gamma/beta/lognormal columns with a
+given correlation structure.
+
+In a dataset spec (see dataset_spec.py) the copula is a top-level block whose
+columns are generated before the ordinary "columns":
+
+  "copula": {
+    "columns": ["f0", "f1", ...],
+    "corr": [[1, 0.6, ...], ...]          # full matrix, or
+            {"factors": 5, "seed": 0},    # random k-factor structure
+    "target": "spearman",                 # optional: corr is Spearman's rho
+    "marginals": {"f0": {"dist": "gamma", "shape": 3, "scale": 0.15}},
+    "default_marginal": {"dist": "normal", "loc": 0, "scale": 1},
+    "missing": {"f3": {"prob": 0.05}},    # optional, as for ordinary columns
+  }
+
+Besides the parametric marginals, two fitted ones come from resampler.py:
+{"dist": "empirical", "quantiles": [...]} inverts a quantile table by linear
+interpolation (optionally "round"ed, or as datetimes with "unit": "D"/"s"),
+and {"dist": "categorical", "values": [...], "p": [...]} cuts the uniform
+scale into one interval per value.
+
+Memory per chunk is chunk rows x width; the factorization is done once.
+
+Usage (writes a 1,000-column, 1M-row table through the dataset generator):
+  python Class4/copula.py --columns 1000 --rows 1000000 --format parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+
+# The Class 4 skewed marginals, cycled across wide tables by wide_copula_spec()
+DEFAULT_MARGINALS = [
+    {"dist": "normal", "loc": 0, "scale": 1},
+    {"dist": "gamma", "shape": 3, "scale": 0.15},
+    {"dist": "beta", "a": 2, "b": 5},
+    {"dist": "lognormal", "mean": 3.5, "sigma": 1.2},
+    {"dist": "exponential", "scale": 15},
+]
+
+
+def factor_correlation(k: int, factors: int, seed: int = 0, strength: float = 1.0) -> np.ndarray:
+    """Random but valid k x k correlation matrix with a `factors`-factor structure."""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, strength, (k, factors))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.2, 1.0, k))
+    d = np.sqrt(np.diag(cov))
+    return cov / np.outer(d, d)
+
+
+def nearest_correlation(corr: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """Clip negative eigenvalues and rescale to unit diagonal."""
+    values, vectors = np.linalg.eigh((corr + corr.T) / 2)
+    fixed = (vectors * np.maximum(values, eps)) @ vectors.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def _inverse_cdf(spec: Dict[str, Any], z: np.ndarray) -> np.ndarray:
+    """Map standard normals to a marginal; closed forms where they exist."""
+    dist = spec["dist"]
+    if dist == "normal":
+        return spec["loc"] + spec["scale"] * z
+    if dist == "lognormal":
+        return np.exp(spec["mean"] + spec["sigma"] * z)
+    if dist == "exponential":
+        # -scale * log(1 - Phi(z)), with 1 - Phi(z) = Phi(-z) for accuracy in the tail
+        return -spec["scale"] * special.log_ndtr(-z)
+    u = special.ndtr(z)
+    if dist == "uniform":
+        return spec["low"] + (spec["high"] - spec["low"]) * u
+    if dist == "gamma":
+        return stats.gamma.ppf(u, spec["shape"], scale=spec["scale"])
+    if dist == "beta":
+        return stats.beta.ppf(u, spec["a"], spec["b"])
+    if dist == "poisson":
+        return stats.poisson.ppf(u, spec["lam"]).astype(np.int64)
+    if dist == "empirical":
+        quantiles = np.asarray(spec["quantiles"], dtype=float)
+        values = np.interp(u, np.linspace(0, 1, len(quantiles)), quantiles)
+        if "unit" in spec:
+            return np.round(values).astype(np.int64).astype(f"datetime64[{spec['unit']}]")
+        return values.round(spec["round"]) if "round" in spec else values
+    if dist == "categorical":
+        values = spec["values"]
+        cumulative = np.cumsum(spec["p"])
+        codes = np.minimum(np.searchsorted(cumulative / cumulative[-1], u, side="right"), len(values) - 1)
+        if all(isinstance(v, str) for v in values):
+            return pd.Categorical.from_codes(codes, values)
+        return np.asarray(values)[codes]
+    raise ValueError(f"Unsupported copula marginal: {dist!r}")
+
+
+class GaussianCopula:
+    """Chunked sampler for columns with a target correlation and fixed marginals."""
+
+    def __init__(self, columns: List[str], corr: np.ndarray, marginals: List[Dict[str, Any]]):
+        corr = np.asarray(corr, dtype=float)
+        if corr.shape != (len(columns), len(columns)):
+            raise ValueError(f"Correlation matrix is {corr.shape}, expected {len(columns)} x {len(columns)}")
+        if len(marginals) != len(columns):
+            raise ValueError("Need one marginal per copula column")
+        try:
+            self.chol = np.linalg.cholesky(corr)
+        except np.linalg.LinAlgError:
+            self.chol = np.linalg.cholesky(nearest_correlation(corr))
+        self.columns = list(columns)
+        self.marginals = marginals
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "GaussianCopula":
+        columns = list(spec["columns"])
+        corr = spec["corr"]
+        if isinstance(corr, dict):
+            corr = factor_correlation(len(columns), corr["factors"], corr.get("seed", 0),
+                                      corr.get("strength", 1.0))
+        corr = np.asarray(corr, dtype=float)
+        if spec.get("target", "pearson") == "spearman":
+            # Latent Pearson r that gives Spearman's rho after any monotone marginal
+            corr = 2 * np.sin(np.pi * corr / 6)
+        default = spec.get("default_marginal", DEFAULT_MARGINALS[0])
+        marginals = [spec.get("marginals", {}).get(c, default) for c in columns]
+        return cls(columns, corr, marginals)
+
+    def sample(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        z = rng.standard_normal((n, len(self.columns))) @ self.chol.T
+        return {name: _inverse_cdf(marginal, z[:, j])
+                for j, (name, marginal) in enumerate(zip(self.columns, self.marginals))}
+
+
+def wide_copula_spec(
+    name: str, rows: int, n_columns: int, factors: int = 5, seed: int = 0, prefix: str = "f"
+) -> Dict[str, Any]:
+    """Spec for a wide table of correlated features cycling the Class 4 marginals."""
+    columns = [f"{prefix}{i}" for i in range(n_columns)]
+    return {
+        "name": name,
+        "rows": rows,
+        "description": f"rows x {n_columns} correlated features",
+        "copula": {
+            "columns": columns,
+            "corr": {"factors": factors, "seed": seed},
+            "target": "spearman",
+            "marginals": {c: DEFAULT_MARGINALS[i % len(DEFAULT_MARGINALS)] for i, c in enumerate(columns)},
+        },
+        "columns": {},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a wide table of correlated features")
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--factors", type=int, default=5)
+    parser.add_argument("--name", default="wide_features")
+    parser.add_argument("--spec-out", default=None, help="Also save the spec as JSON (e.g. for --spec)")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="parquet")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--out-dir", default=str(Path(__file__).resolve().parent / "data" / "wide"))
+    args = parser.parse_args()
+
+    import generate_exercise_datasets as gen
+
+    spec = wide_copula_spec(args.name, args.rows, args.columns, args.factors)
+    if args.spec_out:
+        spec_path = Path(args.spec_out)
+        spec_path.parent.mkdir(parents=True, exist_ok=True)
+        spec_path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+    (dataset,) = gen.register_specs([spec])
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for _, path, rows in gen.write_datasets([dataset], out_dir, 1.0, args.chunk_rows, args.format, args.workers):
+        print(f"Created: {path} ({rows:,} rows x {args.columns} columns)")
+
+
+if __name__ == "__main__":
+    main()
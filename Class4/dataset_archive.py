@@ -0,0 +1,292 @@
+"""Class 4 – Stream generated CSVs straight into DataSet.zip (and a .tar.zst).
+
+Each chunk is compressed on the worker that generated it:
+
+  zip   the chunk becomes a raw-deflate segment ending in a sync flush, so
+        segments concatenate into one valid deflate stream (the pigz trick).
+        Workers also return the chunk's CRC-32, which the parent merges with
+        crc32_combine() instead of re-reading the data.
+  zstd  the chunk becomes one zstd frame; concatenated frames are a valid
+        zstd stream. Frames of a tar member are spooled (compressed) until the
+        member size is known, because the tar header must come first.
+
+The parent only appends bytes, so building the archives adds no second pass
+over the data and no read-back of CSVs from disk. ZIP64 records are written
+when a member or the archive passes 4 GiB.
+
+zstd needs the `zstandard` package (pip install zstandard).
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import tarfile
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+_ZIP32_MAX = 0xFFFFFFFF
+_DEFLATED = 8  # zip compression method
+# Empty final fixed-Huffman block: terminates a stream of sync-flushed segments
+_DEFLATE_END = b"\x03\x00"
+
+
+@dataclass(frozen=True)
+class ArchiveOptions:
+    zip_level: Optional[int] = None   # None: no zip
+    zstd_level: Optional[int] = None  # None: no .tar.zst
+    keep_files: bool = True           # also write the loose CSV files
+
+
+def _require_zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError(".tar.zst output needs zstandard. Install it with:\n  pip install zstandard") from exc
+    return zstandard
+
+
+# ----------------------------------------------------------------------------
+# CRC-32 combination (port of zlib's crc32_combine)
+# ----------------------------------------------------------------------------
+
+def _gf2_times(matrix: List[int], vector: int) -> int:
+    total, i = 0, 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return total
+
+
+def _gf2_square(matrix: List[int]) -> List[int]:
+    return [_gf2_times(matrix, matrix[n]) for n in range(32)]
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """CRC-32 of A + B given crc32(A), crc32(B) and len(B)."""
+    if len2 == 0:
+        return crc1
+    odd = [0xEDB88320] + [1 << n for n in range(31)]  # one zero bit
+    even = _gf2_square(odd)                          # two zero bits
+    odd = _gf2_square(even)                          # four zero bits
+    while True:
+        even = _gf2_square(odd)
+        if len2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+        odd = _gf2_square(even)
+        if len2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+    return crc1 ^ crc2
+
+
+# ----------------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------------
+
+def pack_chunk(data: bytes, options: ArchiveOptions) -> Dict[str, object]:
+    """Compress one encoded CSV chunk for every requested archive."""
+    packed: Dict[str, object] = {"size": len(data), "crc": zlib.crc32(data)}
+    if options.zip_level is not None:
+        comp = zlib.compressobj(options.zip_level, zlib.DEFLATED, -15)
+        packed["deflate"] = comp.compress(data) + comp.flush(zlib.Z_SYNC_FLUSH)
+    if options.zstd_level is not None:
+        packed["zstd"] = _require_zstandard().ZstdCompressor(level=options.zstd_level).compress(data)
+    return packed
+
+
+# ----------------------------------------------------------------------------
+# Streaming ZIP writer
+# ----------------------------------------------------------------------------
+
+def _dos_datetime(timestamp: float):
+    t = time.localtime(timestamp)
+    year = max(t.tm_year, 1980)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class StreamingZipWriter:
+    """Minimal zip writer for members whose deflate data arrives in segments.
+
+    Members use a data descriptor (flag bit 3), so sizes and CRC are written
+    after the data, like any streaming zip producer.
+    """
+
+    def __init__(self, path: Path, timestamp: float):
+        self.fh = open(path, "wb")
+        self.dos_time, self.dos_date = _dos_datetime(timestamp)
+        self.entries = []
+
+    def add_member(self, name: str) -> "_ZipMember":
+        return _ZipMember(self, name)
+
+    def _finish_member(self, name: bytes, offset: int, crc: int, csize: int, usize: int) -> None:
+        if csize >= _ZIP32_MAX or usize >= _ZIP32_MAX:
+            self.fh.write(struct.pack("<IIQQ", 0x08074B50, crc, csize, usize))
+        else:
+            self.fh.write(struct.pack("<IIII", 0x08074B50, crc, csize, usize))
+        self.entries.append((name, offset, crc, csize, usize))
+
+    def close(self) -> None:
+        cd_start = self.fh.tell()
+        for name, offset, crc, csize, usize in self.entries:
+            zip64 = []
+            if usize >= _ZIP32_MAX:
+                zip64.append(usize)
+            if csize >= _ZIP32_MAX:
+                zip64.append(csize)
+            if offset >= _ZIP32_MAX:
+                zip64.append(offset)
+            extra = struct.pack("<HH", 0x0001, 8 * len(zip64)) + struct.pack(f"<{len(zip64)}Q", *zip64) if zip64 else b""
+            self.fh.write(struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50, 45 | (3 << 8), 45 if zip64 else 20, 0x08, _DEFLATED,
+                self.dos_time, self.dos_date, crc,
+                min(csize, _ZIP32_MAX), min(usize, _ZIP32_MAX),
+                len(name), len(extra), 0, 0, 0, 0o100644 << 16, min(offset, _ZIP32_MAX),
+            ))
+            self.fh.write(name + extra)
+        cd_end = self.fh.tell()
+        cd_size, count = cd_end - cd_start, len(self.entries)
+
+        if count >= 0xFFFF or cd_size >= _ZIP32_MAX or cd_start >= _ZIP32_MAX:
+            self.fh.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, cd_size, cd_start))
+            self.fh.write(struct.pack("<IIQI", 0x07064B50, 0, cd_end, 1))
+        self.fh.write(struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+            min(cd_size, _ZIP32_MAX), min(cd_start, _ZIP32_MAX), 0,
+        ))
+        self.fh.close()
+
+
+class _ZipMember:
+    def __init__(self, writer: StreamingZipWriter, name: str):
+        self.writer = writer
+        self.name = name.encode("utf-8")
+        self.offset = writer.fh.tell()
+        self.crc = 0
+        self.csize = 0
+        self.usize = 0
+        writer.fh.write(struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 45, 0x08, _DEFLATED,
+            writer.dos_time, writer.dos_date, 0, 0, 0, len(self.name), 0,
+        ))
+        writer.fh.write(self.name)
+
+    def write(self, packed: Dict[str, object]) -> None:
+        segment = packed["deflate"]
+        self.writer.fh.write(segment)
+        self.crc = crc32_combine(self.crc, packed["crc"], packed["size"])
+        self.csize += len(segment)
+        self.usize += packed["size"]
+
+    def close(self) -> None:
+        self.writer.fh.write(_DEFLATE_END)
+        self.csize += len(_DEFLATE_END)
+        self.writer._finish_member(self.name, self.offset, self.crc, self.csize, self.usize)
+
+
+# ----------------------------------------------------------------------------
+# zstd-compressed tar writer
+# ----------------------------------------------------------------------------
+
+class ZstdTarWriter:
+    """Writes a .tar.zst as a sequence of independent zstd frames."""
+
+    def __init__(self, path: Path, timestamp: float, level: int):
+        self.zstd = _require_zstandard().ZstdCompressor(level=level)
+        self.fh = open(path, "wb")
+        self.timestamp = timestamp
+
+    def add_member(self, name: str) -> "_TarMember":
+        return _TarMember(self, name)
+
+    def close(self) -> None:
+        # End-of-archive marker: two zero blocks
+        self.fh.write(self.zstd.compress(b"\0" * (2 * tarfile.BLOCKSIZE)))
+        self.fh.close()
+
+
+class _TarMember:
+    def __init__(self, writer: ZstdTarWriter, name: str):
+        self.writer = writer
+        self.name = name
+        self.size = 0
+        self.spool = tempfile.TemporaryFile()
+
+    def write(self, packed: Dict[str, object]) -> None:
+        self.spool.write(packed["zstd"])
+        self.size += packed["size"]
+
+    def close(self) -> None:
+        info = tarfile.TarInfo(self.name)
+        info.size = self.size
+        info.mtime = int(self.writer.timestamp)
+        info.mode = 0o644
+        fh, zstd = self.writer.fh, self.writer.zstd
+        fh.write(zstd.compress(info.tobuf(format=tarfile.PAX_FORMAT)))
+        self.spool.seek(0)
+        while True:
+            block = self.spool.read(1 << 20)
+            if not block:
+                break
+            fh.write(block)
+        self.spool.close()
+        padding = -self.size % tarfile.BLOCKSIZE
+        if padding:
+            fh.write(zstd.compress(b"\0" * padding))
+
+
+# ----------------------------------------------------------------------------
+# Both archives behind one interface
+# ----------------------------------------------------------------------------
+
+class DatasetArchives:
+    """The archives one generator run writes into, e.g. DataSet.zip and DataSet.tar.zst."""
+
+    def __init__(self, options: ArchiveOptions, zip_path: Optional[Path] = None, tar_path: Optional[Path] = None):
+        # SOURCE_DATE_EPOCH pins archive timestamps for reproducible builds
+        timestamp = float(os.environ.get("SOURCE_DATE_EPOCH", time.time()))
+        self.options = options
+        self.paths = [p for p in (zip_path, tar_path) if p is not None]
+        self.zip = StreamingZipWriter(zip_path, timestamp) if zip_path is not None else None
+        self.tar = ZstdTarWriter(tar_path, timestamp, options.zstd_level) if tar_path is not None else None
+
+    def add_member(self, name: str) -> "_Members":
+        members = []
+        if self.zip is not None:
+            members.append(self.zip.add_member(name))
+        if self.tar is not None:
+            members.append(self.tar.add_member(name))
+        return _Members(members)
+
+    def close(self) -> None:
+        if self.zip is not None:
+            self.zip.close()
+        if self.tar is not None:
+            self.tar.close()
+
+
+class _Members:
+    def __init__(self, members):
+        self.members = members
+
+    def write(self, packed: Dict[str, object]) -> None:
+        for member in self.members:
+            member.write(packed)
+
+    def close(self) -> None:
+        for member in self.members:
+            member.close()
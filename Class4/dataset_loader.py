@@ -0,0 +1,538 @@
+"""Class 4 – Load generated exercise datasets.
+
+Partitioned datasets (generate_exercise_datasets.py --partition) are Hive-style
+directory trees such as:
+
+  ecommerce_full/region=North/month=2023-03/part-00000.parquet
+
+load_partitioned() walks the tree and skips every directory whose key=value
+cannot satisfy the filters, so a query for one region or one month only opens
+the files it needs. Remaining filters on ordinary columns are applied row by row.
+
+Filters follow the pandas/pyarrow read_parquet convention: a list of
+(column, op, value) tuples that must all hold, where op is one of
+=, ==, !=, <, <=, >, >=, in, not in.
+
+load_dataset() is the everyday entry point. It takes a dataset name (looked up
+in Class4/data) or a path, and the first time it sees a CSV it converts it,
+with the dataset's compact schema (dataset_schema.py), into a Parquet copy in
+a .cache directory next to the CSV:
+
+  data/.cache/ecommerce_full-<sha256 prefix>.parquet
+  data/.cache/index.json          # size, mtime and sha256 of each source CSV
+
+Later calls read only the requested columns from the copy and push filters
+down to its row groups, with no CSV parsing or type inference. The CSV is
+rehashed only when its size or mtime changes, and the copy is rebuilt only
+when the hash does, so touching a file costs one hash and editing it costs
+one conversion.
+
+Datasets can also be read straight out of the course archive, without
+extracting it: names missing from data_dir fall back to members of
+data_dir/DataSet.zip, and paths such as "Class4/data/DataSet.zip/real_estate.csv"
+address a member directly. Only that member is decompressed, as a stream,
+and parsed a chunk at a time; nothing is written to disk.
+
+iter_dataset_chunks() reads any of these layouts a bounded chunk at a time.
+
+Usage:
+  from dataset_loader import load_dataset, load_partitioned
+  df = load_dataset("ecommerce_full", columns=["order_value", "region"],
+                    filters=[("region", "in", ["North", "South"])])
+  df = load_partitioned(
+      "Class4/data/sf100/ecommerce_full",
+      filters=[("region", "=", "North"), ("month", ">=", "2023-03")],
+      columns=["order_value", "customer_segment"],
+  )
+"""
+
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+import json
+import operator
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from dataset_manifest import output_checksum
+from dataset_schema import SCHEMAS, apply_schema, dataset_name, read_typed
+
+
+Filter = Tuple[str, str, Any]
+DataPath = Union[Path, zipfile.Path]
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / "data"
+DEFAULT_CHUNK_ROWS = 500_000
+CACHE_DIR_NAME = ".cache"
+CACHE_INDEX_NAME = "index.json"
+DATASET_ZIP_NAME = "DataSet.zip"
+
+_COMPARISONS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_MEMBERSHIP = {"in", "not in"}
+READERS = {
+    ".parquet": lambda path, columns: pd.read_parquet(path, columns=columns),
+    ".feather": lambda path, columns: pd.read_feather(path, columns=columns),
+    ".csv": lambda path, columns: pd.read_csv(path, usecols=columns),
+}
+
+
+def _check_op(op: str) -> None:
+    if op not in _COMPARISONS and op not in _MEMBERSHIP:
+        raise ValueError(f"Unsupported filter operator: {op!r}")
+
+
+def _partition_value(key: str, value: Any) -> Any:
+    """A partition value (or filter target) in the key's type: month -> Period('M'), others str.
+
+    Targets go through the same conversion, so ("month", ">=", pd.Timestamp("2023-03-01"))
+    compares Period("2023-03") with Period("2023-03"), not two differently formatted strings.
+    """
+    return pd.Period(value, freq="M") if key == "month" else str(value)
+
+
+def _partition_matches(key: str, value: str, op: str, target: Any) -> bool:
+    """Evaluate one filter on `key` against a partition directory value."""
+    typed = _partition_value(key, value)
+    if op in _MEMBERSHIP:
+        hit = typed in {_partition_value(key, t) for t in target}
+        return hit if op == "in" else not hit
+    return _COMPARISONS[op](typed, _partition_value(key, target))
+
+
+# Whether some timestamp in [start, end] can satisfy `date <op> t`
+_SPAN_MATCHES = {
+    "=": lambda start, end, t: start <= t <= end,
+    "==": lambda start, end, t: start <= t <= end,
+    "!=": lambda start, end, t: True,
+    "<": lambda start, end, t: start < t,
+    "<=": lambda start, end, t: start <= t,
+    ">": lambda start, end, t: end > t,
+    ">=": lambda start, end, t: end >= t,
+}
+
+
+def _month_may_match(value: str, op: str, target: Any) -> bool:
+    """Whether a month=YYYY-MM directory can hold rows passing a filter on its date column."""
+    month = pd.Period(value, freq="M")
+    start, end = month.start_time, month.end_time
+    if op in _MEMBERSHIP:
+        return op == "not in" or any(start <= pd.Timestamp(t) <= end for t in target)
+    return _SPAN_MATCHES[op](start, end, pd.Timestamp(target))
+
+
+def _row_mask(df: pd.DataFrame, column: str, op: str, target: Any) -> pd.Series:
+    if op in _MEMBERSHIP:
+        hit = df[column].isin(list(target))
+        return hit if op == "in" else ~hit
+    return _COMPARISONS[op](df[column], target)
+
+
+def _timestamp_targets(filters: Sequence[Filter], datetime_columns: Sequence[str]) -> List[Filter]:
+    """Filters with targets on datetime columns as pd.Timestamp.
+
+    pandas compares a datetime column with "2023-06-01" but pyarrow's filter
+    pushdown does not, and neither matches strings in an `in` list.
+    """
+    typed = []
+    for column, op, target in filters:
+        if column in datetime_columns:
+            target = [pd.Timestamp(t) for t in target] if op in _MEMBERSHIP else pd.Timestamp(target)
+        typed.append((column, op, target))
+    return typed
+
+
+def parse_partition_dir(name: str) -> Optional[Tuple[str, str]]:
+    """'region=North' -> ('region', 'North'); None for ordinary directory names."""
+    key, sep, value = name.partition("=")
+    return (key, value) if sep and key else None
+
+
+def prune_partitions(
+    root: Path, filters: Optional[Sequence[Filter]] = None
+) -> Iterator[Tuple[Path, Dict[str, str]]]:
+    """Yield (file, partition values) for data files that can match the filters.
+
+    Directories are pruned as soon as their key=value fails a filter on that
+    key, so whole subtrees are never listed. Filters on date also prune
+    month=YYYY-MM directories that cannot hold a matching date (the rows of
+    the remaining months are still filtered one by one).
+    """
+    filters = list(filters or [])
+    for _, op, _ in filters:
+        _check_op(op)
+
+    def walk(directory: Path, values: Dict[str, str]):
+        for child in sorted(directory.iterdir()):
+            if child.is_dir():
+                parsed = parse_partition_dir(child.name)
+                if parsed is None:
+                    continue
+                key, value = parsed
+                if all(_partition_matches(key, value, op, target)
+                       for col, op, target in filters if col == key) and \
+                        (key != "month" or all(_month_may_match(value, op, target)
+                                               for col, op, target in filters if col == "date")):
+                    yield from walk(child, {**values, key: value})
+            elif child.suffix in READERS:
+                yield child, values
+
+    yield from walk(Path(root), {})
+
+
+def load_partitioned(
+    root: Path | str,
+    filters: Optional[Sequence[Filter]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Read a Hive-partitioned dataset, opening only partitions that pass the filters.
+
+    Partition keys come back as categorical columns. `columns` limits both the
+    columns read from each file and the columns returned.
+    """
+    filters = list(filters or [])
+    pieces = []
+    partition_keys: List[str] = []
+
+    for path, values in prune_partitions(Path(root), filters):
+        for key in values:
+            if key not in partition_keys:
+                partition_keys.append(key)
+
+        row_filters = [f for f in filters if f[0] not in values]
+        read_columns = None
+        if columns is not None:
+            wanted = [c for c in columns if c not in values]
+            wanted += [c for c, _, _ in row_filters if c not in wanted]
+            read_columns = wanted
+
+        df = READERS[path.suffix](path, read_columns)
+        if "date" in df.columns and path.suffix == ".csv":
+            df["date"] = pd.to_datetime(df["date"])
+        for column, op, target in row_filters:
+            df = df[_row_mask(df, column, op, target)]
+        for key, value in values.items():
+            df[key] = value
+        pieces.append(df)
+
+    if not pieces:
+        return pd.DataFrame(columns=columns or [])
+
+    result = pd.concat(pieces, ignore_index=True)
+    for key in partition_keys:
+        result[key] = result[key].astype("category")
+    if columns is not None:
+        result = result[columns]
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Chunked readers
+# ----------------------------------------------------------------------------
+
+def _select(columns: Optional[List[str]], names: List[str]) -> List[str]:
+    return list(names) if columns is None else [c for c in columns if c in names]
+
+
+def _open_csv(path: DataPath):
+    """Zip members are opened as decompressing streams; files are read by pandas itself."""
+    return path.open("rb") if isinstance(path, zipfile.Path) else contextlib.nullcontext(path)
+
+
+def _read_csv_chunks(source, columns: Optional[List[str]], names: List[str], chunk_rows: int,
+                     schema: Dict[str, str], headerless: bool = False) -> Iterator[pd.DataFrame]:
+    usecols = _select(columns, names)
+    dates = [c for c in usecols if schema.get(c, "").startswith("datetime64")]
+    dtype = {c: schema[c] for c in usecols if c in schema and c not in dates}
+    options = {"header": None, "names": names} if headerless else {}
+    for chunk in pd.read_csv(source, usecols=usecols, dtype=dtype, parse_dates=dates, chunksize=chunk_rows, **options):
+        yield apply_schema(chunk, {c: schema[c] for c in dates})
+
+
+def _iter_file(path: DataPath, columns: Optional[List[str]], chunk_rows: int, schema: Dict[str, str]) -> Iterator[pd.DataFrame]:
+    if path.suffix == ".csv":
+        with _open_csv(path) as source:
+            header = list(pd.read_csv(source, nrows=0).columns)
+        with _open_csv(path) as source:
+            yield from _read_csv_chunks(source, columns, header, chunk_rows, schema)
+    elif path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        usecols = _select(columns, parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=usecols):
+            yield batch.to_pandas()
+    elif path.suffix == ".feather":
+        import pyarrow as pa
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            usecols = _select(columns, reader.schema.names)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(usecols).to_pandas()
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+
+
+def iter_dataset_chunks(
+    path: DataPath | str, columns: Optional[List[str]], chunk_rows: int = DEFAULT_CHUNK_ROWS, name: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield column-projected chunks (columns=None: all) of a file, zip member or partitioned directory."""
+    if not isinstance(path, zipfile.Path):
+        path = Path(path)
+    schema = SCHEMAS.get(name or dataset_name(path), {})
+    if not path.is_dir():
+        yield from _iter_file(path, columns, chunk_rows, schema)
+        return
+    for file, values in prune_partitions(path):
+        for chunk in _iter_file(file, columns, chunk_rows, schema):
+            for key, value in values.items():
+                if columns is None or key in columns:
+                    chunk[key] = value
+            yield chunk
+
+
+# ----------------------------------------------------------------------------
+# Parallel scans
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ScanPart:
+    """A piece of a dataset that one worker reads on its own.
+
+    A byte range [start, stop) of a CSV (each line belongs to the range
+    holding its first byte), row groups [start, stop) of a Parquet file, or a
+    whole file (stop=None), plus the partition values of its directory.
+    """
+    path: str
+    start: int = 0
+    stop: Optional[int] = None
+    partition: Tuple[Tuple[str, str], ...] = ()
+
+
+def _split_file(path: Path, block_bytes: int, partition: Tuple[Tuple[str, str], ...]) -> List[ScanPart]:
+    if path.suffix == ".csv":
+        size = path.stat().st_size
+        return [ScanPart(str(path), start, min(start + block_bytes, size), partition)
+                for start in range(0, max(size, 1), block_bytes)]
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        groups = pq.ParquetFile(path).metadata.num_row_groups
+        return [ScanPart(str(path), g, g + 1, partition) for g in range(groups)]
+    return [ScanPart(str(path), partition=partition)]
+
+
+def split_dataset(path: Path | str, block_bytes: int = 64 << 20) -> List[ScanPart]:
+    """Independent parts of a file or partitioned directory, for process-parallel scans.
+
+    CSVs split into block_bytes byte ranges, Parquet files into row groups
+    and partitioned directories into their files. Feather files and zip
+    members stay whole. Lines are split on newlines, so quoted fields must
+    not contain them (true of every generated dataset).
+    """
+    path = Path(path)
+    if path.is_dir():
+        return [part for file, values in prune_partitions(path)
+                for part in _split_file(file, block_bytes, tuple(values.items()))]
+    if not path.exists():
+        if zip_member(path) is None:
+            raise FileNotFoundError(path)
+        return [ScanPart(str(path))]
+    return _split_file(path, block_bytes, ())
+
+
+def _csv_range(path: Path, start: int, stop: int) -> Tuple[List[str], bytes]:
+    """Header and the complete lines whose first byte lies in [start, stop)."""
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        if start > fh.tell():
+            fh.seek(start - 1)
+            fh.readline()  # finish the line that the previous range owns
+        position = fh.tell()
+        data = fh.read(max(stop - position, 0))
+        if data and not data.endswith(b"\n"):
+            data += fh.readline()
+    return next(csv.reader([header.decode("utf-8")])), data
+
+
+def iter_part_chunks(
+    part: ScanPart, columns: Optional[List[str]], chunk_rows: int = DEFAULT_CHUNK_ROWS, name: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield column-projected chunks of one ScanPart (see iter_dataset_chunks)."""
+    path = Path(part.path)
+    schema = SCHEMAS.get(name or dataset_name(path), {})
+    if part.stop is None:
+        source = path if path.exists() else zip_member(path)
+        chunks = _iter_file(source, columns, chunk_rows, schema)
+    elif path.suffix == ".csv":
+        header, data = _csv_range(path, part.start, part.stop)
+        chunks = (_read_csv_chunks(io.BytesIO(data), columns, header, chunk_rows, schema, headerless=True)
+                  if data else iter(()))
+    else:
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        usecols = _select(columns, parquet.schema_arrow.names)
+        batches = parquet.iter_batches(batch_size=chunk_rows, row_groups=range(part.start, part.stop),
+                                       columns=usecols)
+        chunks = (batch.to_pandas() for batch in batches)
+    for chunk in chunks:
+        for key, value in part.partition:
+            if columns is None or key in columns:
+                chunk[key] = value
+        yield chunk
+
+
+# ----------------------------------------------------------------------------
+# Cached loading
+# ----------------------------------------------------------------------------
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "The Parquet cache needs pyarrow. Install it with:\n  pip install pyarrow"
+        ) from exc
+    return pa, pq
+
+
+def _source_digest(source: Path, cache_dir: Path) -> str:
+    """sha256 of the source, rehashed only when its size or mtime has changed."""
+    index_path = cache_dir / CACHE_INDEX_NAME
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+    stat = source.stat()
+    entry = index.get(source.name)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    digest = output_checksum(source).split(":", 1)[1]
+    index[source.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    tmp = index_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    os.replace(tmp, index_path)
+    return digest
+
+
+def cached_parquet(source: Path | str, name: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Path:
+    """Path of the typed Parquet copy of a CSV, converting it first if needed."""
+    pa, pq = _require_pyarrow()
+    source = Path(source)
+    cache_dir = source.parent / CACHE_DIR_NAME
+    cache_dir.mkdir(exist_ok=True)
+    digest = _source_digest(source, cache_dir)
+    target = cache_dir / f"{source.stem}-{digest[:16]}.parquet"
+    if target.exists():
+        return target
+
+    for stale in cache_dir.glob(f"{source.stem}-{'?' * 16}.parquet"):
+        stale.unlink()
+    # Streamed chunk by chunk, one row group per chunk, so memory stays bounded
+    tmp = target.with_suffix(".parquet.tmp")
+    schema = SCHEMAS.get(name or dataset_name(source), {})
+    writer = None
+    try:
+        for chunk in iter_dataset_chunks(source, None, chunk_rows, name):
+            table = pa.Table.from_pandas(apply_schema(chunk, schema), schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        read_typed(source, name).to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+    return target
+
+
+def zip_member(path: Path) -> Optional[zipfile.Path]:
+    """'data/DataSet.zip/ecommerce_full.csv' -> that member, if the path runs through a zip file."""
+    for parent in path.parents:
+        if parent.suffix == ".zip" and parent.is_file():
+            member = zipfile.Path(parent, at=path.relative_to(parent).as_posix())
+            return member if member.exists() else None
+    return None
+
+
+def resolve_dataset(name: Path | str, data_dir: Path | str = DEFAULT_DATA_DIR) -> DataPath:
+    """A path, or a dataset name looked up in data_dir.
+
+    Names are tried as a partitioned directory, then .parquet, .feather and
+    .csv files, and finally as a CSV member of data_dir/DataSet.zip.
+    """
+    path = Path(name)
+    if path.exists():
+        return path
+    member = zip_member(path)
+    if member is not None:
+        return member
+    data_dir = Path(data_dir)
+    for candidate in (data_dir / name, data_dir / f"{name}.parquet",
+                      data_dir / f"{name}.feather", data_dir / f"{name}.csv"):
+        if candidate.exists():
+            return candidate
+    member = zip_member(data_dir / DATASET_ZIP_NAME / f"{name}.csv")
+    if member is not None:
+        return member
+    raise FileNotFoundError(f"No dataset {str(name)!r} in {data_dir}")
+
+
+def load_dataset(
+    name: Path | str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Sequence[Filter]] = None,
+    data_dir: Path | str = DEFAULT_DATA_DIR,
+    cache: bool = True,
+) -> pd.DataFrame:
+    """Load a dataset with its schema, reading CSVs through the Parquet cache.
+
+    `columns` and `filters` are pushed down to the Parquet reader (and to the
+    directory walk for partitioned datasets). Zip members, Feather files and
+    CSVs with cache=False are read a chunk at a time, keeping only the
+    requested columns and matching rows of each chunk.
+    """
+    path = resolve_dataset(name, data_dir)
+    dataset = dataset_name(path)
+    filters = list(filters or [])
+    for _, op, _ in filters:
+        _check_op(op)
+    dates = [c for c, t in SCHEMAS.get(dataset, {}).items() if t.startswith("datetime64")]
+    filters = _timestamp_targets(filters, dates)
+    if path.is_dir():
+        return load_partitioned(path, filters, columns)
+
+    if path.suffix == ".csv" and cache and not isinstance(path, zipfile.Path):
+        path = cached_parquet(path, dataset)
+    if path.suffix == ".parquet":
+        pa, pq = _require_pyarrow()
+        schema = pq.read_schema(path)
+        filters = _timestamp_targets(filters, [f.name for f in schema if pa.types.is_timestamp(f.type)])
+        # Parquet has no second-resolution timestamps, so dates come back as ms
+        df = pd.read_parquet(path, columns=columns, filters=filters or None)
+        return apply_schema(df, SCHEMAS.get(dataset, {}))
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns) + [c for c, _, _ in filters if c not in columns]
+    pieces = []
+    for chunk in iter_dataset_chunks(path, read_columns, name=dataset):
+        for column, op, target in filters:
+            chunk = chunk[_row_mask(chunk, column, op, target)]
+        pieces.append(chunk[columns] if columns is not None else chunk)
+    if not pieces:
+        return pd.DataFrame(columns=columns or [])
+    df = pd.concat(pieces, ignore_index=True)
+    return apply_schema(df, SCHEMAS.get(dataset, {}))
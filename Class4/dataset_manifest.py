@@ -0,0 +1,123 @@
+"""Class 4 – Manifest of generated datasets for incremental regeneration.
+
+generate_exercise_datasets.py records one entry per dataset in
+<out_dir>/manifest.json:
+
+  "ecommerce_full": {
+    "spec_hash": "sha256:...",      # spec + everything else that shapes the bytes
+    "seed": 42, "scale": 1, "rows": 10000, "format": "csv",
+    "path": "ecommerce_full.csv",
+    "checksum": "sha256:...",       # of the file (or every file of a partition tree)
+    "bytes": 2688347,
+    "mtime_ns": 1792315800000000000,  # latest modification time among the files
+    "generated_at": "2026-10-18T09:30:00+00:00", "seconds": 0.41
+  }
+
+On the next run a dataset is skipped when its spec hash is unchanged and its
+output still exists with the recorded size and modification time, so editing
+one spec block only regenerates that dataset, and a file touched or replaced
+by hand is rebuilt. Downstream pipelines (slides, EDA images) can
+compare checksums from load_manifest() with the ones they last built from,
+e.g. with changed_datasets().
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def spec_hash(spec: Dict[str, Any], **params: Any) -> str:
+    """Stable hash of a spec plus generation parameters (seed, rows, format, ...)."""
+    text = json.dumps({"spec": spec, **params}, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _output_files(path: Path) -> List[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file())
+    return [path]
+
+
+def output_checksum(path: Path) -> str:
+    """sha256 of a file, or of the relative names and contents of a directory tree."""
+    digest = hashlib.sha256()
+    for file in _output_files(path):
+        if path.is_dir():
+            digest.update(file.relative_to(path).as_posix().encode("utf-8") + b"\0")
+        with open(file, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    return "sha256:" + digest.hexdigest()
+
+
+def output_bytes(path: Path) -> int:
+    return sum(file.stat().st_size for file in _output_files(path))
+
+
+def output_mtime(path: Path) -> int:
+    """Latest modification time (ns) among a file or the files of a directory tree."""
+    return max((file.stat().st_mtime_ns for file in _output_files(path)), default=0)
+
+
+def load_manifest(out_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Dataset entries of <out_dir>/manifest.json ({} if there is none yet)."""
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["datasets"]
+
+
+def save_manifest(out_dir: Path, datasets: Dict[str, Dict[str, Any]]) -> None:
+    """Write the manifest atomically, so an interrupted run never leaves a torn file."""
+    path = Path(out_dir) / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "datasets": datasets}, indent=2),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def make_entry(out_dir: Path, path: Path, key: str, rows: int, seconds: float, **params: Any) -> Dict[str, Any]:
+    return {
+        "spec_hash": key,
+        **params,
+        "rows": rows,
+        "path": path.relative_to(out_dir).as_posix(),
+        "checksum": output_checksum(path),
+        "bytes": output_bytes(path),
+        "mtime_ns": output_mtime(path),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seconds": round(seconds, 3),
+    }
+
+
+def is_current(entry: Optional[Dict[str, Any]], key: str, out_dir: Path) -> bool:
+    """True if the entry was built from `key` and its output is still on disk, unchanged in size and mtime.
+
+    Entries written before mtimes were recorded are checked on size alone.
+    """
+    if not entry or entry.get("spec_hash") != key:
+        return False
+    path = Path(out_dir) / entry["path"]
+    if not path.exists() or output_bytes(path) != entry["bytes"]:
+        return False
+    return "mtime_ns" not in entry or output_mtime(path) == entry["mtime_ns"]
+
+
+def changed_datasets(
+    before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    """Datasets whose output checksum differs between two manifests (or that are new)."""
+    return [name for name, entry in after.items()
+            if before.get(name, {}).get("checksum") != entry["checksum"]]
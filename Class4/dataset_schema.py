@@ -0,0 +1,169 @@
+"""Class 4 – Compact column dtypes for the exercise datasets.
+
+pd.read_csv() infers int64 ids, float64 Likert answers (a single NaN forces
+it), object strings and bools, which costs several times the memory the data
+needs. SCHEMAS pins every column of the nine datasets to the smallest dtype
+that holds its range:
+
+  ids                     uint32
+  small counts / ages     uint8 / int8 / uint16
+  Likert answers          Int8 (nullable: missing answers stay integers)
+  low-cardinality text    category
+  values with <= 7 digits float32 (float64 is kept where cents need more)
+
+The generator applies the schema to every chunk (so Parquet/Feather files
+store these physical types) and read_typed() reads CSV, Parquet or Feather
+back with it. Integer casts are range-checked, so an id column that outgrows
+uint32 at a huge --scale raises instead of wrapping around.
+
+Usage:
+  python Class4/dataset_schema.py Class4/data/sf100/customer_survey.csv Class4/data/sf100/credit_risk.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+Schema = Dict[str, str]
+
+LIKERT = {f"q{q}": "Int8" for q in range(1, 21)}
+
+SCHEMAS: Dict[str, Schema] = {
+    "student_scores": {"student_id": "uint32", "exam_score": "float32"},
+    "employee_salaries": {
+        "employee_id": "uint32", "department": "category",
+        "salary": "float64", "years_experience": "float32",
+    },
+    "house_simple": {"house_id": "uint32", "sqft": "uint16", "price": "uint32"},
+    "customer_transactions": {
+        "transaction_id": "uint32", "amount": "float32", "date": "datetime64[s]",
+        "category": "category", "customer_type": "category",
+    },
+    "real_estate": {
+        "price": "uint32", "sqft": "uint16", "bedrooms": "uint8", "bathrooms": "float32",
+        "age": "uint8", "lot_size": "float32", "garage_spaces": "uint8",
+        "distance_to_city": "float32", "crime_rate": "float32", "school_rating": "float32",
+        "condition_score": "float32", "renovation_year": "uint16",
+    },
+    "daily_sales": {
+        "date": "datetime64[s]", "daily_sales": "float64",
+        "day_of_week": "category", "is_holiday": "bool",
+    },
+    "customer_survey": {
+        "respondent_id": "uint32", "age": "float32", "income": "Float32",
+        "education": "category", **LIKERT,
+    },
+    "ecommerce_full": {
+        "transaction_id": "uint32", "customer_segment": "category", "product_category": "category",
+        "region": "category", "order_value": "float32", "quantity": "uint8",
+        "date": "datetime64[s]", "customer_age": "int8", "is_repeat_customer": "bool",
+    },
+    "credit_risk": {
+        "applicant_id": "uint32", "age": "uint8", "income": "Float32",
+        "employment_length": "Float32", "debt": "float64", "credit_score": "uint16",
+        "loan_amount": "uint32", "interest_rate": "float32", "term": "uint8",
+        "purpose": "category", "grade": "category", "delinquencies": "UInt8",
+        "inquiries": "uint8", "open_accounts": "uint8", "default": "uint8",
+    },
+    # Star schema tables (ecommerce_star.py)
+    "customers": {
+        "customer_id": "uint32", "customer_segment": "category", "region": "category",
+        "customer_age": "uint8", "signup_date": "datetime64[s]",
+    },
+    "products": {"product_id": "uint32", "product_category": "category", "list_price": "float32"},
+    "orders": {
+        "order_id": "uint32", "customer_id": "uint32", "order_date": "datetime64[s]",
+        "n_items": "uint8", "order_total": "float64",
+    },
+    "order_items": {
+        "order_id": "uint32", "line_number": "uint8", "product_id": "uint32",
+        "quantity": "uint8", "unit_price": "float32", "line_total": "float32",
+    },
+}
+
+
+def _check_range(values: pd.Series, column: str, dtype: str) -> None:
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        return
+    info = np.iinfo(dtype.lower())
+    low, high = values.min(), values.max()
+    if pd.notna(low) and (low < info.min or high > info.max):
+        raise OverflowError(f"Column {column!r} spans [{low}, {high}], which does not fit {dtype}")
+
+
+def apply_schema(df: pd.DataFrame, schema: Schema) -> pd.DataFrame:
+    """Cast the schema's columns that are present in df (range-checked for integers)."""
+    casts = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        if dtype.lower().startswith(("int", "uint")):
+            _check_range(df[column], column, dtype)
+        casts[column] = dtype
+    return df.astype(casts) if casts else df
+
+
+def dataset_name(path: Path | str) -> str:
+    """'ecommerce_full.rows-0-65536.csv' -> 'ecommerce_full' (paths, strings or zipfile.Path)."""
+    name = path if isinstance(path, str) else path.name
+    return re.sub(r"(\.rows-\d+-\d+)?\.\w+$", "", Path(name).name)
+
+
+def read_typed(path: Path | str, name: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a generated CSV/Parquet/Feather file with its dataset's schema."""
+    path = Path(path)
+    schema = SCHEMAS.get(name or dataset_name(path), {})
+    if columns is not None:
+        schema = {c: t for c, t in schema.items() if c in columns}
+    if path.suffix == ".csv":
+        dates = [c for c, t in schema.items() if t.startswith("datetime64")]
+        df = pd.read_csv(path, usecols=columns, parse_dates=dates,
+                         dtype={c: t for c, t in schema.items() if c not in dates})
+    elif path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=columns)
+    elif path.suffix == ".feather":
+        df = pd.read_feather(path, columns=columns)
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+    return apply_schema(df, schema)
+
+
+def memory_report(path: Path | str, name: Optional[str] = None) -> pd.DataFrame:
+    """Per-column resident memory of a CSV read with inferred dtypes vs. read_typed()."""
+    default = pd.read_csv(path)
+    typed = read_typed(path, name)
+    report = pd.DataFrame({
+        "default_dtype": default.dtypes.astype(str),
+        "default_bytes": default.memory_usage(index=False, deep=True),
+        "typed_dtype": typed.dtypes.astype(str),
+        "typed_bytes": typed.memory_usage(index=False, deep=True),
+    })
+    report.loc["TOTAL"] = ["", report["default_bytes"].sum(), "", report["typed_bytes"].sum()]
+    report["ratio"] = (report["default_bytes"] / report["typed_bytes"]).astype(float).round(1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory used by generated datasets with and without their schema")
+    parser.add_argument("files", nargs="+", help="Generated CSV files")
+    args = parser.parse_args()
+
+    for path in args.files:
+        report = memory_report(path)
+        total = report.loc["TOTAL"]
+        print(f"\n{path}")
+        print("-" * 60)
+        print(report.to_string())
+        print(f"Resident memory: {total['default_bytes'] / 1e6:,.1f} MB -> "
+              f"{total['typed_bytes'] / 1e6:,.1f} MB ({total['ratio']}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Class 4 – Declarative dataset specs compiled to vectorized chunk generators.
+
+A spec is a plain dict (or a JSON/YAML file with the same shape):
+
+  {
+    "name": "house_simple",
+    "rows": 300,                      # rows at scale 1
+    "description": "houses",
+    "columns": {                      # generated in this order
+      "house_id": {"kind": "id"},
+      "sqft": {"dist": "normal", "loc": 2000, "scale": 600,
+               "clip": [800, 5000], "round": 0, "dtype": "int"},
+      "price": {"linear": {"sqft": 150}, "intercept": 150000,
+                "noise": {"dist": "normal", "loc": 0, "scale": 40000},
+                "clip": [100000, 1500000], "round": 0, "dtype": "int"},
+    },
+    "output": [...],                  # optional column order
+  }
+
+Column values are *expressions*, evaluated for a whole chunk at once:
+
+  number / bool       constant
+  "col"               an earlier column; "_row" is the global row index and
+                      "_row_fraction" is row / (n_total - 1)
+  {"dist": ...}       random draw: normal(loc, scale), lognormal(mean, sigma),
+                      gamma(shape, scale), beta(a, b), exponential(scale),
+                      poisson(lam), uniform(low, high), integers(low, high),
+                      bernoulli(p[, exact]), categorical(values[, p]).
+                      Parameters are expressions too.
+  {"map": "col", "values": {...}, "default": x}     per-category lookup
+  {"product": [expr, ...]} / {"sum": [expr, ...]}
+  {"linear": {"col": coef, ...}, "intercept": b, "noise": expr, "link": "logistic"}
+  {"sine": expr, "amplitude": a, "period": p}
+
+plus a few structural kinds: {"kind": "id"}, {"kind": "date", "start": ..., "days": expr},
+{"kind": "timestamp", "start": ..., "step": "1m"} (one row per step: "1s", "5m", "1h", ...),
+{"kind": "weekday", "of": "date"}, {"kind": "bins", "of": "col", "edges": [...], "labels": [...]},
+{"kind": "blocks", "values": [...]} (equal contiguous blocks over the whole dataset) and
+{"kind": "day_flag", "of": "timestamp", "p": 0.02, "key": 1}, a per-day coin flip that is
+a hash of (key, day), so every row of a day agrees no matter which chunk it falls in.
+
+A top-level "copula" block adds columns with a target correlation matrix and
+per-column marginals (see copula.py); they are drawn first, so ordinary
+columns can depend on them. Its optional "missing" map holds their rules.
+
+After the value, a column may apply, in order: "multiply", "add", "inflate"
+({"prob": p, "value": v}), "clip" [lo, hi], "round" ndigits, "dtype". Columns
+with "hidden": true are used by later columns but not written. "missing" takes
+one rule or a list of rules {"prob": expr}; masks are drawn after every column
+exists, from the unmasked values, so MCAR (constant), MAR (driven by another
+column) and MNAR (driven by the column itself) rules all use the same form
+(see missingness.py). Masked columns keep their dtype as pandas nullable arrays.
+
+An optional top-level "schema" ({"col": "uint32", "q5": "Int8", ...}) casts
+the finished chunk to compact dtypes (see dataset_schema.py).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from copula import GaussianCopula
+from dataset_schema import apply_schema
+from missingness import apply_masks, draw_masks, rules_from_spec
+
+
+ChunkFn = Callable[[np.random.Generator, int, int, int], pd.DataFrame]
+
+POST_KEYS = ("multiply", "add", "inflate", "clip", "round", "dtype")
+COLUMN_KEYS = POST_KEYS + ("hidden", "missing")
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+_STEP_UNITS = {"s": "s", "m": "m", "h": "h", "d": "D"}
+DTYPES = {
+    "int": np.int64, "int8": np.int8, "int16": np.int16, "int32": np.int32,
+    "uint8": np.uint8, "uint16": np.uint16, "uint32": np.uint32,
+    "float": np.float64, "float32": np.float32, "bool": bool,
+}
+
+
+class SpecError(ValueError):
+    """Raised when a dataset spec is malformed."""
+
+
+class _Chunk:
+    """Evaluation context for one chunk: rng, row range and finished columns."""
+
+    def __init__(self, rng: np.random.Generator, start: int, stop: int, n_total: int):
+        self.rng = rng
+        self.start = start
+        self.n = stop - start
+        self.n_total = n_total
+        self.columns: Dict[str, Any] = {}
+
+    def column(self, name: str):
+        if name == "_row":
+            return np.arange(self.start, self.start + self.n)
+        if name == "_row_fraction":
+            return np.arange(self.start, self.start + self.n) / max(self.n_total - 1, 1)
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise SpecError(f"Unknown column {name!r} (columns must be defined before use)") from None
+
+
+def _mix(z: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer on uint64 arrays."""
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def hash_uniform(key: int, values: np.ndarray) -> np.ndarray:
+    """U(0, 1) numbers that depend only on (key, value): random access, no RNG state."""
+    with np.errstate(over="ignore"):
+        base = _mix(np.array([key], dtype=np.uint64))
+        bits = _mix(_mix(np.asarray(values, dtype=np.uint64) ^ base))
+    return ((bits >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0 ** -53
+
+
+def parse_step(step: str) -> np.timedelta64:
+    """'1s', '5m', '1h', '1d' -> numpy timedelta64."""
+    count, unit = step[:-1], step[-1:]
+    if unit not in _STEP_UNITS or not count.isdigit():
+        raise SpecError(f"Bad timestamp step {step!r} (expected e.g. '1s', '5m', '1h')")
+    return np.timedelta64(int(count), _STEP_UNITS[unit])
+
+
+def _draw(spec: Dict[str, Any], ctx: _Chunk):
+    dist = spec["dist"]
+    rng, n = ctx.rng, ctx.n
+    p = {k: evaluate(v, ctx) for k, v in spec.items() if k not in ("dist", "values", "exact")}
+
+    if dist == "normal":
+        return rng.normal(p["loc"], p["scale"], n)
+    if dist == "lognormal":
+        return rng.lognormal(p["mean"], p["sigma"], n)
+    if dist == "gamma":
+        return rng.gamma(p["shape"], p["scale"], n)
+    if dist == "beta":
+        return rng.beta(p["a"], p["b"], n)
+    if dist == "exponential":
+        return rng.exponential(p["scale"], n)
+    if dist == "poisson":
+        return rng.poisson(p["lam"], n)
+    if dist == "uniform":
+        return rng.uniform(p["low"], p["high"], n)
+    if dist == "integers":
+        return rng.integers(p["low"], p["high"], n)
+    if dist == "bernoulli":
+        if spec.get("exact"):
+            # Exactly round(n * p) successes per chunk, placed without replacement
+            hits = np.zeros(n, dtype=bool)
+            hits[rng.choice(n, min(n, round(n * p["p"])), replace=False)] = True
+            return hits
+        return rng.random(n) < p["p"]
+    if dist == "categorical":
+        values = spec["values"]
+        codes = rng.choice(len(values), n, p=p.get("p"))
+        if all(isinstance(v, str) for v in values):
+            return pd.Categorical.from_codes(codes, values)
+        return np.asarray(values)[codes]
+    raise SpecError(f"Unknown distribution: {dist!r}")
+
+
+def _lookup(column, mapping: Dict[Any, float], default: Any) -> np.ndarray:
+    if isinstance(column, pd.Categorical):
+        table = np.array([mapping.get(c, default) for c in column.categories], dtype=float)
+        return table[column.codes]
+    return pd.Series(column).map(mapping).fillna(default).to_numpy(dtype=float)
+
+
+def evaluate(expr: Any, ctx: _Chunk):
+    """Evaluate one expression for the whole chunk (scalar or length-n array)."""
+    if isinstance(expr, (bool, int, float, np.number)) or expr is None:
+        return expr
+    if isinstance(expr, str):
+        return ctx.column(expr)
+    if isinstance(expr, (list, tuple)):
+        return np.asarray(expr)
+    if not isinstance(expr, dict):
+        raise SpecError(f"Cannot evaluate {expr!r}")
+
+    if "dist" in expr:
+        return _draw(expr, ctx)
+    if "map" in expr:
+        return _lookup(ctx.column(expr["map"]), expr["values"], expr.get("default", np.nan))
+    if "product" in expr:
+        result = 1.0
+        for term in expr["product"]:
+            result = result * evaluate(term, ctx)
+        return result
+    if "sum" in expr:
+        result = 0.0
+        for term in expr["sum"]:
+            result = result + evaluate(term, ctx)
+        return result
+    if "linear" in expr:
+        result = expr.get("intercept", 0.0)
+        for name, coef in expr["linear"].items():
+            result = result + coef * np.asarray(ctx.column(name), dtype=float)
+        if "noise" in expr:
+            result = result + evaluate(expr["noise"], ctx)
+        link = expr.get("link", "identity")
+        if link == "logistic":
+            return 1 / (1 + np.exp(-result))
+        if link != "identity":
+            raise SpecError(f"Unknown link: {link!r}")
+        return result
+    if "sine" in expr:
+        x = np.asarray(evaluate(expr["sine"], ctx), dtype=float)
+        return expr.get("amplitude", 1.0) * np.sin(2 * np.pi * x / expr["period"] + expr.get("phase", 0.0))
+    raise SpecError(f"Unknown expression: {sorted(expr)}")
+
+
+def _structural(spec: Dict[str, Any], ctx: _Chunk):
+    kind = spec["kind"]
+    rows = np.arange(ctx.start, ctx.start + ctx.n)
+    if kind == "id":
+        return rows + spec.get("start", 1)
+    if kind == "date":
+        days = np.asarray(evaluate(spec["days"], ctx)).astype(np.int64)
+        return np.datetime64(spec["start"], "D") + days.astype("timedelta64[D]")
+    if kind == "timestamp":
+        step = parse_step(spec["step"])
+        return np.datetime64(spec["start"], np.datetime_data(step.dtype)[0]) + rows * step
+    if kind == "day_flag":
+        days = np.asarray(ctx.column(spec["of"])).astype("datetime64[D]").astype(np.int64)
+        return hash_uniform(spec.get("key", 0), days) < spec["p"]
+    if kind == "weekday":
+        days = np.asarray(ctx.column(spec["of"])).astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 (day 0 of datetime64) was a Thursday
+        return pd.Categorical.from_codes((days + 3) % 7, DAY_NAMES)
+    if kind == "bins":
+        return pd.cut(np.asarray(ctx.column(spec["of"])), bins=spec["edges"], labels=spec["labels"])
+    if kind == "blocks":
+        values = spec["values"]
+        codes = np.minimum(rows * len(values) // ctx.n_total, len(values) - 1)
+        return pd.Categorical.from_codes(codes, values)
+    raise SpecError(f"Unknown column kind: {kind!r}")
+
+
+def _post_process(values, spec: Dict[str, Any], ctx: _Chunk):
+    if isinstance(values, pd.Categorical):
+        return values
+    values = np.asarray(values)
+    if "multiply" in spec:
+        values = values * evaluate(spec["multiply"], ctx)
+    if "add" in spec:
+        values = values + evaluate(spec["add"], ctx)
+    if "inflate" in spec:
+        rule = spec["inflate"]
+        values = np.where(ctx.rng.random(ctx.n) < evaluate(rule["prob"], ctx), rule["value"], values)
+    if "clip" in spec:
+        values = values.clip(*spec["clip"])
+    if "round" in spec:
+        values = values.round(spec["round"])
+    if "dtype" in spec:
+        values = values.astype(DTYPES[spec["dtype"]])
+    return values
+
+
+def validate_spec(spec: Dict[str, Any]) -> None:
+    for key in ("name", "rows", "columns"):
+        if key not in spec:
+            raise SpecError(f"Spec is missing {key!r}")
+    for name, col in spec["columns"].items():
+        if not isinstance(col, dict):
+            raise SpecError(f"Column {name!r}: expected a dict, got {type(col).__name__}")
+        if not any(k in col for k in ("kind", "dist", "map", "product", "sum", "linear", "sine", "value")):
+            raise SpecError(f"Column {name!r} has no value expression")
+    defined = set(spec["columns"]) | set(spec.get("copula", {}).get("columns", []))
+    for name in spec.get("output", []):
+        if name not in defined:
+            raise SpecError(f"Output column {name!r} is not defined")
+
+
+def compile_spec(spec: Dict[str, Any]) -> ChunkFn:
+    """Turn a spec into make_chunk(rng, start, stop, n_total) -> DataFrame.
+
+    Every column is drawn as one array per chunk; nothing loops over rows.
+    """
+    validate_spec(spec)
+    columns = spec["columns"]
+    copula = GaussianCopula.from_spec(spec["copula"]) if "copula" in spec else None
+    copula_columns = copula.columns if copula else []
+    output = spec.get("output") or copula_columns + [n for n, c in columns.items() if not c.get("hidden")]
+    missing_rules = [rule for rule in rules_from_spec(spec) if rule.column in output]
+    schema = spec.get("schema", {})
+
+    def make_chunk(rng: np.random.Generator, start: int, stop: int, n_total: int) -> pd.DataFrame:
+        ctx = _Chunk(rng, start, stop, n_total)
+        if copula is not None:
+            ctx.columns.update(copula.sample(rng, ctx.n))
+        for name, col in columns.items():
+            expr = {k: v for k, v in col.items() if k not in COLUMN_KEYS}
+            if "kind" in expr:
+                values = _structural(expr, ctx)
+            else:
+                values = evaluate(expr.get("value", expr), ctx)
+                if np.ndim(values) == 0:
+                    values = np.full(ctx.n, values)
+            ctx.columns[name] = _post_process(values, col, ctx)
+
+        # Missingness is decided from the complete, unmasked columns, and
+        # masked columns keep their dtype as nullable arrays
+        masks = draw_masks(missing_rules, lambda expr: evaluate(expr, ctx), rng, ctx.n)
+        data = apply_masks({name: ctx.columns[name] for name in output}, masks)
+        return apply_schema(pd.DataFrame(data), schema)
+
+    return make_chunk
+
+
+def load_spec(path: Path | str) -> Dict[str, Any]:
+    """Read a spec from a .json or .yaml/.yml file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise RuntimeError("YAML specs need PyYAML. Install it with:\n  pip install pyyaml") from exc
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    validate_spec(spec)
+    return spec
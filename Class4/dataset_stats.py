@@ -0,0 +1,278 @@
+"""Class 4 – Summary-statistics sidecars written next to each dataset.
+
+Most EDA figures and solutions start from the same numbers: row count, null
+counts, min/max/mean/std, value counts and a histogram per column.
+write_sidecars() computes them once, in two chunked passes over the data
+(CSV, Parquet, Feather, a partitioned directory or a DataSet.zip member),
+and stores them beside the dataset:
+
+  ecommerce_full.csv
+  ecommerce_full.stats.json       # everything, keyed by column
+  ecommerce_full.stats.parquet    # one row per column, for pandas
+
+  "order_value": {"dtype": "float32", "count": 50000, "nulls": 0,
+                  "min": 1.02, "max": 4711.3, "mean": 163.45, "std": 190.29,
+                  "histogram": {"edges": [... 101 ...], "counts": [... 100 ...]}},
+  "region":      {"dtype": "category", "count": 50000, "nulls": 0,
+                  "value_counts": {"North": 12485, ...}}
+
+Numeric and date columns get min/max and a --bins histogram over
+[min, max] (numbers also get mean and std). Text, category and bool columns,
+and integer columns with few distinct values, get value counts. The
+sidecar records the source's size and mtime (the CRC for zip members), and
+load_stats() ignores a sidecar that no longer matches its dataset.
+
+Usage:
+  python Class4/dataset_stats.py Class4/data/*.csv
+  python Class4/generate_exercise_datasets.py --scale 100 --stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import DEFAULT_CHUNK_ROWS, DataPath, iter_dataset_chunks, zip_member
+from dataset_schema import dataset_name
+from streaming_stats import Moments, is_numeric_column
+
+
+STATS_VERSION = 1
+DEFAULT_BINS = 100
+MAX_LEVELS = 50            # integer columns with at most this many values also get value counts
+MAX_VALUE_COUNTS = 10_000  # text columns with more distinct values only get null counts
+
+
+def _is_datetime(values: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(values.dtype)
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    """Non-null values as float64 (datetimes as seconds since the epoch)."""
+    values = values.dropna()
+    if _is_datetime(values):
+        return values.astype("datetime64[s]").astype("int64").to_numpy(dtype=float)
+    return values.to_numpy(dtype=float)
+
+
+def _plain(value: Any) -> Any:
+    """JSON-friendly scalar (value-count keys become strings in JSON anyway)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _ColumnStats:
+    """Pass-1 accumulator for one column; min, max, mean and std come from a Moments."""
+
+    def __init__(self, values: pd.Series):
+        self.dtype = str(values.dtype)
+        self.datetime = _is_datetime(values)
+        self.numeric = self.datetime or is_numeric_column(values)
+        self.count = self.nulls = 0
+        self.moments = Moments()
+        counted = not self.numeric or pd.api.types.is_integer_dtype(values.dtype)
+        self.counts: Optional[pd.Series] = pd.Series(dtype="int64") if counted else None
+        self.limit = MAX_LEVELS if self.numeric else MAX_VALUE_COUNTS
+        self.edges: Optional[np.ndarray] = None
+        self.histogram: Optional[np.ndarray] = None
+
+    def update(self, values: pd.Series) -> None:
+        self.count += len(values)
+        self.nulls += int(values.isna().sum())
+        if self.counts is not None:
+            counts = self.counts.add(values.value_counts(), fill_value=0)
+            self.counts = counts if len(counts) <= self.limit else None
+        if self.numeric:
+            self.moments.update(values)
+
+    def start_histogram(self, bins: int) -> None:
+        if self.moments.n:
+            self.edges = np.histogram_bin_edges([], bins, range=(self.moments.low, self.moments.high))
+            self.histogram = np.zeros(bins, dtype=np.int64)
+
+    def update_histogram(self, values: pd.Series) -> None:
+        self.histogram += np.histogram(_as_float(values), self.edges)[0]
+
+    def _scalar(self, x: float) -> Any:
+        if self.datetime:
+            return str(np.datetime64(int(x), "s"))
+        return int(x) if float(x).is_integer() and "int" in self.dtype.lower() else float(x)
+
+    def summary(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"dtype": self.dtype, "count": self.count, "nulls": self.nulls}
+        if self.moments.n:
+            result["min"], result["max"] = self._scalar(self.moments.low), self._scalar(self.moments.high)
+            if not self.datetime:
+                result["mean"] = self.moments.mean
+                result["std"] = self.moments.std()
+        if self.histogram is not None:
+            edges = [self._scalar(e) for e in self.edges] if self.datetime else self.edges.tolist()
+            result["histogram"] = {"edges": edges, "counts": self.histogram.tolist()}
+        if self.counts is not None and len(self.counts):
+            counts = self.counts.astype("int64").sort_values(ascending=False, kind="stable")
+            result["value_counts"] = {str(_plain(k)): int(v) for k, v in counts.items()}
+        return result
+
+
+def compute_stats(
+    path: DataPath | str, name: Optional[str] = None, bins: int = DEFAULT_BINS,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """Summary statistics of a dataset, from two passes of bounded chunks."""
+    name = name or dataset_name(path)
+    columns: Dict[str, _ColumnStats] = {}
+    rows = 0
+    for chunk in iter_dataset_chunks(path, None, chunk_rows, name):
+        rows += len(chunk)
+        for column in chunk.columns:
+            if column not in columns:
+                columns[column] = _ColumnStats(chunk[column])
+            columns[column].update(chunk[column])
+
+    # Histogram edges need the global min and max, hence a second pass
+    numeric = [c for c, stats in columns.items() if stats.numeric]
+    for column in numeric:
+        columns[column].start_histogram(bins)
+    numeric = [c for c in numeric if columns[c].histogram is not None]
+    if numeric:
+        for chunk in iter_dataset_chunks(path, numeric, chunk_rows, name):
+            for column in numeric:
+                columns[column].update_histogram(chunk[column])
+
+    return {
+        "version": STATS_VERSION,
+        "dataset": name,
+        "source": source_fingerprint(path),
+        "rows": rows,
+        "columns": {column: stats.summary() for column, stats in columns.items()},
+    }
+
+
+# ----------------------------------------------------------------------------
+# Sidecar files
+# ----------------------------------------------------------------------------
+
+def source_fingerprint(path: DataPath | str) -> Dict[str, Any]:
+    """What a sidecar must still match: size and mtime (files), CRC (zip members)."""
+    if isinstance(path, zipfile.Path):
+        info = path.root.getinfo(path.at)
+        return {"name": path.name, "bytes": info.file_size, "crc": info.CRC}
+    path = Path(path)
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    return {
+        "name": path.name,
+        "bytes": sum(f.stat().st_size for f in files),
+        "mtime_ns": max((f.stat().st_mtime_ns for f in files), default=0),
+    }
+
+
+def sidecar_paths(path: DataPath | str) -> Dict[str, Path]:
+    """<dir>/<stem>.stats.json and .stats.parquet (a zip member's go next to the zip)."""
+    if isinstance(path, zipfile.Path):
+        directory, stem = Path(path.root.filename).parent, Path(path.name).stem
+    else:
+        path = Path(path)
+        directory, stem = path.parent, path.name if path.is_dir() else path.stem
+    return {"json": directory / f"{stem}.stats.json", "parquet": directory / f"{stem}.stats.parquet"}
+
+
+def stats_frame(stats: Dict[str, Any]) -> pd.DataFrame:
+    """One row per column; value counts and histograms become list columns."""
+    rows = []
+    for column, summary in stats["columns"].items():
+        numeric = not isinstance(summary.get("min"), str)
+        counts = summary.get("value_counts", {})
+        histogram = summary.get("histogram", {})
+        rows.append({
+            "column": column,
+            "dtype": summary["dtype"],
+            "count": summary["count"],
+            "nulls": summary["nulls"],
+            "min": summary.get("min") if numeric else None,
+            "max": summary.get("max") if numeric else None,
+            "mean": summary.get("mean"),
+            "std": summary.get("std"),
+            "values": list(counts),
+            "value_counts": list(counts.values()),
+            "histogram_edges": histogram.get("edges", []) if numeric else [],
+            "histogram_counts": histogram.get("counts", []),
+        })
+    frame = pd.DataFrame(rows)
+    for column in ("min", "max", "mean", "std"):
+        frame[column] = frame[column].astype(float)
+    return frame
+
+
+def write_sidecars(
+    path: DataPath | str, name: Optional[str] = None, bins: int = DEFAULT_BINS,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Dict[str, Path]:
+    """Compute a dataset's statistics and write both sidecar files."""
+    stats = compute_stats(path, name, bins, chunk_rows)
+    paths = sidecar_paths(path)
+    tmp = paths["json"].with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(stats, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, paths["json"])
+    try:
+        stats_frame(stats).to_parquet(paths["parquet"], index=False)
+    except ImportError:
+        paths.pop("parquet")  # pyarrow is optional here; the JSON sidecar has everything
+    return paths
+
+
+def load_stats(path: DataPath | str) -> Optional[Dict[str, Any]]:
+    """A dataset's sidecar statistics, or None if missing or out of date."""
+    if isinstance(path, str) and not Path(path).exists():
+        path = zip_member(Path(path)) or path
+    sidecar = sidecar_paths(path)["json"]
+    if not sidecar.exists():
+        return None
+    stats = json.loads(sidecar.read_text(encoding="utf-8"))
+    if stats.get("version") != STATS_VERSION or stats.get("source") != source_fingerprint(path):
+        return None
+    return stats
+
+
+def _print_summary(stats: Dict[str, Any]) -> None:
+    print(f"   {stats['rows']:,} rows")
+    for column, summary in stats["columns"].items():
+        parts = [f"nulls={summary['nulls']:,}"]
+        if "mean" in summary:
+            parts.append(f"mean={summary['mean']:,.4g} std={summary['std']:,.4g}")
+        if "min" in summary:
+            parts.append(f"range=[{summary['min']}, {summary['max']}]")
+        if "value_counts" in summary:
+            parts.append(f"{len(summary['value_counts'])} values")
+        print(f"     {column:<22} {'  '.join(parts)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write .stats.json/.stats.parquet sidecars for datasets")
+    parser.add_argument("paths", nargs="+", help="CSV/Parquet/Feather files, partitioned directories "
+                                                 "or zip members (data/DataSet.zip/real_estate.csv)")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Histogram bins per numeric column")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--quiet", action="store_true", help="Do not print the summaries")
+    args = parser.parse_args()
+
+    for raw in args.paths:
+        path: DataPath = Path(raw)
+        if not path.exists():
+            member = zip_member(path)
+            if member is None:
+                raise SystemExit(f"No such dataset: {raw}")
+            path = member
+        written = write_sidecars(path, bins=args.bins, chunk_rows=args.chunk_rows)
+        print(f"📊 {raw} -> {', '.join(p.name for p in written.values())}")
+        if not args.quiet:
+            _print_summary(json.loads(written["json"].read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
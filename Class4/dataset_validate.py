@@ -0,0 +1,574 @@
+"""Class 4 – Streaming statistical validation of generated datasets.
+
+Each dataset lists the properties its spec is meant to produce (moments,
+correlations, missingness rates, category proportions, the trend, yearly
+amplitude and multipliers of the sales series) as Expectations with pass
+bounds. sales_<step> checks are derived from the spec for that step. The targets are read off
+the spec dicts in generate_exercise_datasets (means, variances and
+correlations follow from the distribution parameters and linear terms); only
+the tolerances are set here. validate_path() checks them in one pass over a
+CSV/Parquet/Feather file or a partitioned directory, reading --chunk-rows
+rows at a time, so a 100x output is validated without ever being loaded
+whole:
+
+  moments        streaming_stats.Moments, merged chunk by chunk
+  correlations   streaming_correlation.CoMoments over pairwise-complete rows
+  missingness    null counts
+  proportions    value counts
+  seasonality    least-squares normal equations for a + b t + c sin + d cos
+  lifts          per-category sums and counts
+
+Bounds are wide enough for the scale-1 sample sizes; larger scales only
+tighten the estimates.
+
+Usage:
+  python Class4/dataset_validate.py Class4/data
+  python Class4/dataset_validate.py Class4/data/sf100 --chunk-rows 500000
+  python Class4/generate_exercise_datasets.py --scale 100 --validate
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import DEFAULT_CHUNK_ROWS, iter_dataset_chunks
+from dataset_schema import dataset_name
+from dataset_spec import COLUMN_KEYS, DAY_NAMES, SpecError, parse_step
+from streaming_correlation import CoMoments
+from streaming_stats import Moments
+from generate_exercise_datasets import DATASETS_BY_NAME, sales_timeseries_spec
+
+
+@dataclass(frozen=True)
+class Expectation:
+    check: str            # mean, std, skew, corr, missing, proportion, amplitude, trend, lift
+    column: str
+    low: float
+    high: float
+    other: Any = None     # second column (corr), category value (proportion), model (amplitude, trend),
+                          # (column, value) (lift)
+
+    @property
+    def label(self) -> str:
+        if self.check == "corr":
+            return f"corr({self.column}, {self.other})"
+        if self.check == "proportion":
+            return f"P({self.column}={self.other})"
+        if self.check == "lift":
+            return f"lift({self.column} | {self.other[0]}={self.other[1]})"
+        return f"{self.check}({self.column})"
+
+
+def _around(check: str, column: str, target: float, tol: float, other: Any = None) -> Expectation:
+    return Expectation(check, column, target - tol, target + tol, other)
+
+
+# ----------------------------------------------------------------------------
+# Targets read off the dataset specs
+# ----------------------------------------------------------------------------
+#
+# Every numeric column is treated as a mean plus a linear form over
+# independent zero-mean sources (each random draw or noise term), so means,
+# variances and correlations follow from the spec's parameters. Clipping and
+# rounding are ignored; the tolerances below absorb them.
+
+Form = Tuple[float, Dict[str, Tuple[float, float]]]  # mean, {source: (loading, source variance)}
+
+_DISCRETE = ("poisson", "integers", "bernoulli", "categorical")
+_NODES, _WEIGHTS = np.polynomial.hermite_e.hermegauss(40)  # E[f(Z)], Z ~ N(0, 1)
+
+
+def _columns(dataset: str) -> Dict[str, Any]:
+    if dataset not in DATASETS_BY_NAME and dataset.startswith("sales_"):
+        # Validated outside the generator run that registered it; the years
+        # only set the row count, not the targets
+        return sales_timeseries_spec(dataset[len("sales_"):])["columns"]
+    return DATASETS_BY_NAME[dataset].spec["columns"]
+
+
+def _scaled(form: Form, k: float) -> Form:
+    mean, loadings = form
+    return mean * k, {s: (c * k, v) for s, (c, v) in loadings.items()}
+
+
+def _added(*forms: Form) -> Form:
+    mean, loadings = 0.0, {}
+    for m, terms in forms:
+        mean += m
+        for s, (c, v) in terms.items():
+            loadings[s] = (loadings.get(s, (0.0, v))[0] + c, v)
+    return mean, loadings
+
+
+def _source(source: str, mean: float, var: float) -> Form:
+    return mean, {source: (1.0, var)}
+
+
+def _variance(form: Form) -> float:
+    return sum(c * c * v for c, v in form[1].values())
+
+
+def _covariance(a: Form, b: Form) -> float:
+    return sum(c * b[1][s][0] * v for s, (c, v) in a[1].items() if s in b[1])
+
+
+def probabilities(dataset: str, column: str) -> Dict[Any, float]:
+    """Share of each value a categorical, blocks, weekday, bernoulli, day flag or inflated column is drawn with."""
+    spec = _columns(dataset)[column]
+    if "inflate" in spec:
+        return {spec["inflate"]["value"]: _form(dataset, spec["inflate"]["prob"], column)[0]}
+    if spec.get("kind") == "blocks":
+        return {v: 1 / len(spec["values"]) for v in spec["values"]}
+    if spec.get("kind") == "weekday":
+        return {v: 1 / len(DAY_NAMES) for v in DAY_NAMES}
+    if spec.get("dist") == "bernoulli":
+        p = _form(dataset, spec["p"], column)[0]
+        return {True: p, False: 1 - p}
+    if spec.get("kind") == "day_flag":
+        return {True: spec["p"], False: 1 - spec["p"]}
+    if spec.get("dist") == "categorical":
+        values = spec["values"]
+        return dict(zip(values, spec.get("p") or [1 / len(values)] * len(values)))
+    raise SpecError(f"{dataset}.{column} is not a categorical column")
+
+
+def _draw(dataset: str, expr: Dict[str, Any], source: str) -> Form:
+    dist = expr["dist"]
+    p = {k: _form(dataset, v, f"{source}.{k}")[0] for k, v in expr.items()
+         if k not in ("dist", "values", "exact") and not isinstance(v, list)}
+    if dist == "normal":
+        # A random loc (a map or linear form) keeps its own sources
+        return _added(_form(dataset, expr["loc"], f"{source}.loc"), _source(source, 0.0, p["scale"] ** 2))
+    if dist == "lognormal":
+        s2 = p["sigma"] ** 2
+        return _source(source, math.exp(p["mean"] + s2 / 2), math.expm1(s2) * math.exp(2 * p["mean"] + s2))
+    if dist == "gamma":
+        return _source(source, p["shape"] * p["scale"], p["shape"] * p["scale"] ** 2)
+    if dist == "beta":
+        a, b = p["a"], p["b"]
+        return _source(source, a / (a + b), a * b / ((a + b) ** 2 * (a + b + 1)))
+    if dist == "exponential":
+        return _source(source, p["scale"], p["scale"] ** 2)
+    if dist == "poisson":
+        return _source(source, p["lam"], p["lam"])
+    if dist == "uniform":
+        return _source(source, (p["low"] + p["high"]) / 2, (p["high"] - p["low"]) ** 2 / 12)
+    if dist == "integers":
+        return _source(source, (p["low"] + p["high"] - 1) / 2, ((p["high"] - p["low"]) ** 2 - 1) / 12)
+    if dist == "bernoulli":
+        return _source(source, p["p"], p["p"] * (1 - p["p"]))
+    if dist == "categorical":
+        values = np.asarray(expr["values"], dtype=float)
+        probs = np.asarray(expr.get("p") or np.full(len(values), 1 / len(values)))
+        mean = float(probs @ values)
+        return _source(source, mean, float(probs @ values ** 2) - mean ** 2)
+    raise SpecError(f"Unknown distribution: {dist!r}")
+
+
+def _form(dataset: str, expr: Any, source: str) -> Form:
+    """Mean and linear form of a spec expression, as the column named `source`."""
+    if isinstance(expr, (bool, int, float)):
+        return float(expr), {}
+    if isinstance(expr, str):
+        return _column_form(dataset, expr)
+    if "dist" in expr:
+        return _draw(dataset, expr, source)
+    if "map" in expr:
+        mapped = expr["values"]
+        probs = probabilities(dataset, expr["map"])
+        values = np.array([mapped.get(v, expr.get("default", math.nan)) for v in probs], dtype=float)
+        shares = np.array(list(probs.values()))
+        mean = float(shares @ values)
+        return _source(source, mean, float(shares @ values ** 2) - mean ** 2)
+    if "sum" in expr:
+        return _added(*(_form(dataset, term, f"{source}.{i}") for i, term in enumerate(expr["sum"])))
+    if "product" in expr:
+        # Factors are independent of each other
+        factors = [_form(dataset, term, f"{source}.{i}") for i, term in enumerate(expr["product"])]
+        mean = math.prod(m for m, _ in factors)
+        second = math.prod(f[0] ** 2 + _variance(f) for f in factors)
+        return _source(source, mean, second - mean ** 2)
+    if "linear" in expr:
+        form = _added((float(expr.get("intercept", 0.0)), {}),
+                      *(_scaled(_column_form(dataset, name), coef) for name, coef in expr["linear"].items()))
+        if "noise" in expr:
+            form = _added(form, _form(dataset, expr["noise"], f"{source}.noise"))
+        if expr.get("link", "identity") == "logistic":
+            # Taking the linear predictor as normal
+            p = 1 / (1 + np.exp(-(form[0] + math.sqrt(_variance(form)) * _NODES)))
+            mean = float(_WEIGHTS @ p) / math.sqrt(2 * math.pi)
+            return _source(source, mean, float(_WEIGHTS @ p ** 2) / math.sqrt(2 * math.pi) - mean ** 2)
+        return form
+    raise SpecError(f"No moments for expression {sorted(expr)}")
+
+
+def _column_form(dataset: str, column: str) -> Form:
+    spec = _columns(dataset)[column]
+    expr = {k: v for k, v in spec.items() if k not in COLUMN_KEYS}
+    if "kind" in expr:
+        raise SpecError(f"{dataset}.{column} ({expr['kind']}) has no moments")
+    form = _form(dataset, expr.get("value", expr), column)
+    if "multiply" in spec:
+        form = _scaled(form, spec["multiply"])
+    if "add" in spec:
+        form = _added(form, (float(spec["add"]), {}))
+    if spec.get("dtype") == "int" and "round" not in spec and expr.get("dist") not in _DISCRETE:
+        # int casting truncates a continuous draw toward zero
+        form = _added(form, (-0.5, {}))
+    return form
+
+
+def missing_rate(dataset: str, column: str) -> float:
+    """Expected share of nulls: any of the column's missing rules firing."""
+    rules = _columns(dataset)[column].get("missing", [])
+    kept = 1.0
+    for rule in rules if isinstance(rules, list) else [rules]:
+        kept *= 1 - _form(dataset, rule["prob"], f"{column}.missing")[0]
+    return 1 - kept
+
+
+def _rows_per_day(spec: Dict[str, Any], row: str) -> Optional[float]:
+    """How many rows make a day on a date/timestamp column driven by `row`, or None for other columns."""
+    if spec.get("kind") == "date" and spec.get("days") == row:
+        return 1.0
+    if spec.get("kind") == "timestamp" and row == "_row":
+        return float(np.timedelta64(1, "D") / parse_step(spec["step"]))
+    return None
+
+
+def seasonal_model(dataset: str, column: str) -> Dict[str, Any]:
+    """The trend and yearly sine inside a product column, its time axis and the multipliers around them.
+
+    Time is in days. Constant and noise factors scale the amplitude and the
+    rise of the trend over the series by their mean.
+    """
+    columns = _columns(dataset)
+    factors = columns[column]["product"]
+    terms = [t for f in factors if isinstance(f, dict) for t in f.get("sum", [f])]
+    sine = next(t for t in terms if "sine" in t)
+    time, per_day = next((n, k) for n, k in ((n, _rows_per_day(c, sine["sine"])) for n, c in columns.items())
+                         if k is not None)
+    rise = sum(t["linear"].get("_row_fraction", 0.0) for t in terms if "linear" in t)
+    scale = math.prod(_form(dataset, f, f"{column}.{i}")[0] for i, f in enumerate(factors)
+                      if not isinstance(f, dict) or "dist" in f)
+    return {"time": time, "start": columns[time]["start"], "period": sine["period"] / per_day,
+            "amplitude": sine["amplitude"] * scale, "rise": rise * scale,
+            "divide": [(f["map"], f["values"]) for f in factors if isinstance(f, dict) and "map" in f]}
+
+
+def _mean(dataset: str, column: str, tol: float) -> Expectation:
+    return _around("mean", column, _column_form(dataset, column)[0], tol)
+
+
+def _std(dataset: str, column: str, tol: float) -> Expectation:
+    return _around("std", column, math.sqrt(_variance(_column_form(dataset, column))), tol)
+
+
+def _corr(dataset: str, x: str, y: str, tol: float) -> Expectation:
+    a, b = _column_form(dataset, x), _column_form(dataset, y)
+    return _around("corr", x, _covariance(a, b) / math.sqrt(_variance(a) * _variance(b)), tol, y)
+
+
+def _missing(dataset: str, column: str, tol: float) -> Expectation:
+    return _around("missing", column, missing_rate(dataset, column), tol)
+
+
+def _proportions(dataset: str, column: str, tol: float) -> List[Expectation]:
+    return [_around("proportion", column, p, tol, value) for value, p in probabilities(dataset, column).items()]
+
+
+def _amplitude(dataset: str, column: str, tol: float) -> Expectation:
+    model = seasonal_model(dataset, column)
+    return _around("amplitude", column, model["amplitude"], tol, model)
+
+
+def _trend(dataset: str, column: str, tol: float) -> Expectation:
+    model = seasonal_model(dataset, column)
+    return _around("trend", column, model["rise"], tol, model)
+
+
+def _lifts(dataset: str, column: str, by: str, tol: float) -> List[Expectation]:
+    """Mean of `column` where `by` takes each value over its overall mean: the product's multiplier for it.
+
+    The other factors average out as long as each value is spread evenly over
+    the series, as weekdays and holidays are.
+    """
+    effects = next(f["values"] for f in _columns(dataset)[column]["product"]
+                   if isinstance(f, dict) and f.get("map") == by)
+    probs = probabilities(dataset, by)
+    mean = sum(p * effects[v] for v, p in probs.items())
+    return [_around("lift", column, effects[v] / mean, tol, (by, v)) for v in probs]
+
+
+def _sales_expectations(dataset: str) -> List[Expectation]:
+    """Checks for a sales_<step> series, scaled like its values to the share of a day in each period."""
+    per_day = _rows_per_day(_columns(dataset)["timestamp"], "_row")
+    return [
+        _trend(dataset, "sales", 1500 / per_day),
+        _amplitude(dataset, "sales", 750 / per_day),
+        *_lifts(dataset, "sales", "day_of_week", 0.03),
+        *_lifts(dataset, "sales", "is_holiday", 0.12),
+        *_proportions(dataset, "is_holiday", 0.02),
+        *_proportions(dataset, "day_of_week", 0.01),
+    ]
+
+
+EXPECTATIONS: Dict[str, List[Expectation]] = {
+    "student_scores": [
+        _mean("student_scores", "exam_score", 2.5),
+        _std("student_scores", "exam_score", 1.5),
+    ],
+    "employee_salaries": [
+        _mean("employee_salaries", "salary", 3000),
+        _mean("employee_salaries", "years_experience", 0.8),
+        *_proportions("employee_salaries", "department", 0.01),
+    ],
+    "house_simple": [
+        _mean("house_simple", "price", 15000),
+        _corr("house_simple", "sqft", "price", 0.04),
+    ],
+    "customer_transactions": [
+        _mean("customer_transactions", "amount", 5),
+        Expectation("skew", "amount", 2.0, math.inf),  # clearly right-skewed
+        *_proportions("customer_transactions", "category", 0.02),
+        *_proportions("customer_transactions", "customer_type", 0.02),
+    ],
+    "real_estate": [
+        _mean("real_estate", "sqft", 60),
+        _corr("real_estate", "sqft", "price", 0.04),
+        _corr("real_estate", "age", "price", 0.06),
+        Expectation("skew", "age", 1.0, math.inf),
+        *_proportions("real_estate", "renovation_year", 0.04),
+    ],
+    "daily_sales": [
+        _trend("daily_sales", "daily_sales", 1500),
+        _amplitude("daily_sales", "daily_sales", 750),
+        *_lifts("daily_sales", "daily_sales", "day_of_week", 0.03),
+        *_lifts("daily_sales", "daily_sales", "is_holiday", 0.12),
+        *_proportions("daily_sales", "is_holiday", 0.003),
+        *_proportions("daily_sales", "day_of_week", 0.01),
+    ],
+    "customer_survey": [
+        _mean("customer_survey", "age", 1.5),
+        _missing("customer_survey", "income", 0.04),
+        *[_missing("customer_survey", f"q{q}", 0.015) for q in (5, 10)],
+        *[_missing("customer_survey", f"q{q}", 0.03) for q in (15, 16, 17, 18)],
+        *[_missing("customer_survey", f"q{q}", 0.0) for q in (1, 20)],
+        *_proportions("customer_survey", "q1", 0.025),
+        *_proportions("customer_survey", "education", 0.02),
+    ],
+    "ecommerce_full": [
+        _mean("ecommerce_full", "order_value", 5),
+        _mean("ecommerce_full", "quantity", 0.05),
+        _mean("ecommerce_full", "customer_age", 0.5),
+        *_proportions("ecommerce_full", "customer_segment", 0.01),
+        *_proportions("ecommerce_full", "region", 0.01),
+        *_proportions("ecommerce_full", "is_repeat_customer", 0.01),
+    ],
+    "credit_risk": [
+        _missing("credit_risk", "income", 0.01),
+        _missing("credit_risk", "employment_length", 0.01),
+        _missing("credit_risk", "delinquencies", 0.008),
+        _corr("credit_risk", "credit_score", "interest_rate", 0.05),
+        _mean("credit_risk", "default", 0.03),
+        *_proportions("credit_risk", "term", 0.02),
+    ],
+}
+
+
+def expectations(name: str) -> List[Expectation]:
+    """The checks for a dataset: its EXPECTATIONS, or derived from the spec for a sales_<step> series."""
+    if name in EXPECTATIONS:
+        return EXPECTATIONS[name]
+    if name.startswith("sales_"):
+        try:
+            return _sales_expectations(name)
+        except ValueError:  # not a step, e.g. sales_report
+            return []
+    return []
+
+
+# ----------------------------------------------------------------------------
+# Mergeable accumulators
+# ----------------------------------------------------------------------------
+
+class _Seasonal:
+    """Least-squares fit of y = a + b t + c sin(2 pi t / P) + d cos(2 pi t / P) via X'X and X'y."""
+
+    def __init__(self, model: Dict[str, Any]):
+        self.model = model
+        self.xtx = np.zeros((4, 4))
+        self.xty = np.zeros(4)
+        self.t_min, self.t_max = math.inf, -math.inf
+
+    def update(self, chunk: pd.DataFrame, column: str) -> None:
+        m = self.model
+        # Fractional days, so sub-daily timestamps keep their place in the cycle
+        t = ((chunk[m["time"]].to_numpy(dtype="datetime64[s]") - np.datetime64(m["start"], "s"))
+             .astype(np.int64) / 86400.0)
+        if len(t):
+            self.t_min, self.t_max = min(self.t_min, t.min()), max(self.t_max, t.max())
+        y = chunk[column].to_numpy(dtype=float)
+        for by, effects in m["divide"]:
+            y = y / chunk[by].astype(object).map(effects).to_numpy(dtype=float)
+        angle = 2 * np.pi * t / m["period"]
+        x = np.column_stack([np.ones_like(t), t, np.sin(angle), np.cos(angle)])
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+
+    def amplitude(self) -> float:
+        coef = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return float(np.hypot(coef[2], coef[3]))
+
+    def rise(self) -> float:
+        """Change in the fitted trend from the first to the last time."""
+        coef = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return float(coef[1] * (self.t_max - self.t_min))
+
+
+class DatasetProfile:
+    """Everything a list of Expectations needs, accumulated one chunk at a time."""
+
+    def __init__(self, expectations: List[Expectation]):
+        self.expectations = expectations
+        self.rows = 0
+        self.moments = {e.column: Moments() for e in expectations if e.check in ("mean", "std", "skew")}
+        self.comoments = {(e.column, e.other): CoMoments([e.column, e.other]) for e in expectations if e.check == "corr"}
+        self.nulls = {e.column: 0 for e in expectations if e.check == "missing"}
+        self.counts: Dict[str, pd.Series] = {e.column: pd.Series(dtype=float)
+                                             for e in expectations if e.check == "proportion"}
+        self.seasonal = {e.column: _Seasonal(e.other) for e in expectations if e.check in ("amplitude", "trend")}
+        self.groups: Dict[Tuple[str, str], pd.DataFrame] = {(e.column, e.other[0]): pd.DataFrame()
+                                                           for e in expectations if e.check == "lift"}
+
+    @property
+    def columns(self) -> List[str]:
+        names = set(self.moments) | set(self.nulls) | set(self.counts) | set(self.seasonal)
+        for x, y in [*self.comoments, *self.groups]:
+            names |= {x, y}
+        for model in (e.other for e in self.expectations if e.check in ("amplitude", "trend")):
+            names |= {model["time"]} | {by for by, _ in model["divide"]}
+        return sorted(names)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        for column, acc in self.moments.items():
+            acc.update(chunk[column])
+        for (x, y), acc in self.comoments.items():
+            acc.update(chunk[[x, y]])
+        for column in self.nulls:
+            self.nulls[column] += int(chunk[column].isna().sum())
+        for column, counts in self.counts.items():
+            self.counts[column] = counts.add(chunk[column].value_counts(), fill_value=0)
+        for column, acc in self.seasonal.items():
+            acc.update(chunk, column)
+        for (column, by), sums in self.groups.items():
+            chunk_sums = chunk[column].groupby(chunk[by].astype(object)).agg(["sum", "count"])
+            self.groups[(column, by)] = sums.add(chunk_sums, fill_value=0)
+
+    def observed(self, e: Expectation) -> float:
+        if e.check == "mean":
+            return self.moments[e.column].mean
+        if e.check == "std":
+            return self.moments[e.column].std()
+        if e.check == "skew":
+            return self.moments[e.column].skewness
+        if e.check == "corr":
+            return float(self.comoments[(e.column, e.other)].corr().iloc[0, 1])
+        if e.check == "missing":
+            return self.nulls[e.column] / self.rows if self.rows else math.nan
+        if e.check == "proportion":
+            counts = self.counts[e.column]
+            # Partition directory values come back as strings
+            hits = counts.get(e.other, counts.get(str(e.other), 0))
+            return hits / counts.sum() if counts.sum() else math.nan
+        if e.check == "amplitude":
+            return self.seasonal[e.column].amplitude()
+        if e.check == "trend":
+            return self.seasonal[e.column].rise()
+        if e.check == "lift":
+            by, value = e.other
+            sums = self.groups[(e.column, by)]
+            # Partition directory values come back as strings
+            key = value if value in sums.index else str(value)
+            if key not in sums.index or not sums["count"].sum():
+                return math.nan
+            return (sums.at[key, "sum"] / sums.at[key, "count"]) / (sums["sum"].sum() / sums["count"].sum())
+        raise ValueError(f"Unknown check: {e.check!r}")
+
+    def results(self) -> List[Tuple[Expectation, float, bool]]:
+        out = []
+        for e in self.expectations:
+            value = self.observed(e)
+            out.append((e, value, bool(e.low <= value <= e.high)))
+        return out
+
+
+def validate_path(
+    path: Path | str, name: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> List[Tuple[Expectation, float, bool]]:
+    """Check one generated dataset against its expectations in a single streaming pass.
+
+    path may also be a zipfile.Path member of DataSet.zip. A dataset without
+    any checks is an error rather than a vacuous pass.
+    """
+    name = name or dataset_name(path)
+    checks = expectations(name)
+    if not checks:
+        raise ValueError(f"No expectations for dataset {name!r}")
+    profile = DatasetProfile(checks)
+    for chunk in iter_dataset_chunks(path, profile.columns, chunk_rows, name):
+        profile.update(chunk)
+    return profile.results()
+
+
+def print_results(name: str, results: List[Tuple[Expectation, float, bool]]) -> None:
+    failed = sum(not ok for _, _, ok in results)
+    print(f"   {'✓' if not failed else '✗'} {name}: {len(results) - failed}/{len(results)} checks passed")
+    for e, value, ok in results:
+        if not ok:
+            print(f"      FAIL {e.label:<34} {value:>12.4f}  not in [{e.low:.4g}, {e.high:.4g}]")
+
+
+def find_datasets(root: Path) -> List[Path]:
+    """Generated files/partition trees in a directory whose names have expectations."""
+    return [p for p in sorted(root.iterdir())
+            if expectations(dataset_name(p)) and (p.is_dir() or p.suffix in (".csv", ".parquet", ".feather"))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate generated Class 4 datasets against their specs")
+    parser.add_argument("paths", nargs="+", help="Data directories, files or partitioned dataset directories")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--verbose", action="store_true", help="Print every check, not only failures")
+    args = parser.parse_args()
+
+    targets = []
+    for raw in args.paths:
+        path = Path(raw)
+        if path.is_dir() and not expectations(dataset_name(path)):
+            targets.extend(find_datasets(path))
+        else:
+            targets.append(path)
+
+    failed = 0
+    for path in targets:
+        results = validate_path(path, chunk_rows=args.chunk_rows)
+        print_results(path.name, results)
+        if args.verbose:
+            for e, value, ok in results:
+                print(f"      {'ok  ' if ok else 'FAIL'} {e.label:<34} {value:>12.4f}  [{e.low:.4g}, {e.high:.4g}]")
+        failed += sum(not ok for _, _, ok in results)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
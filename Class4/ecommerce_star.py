@@ -0,0 +1,316 @@
+"""Class 4 – Relational e-commerce star schema (customers, products, orders, order_items).
+
+ecommerce_full.csv draws segment, age and the repeat flag independently for
+every transaction. This generator splits the same story (DATASET 8 in
+generate_exercise_datasets.py) into tables with real keys, for join work:
+
+  customers    customer_id, customer_segment, region, customer_age, signup_date
+  products     product_id, product_category, list_price
+  orders       order_id, customer_id -> customers, order_date, n_items, order_total
+  order_items  (order_id -> orders, line_number), product_id -> products,
+               quantity, unit_price, line_total
+
+Customer activity and product popularity follow bounded Zipf laws (a few
+customers place many orders, most place one or two). Premium customers buy
+larger quantities and Electronics/Home products cost more, so order values
+keep DATASET 8's segment x category structure.
+
+Every attribute is a function of (seed, table, column, key), computed with a
+vectorized counter-based hash instead of a sequential RNG. Any chunk of any
+table can therefore be built on its own, on any worker, and a customer's
+segment seen while pricing an order is exactly the one in customers. Foreign
+keys are drawn in [1, n_customers] and [1, n_products], so key integrity
+holds at every scale factor by construction (--check verifies it).
+
+Usage:
+  python Class4/ecommerce_star.py
+  python Class4/ecommerce_star.py --scale 100 --format parquet --workers 8 --check
+
+Outputs:
+  Class4/data/ecommerce_star/{customers,products,orders,order_items}.<ext>
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+import generate_exercise_datasets as gen
+from dataset_schema import SCHEMAS, apply_schema
+from dataset_spec import hash_uniform
+from parallel import ordered_map
+
+
+TABLES = ("customers", "products", "orders", "order_items")
+BASE_SIZES = {"customers": 5_000, "products": 500, "orders": 20_000}
+CUSTOMER_ZIPF = 0.8   # orders per customer
+PRODUCT_ZIPF = 0.8    # order lines per product
+LINES_LAM = 1.5       # order lines = 1 + Poisson(1.5), at most MAX_LINES
+MAX_LINES = 16
+# Items per line are 1 + Poisson(lam): mean 1 / 2 / 5, DATASET 8's 50 / 100 / 250 segment ratio
+SEGMENT_QUANTITY_LAM = {'New': 0.0, 'Regular': 1.0, 'Premium': 4.0}
+ORDER_START = np.datetime64('2023-01-01', 'D')
+SIGNUP_START = np.datetime64('2020-01-01', 'D')
+
+# One hash stream per (table, column)
+_STREAMS = {name: i for i, name in enumerate([
+    "segment", "region", "age", "signup", "category", "price",
+    "customer", "date", "lines", "product", "quantity",
+])}
+
+
+def uniform(seed: int, stream: str, keys: np.ndarray) -> np.ndarray:
+    """U(0, 1) values that depend only on (seed, stream, key)."""
+    return hash_uniform(seed * 64 + _STREAMS[stream], keys)
+
+
+def _categorical(u: np.ndarray, values: List, p: List[float] | None = None) -> pd.Categorical:
+    p = np.full(len(values), 1 / len(values)) if p is None else np.asarray(p)
+    codes = np.minimum(np.searchsorted(np.cumsum(p), u), len(values) - 1)
+    return pd.Categorical.from_codes(codes, values)
+
+
+def _poisson(u: np.ndarray, lam: np.ndarray | float, cap: int) -> np.ndarray:
+    """Inverse-CDF Poisson draws, truncated at cap."""
+    lam = np.broadcast_to(np.asarray(lam, dtype=float), u.shape)
+    k = np.zeros(u.shape, dtype=np.int64)
+    term = np.exp(-lam)
+    cdf = term.copy()
+    for i in range(1, cap + 1):
+        k += u > cdf
+        term = term * lam / i
+        cdf = cdf + term
+    return k
+
+
+def zipf_rank(u: np.ndarray, n: int, s: float) -> np.ndarray:
+    """Bounded Zipf ranks in [1, n] by inverting the continuous power-law CDF."""
+    if abs(s - 1.0) < 1e-9:
+        ranks = np.floor(n ** u)
+    else:
+        ranks = np.floor((1 + u * (n ** (1 - s) - 1)) ** (1 / (1 - s)))
+    return np.clip(ranks, 1, n).astype(np.int64)
+
+
+def scatter_ids(ranks: np.ndarray, n: int) -> np.ndarray:
+    """Bijection rank -> id, so the busiest customers are not simply ids 1, 2, 3.
+
+    Consecutive ranks land a golden-ratio step apart; rank n takes id 1.
+    """
+    step = int(n * 0.6180339887) | 1
+    while np.gcd(step, n) != 1:
+        step += 2
+    return (ranks * step) % n + 1
+
+
+# ----------------------------------------------------------------------------
+# Tables
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StarSizes:
+    customers: int
+    products: int
+    orders: int
+
+    @classmethod
+    def at_scale(cls, scale: float) -> "StarSizes":
+        return cls(*(max(1, int(round(BASE_SIZES[t] * scale))) for t in ("customers", "products", "orders")))
+
+
+def customer_attributes(seed: int, ids: np.ndarray) -> Dict[str, object]:
+    return {
+        'customer_segment': _categorical(uniform(seed, "segment", ids), gen.segments, gen.segment_probs),
+        'region': _categorical(uniform(seed, "region", ids), gen.regions),
+        'customer_age': np.clip(40 + 12 * special.ndtri(uniform(seed, "age", ids)), 18, 90).astype(np.int64),
+        'signup_date': SIGNUP_START + (uniform(seed, "signup", ids) * 1096).astype('timedelta64[D]'),
+    }
+
+
+def product_attributes(seed: int, ids: np.ndarray) -> Dict[str, object]:
+    category = _categorical(uniform(seed, "category", ids), gen.categories)
+    multiplier = np.array([gen.category_multipliers.get(c, 1.0) for c in gen.categories])[category.codes]
+    # Lognormal list price with mean 40 x category multiplier
+    sigma = 0.6
+    price = 40 * multiplier * np.exp(sigma * special.ndtri(uniform(seed, "price", ids)) - sigma ** 2 / 2)
+    return {'product_category': category, 'list_price': price.round(2)}
+
+
+def customers_chunk(seed: int, start: int, stop: int) -> pd.DataFrame:
+    ids = np.arange(start + 1, stop + 1)
+    return pd.DataFrame({'customer_id': ids, **customer_attributes(seed, ids)})
+
+
+def products_chunk(seed: int, start: int, stop: int) -> pd.DataFrame:
+    ids = np.arange(start + 1, stop + 1)
+    return pd.DataFrame({'product_id': ids, **product_attributes(seed, ids)})
+
+
+def orders_chunk(seed: int, sizes: StarSizes, start: int, stop: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Orders start+1..stop and all of their lines, built together."""
+    order_ids = np.arange(start + 1, stop + 1)
+    customer_ids = scatter_ids(zipf_rank(uniform(seed, "customer", order_ids), sizes.customers, CUSTOMER_ZIPF),
+                               sizes.customers)
+    n_items = 1 + _poisson(uniform(seed, "lines", order_ids), LINES_LAM, MAX_LINES - 1)
+
+    # One row per order line; lines are keyed by order_id * MAX_LINES + line
+    line_order = np.repeat(order_ids, n_items)
+    first_line = np.cumsum(n_items) - n_items
+    line_number = np.arange(len(line_order)) - np.repeat(first_line, n_items) + 1
+    line_keys = line_order * MAX_LINES + line_number
+
+    product_ids = scatter_ids(zipf_rank(uniform(seed, "product", line_keys), sizes.products, PRODUCT_ZIPF),
+                              sizes.products)
+    segment = customer_attributes(seed, customer_ids)['customer_segment']
+    lam = np.array([SEGMENT_QUANTITY_LAM[s] for s in gen.segments])[segment.codes]
+    quantity = 1 + _poisson(uniform(seed, "quantity", line_keys), np.repeat(lam, n_items), 12)
+    unit_price = product_attributes(seed, product_ids)['list_price']
+    line_total = (unit_price * quantity).round(2)
+
+    items = pd.DataFrame({
+        'order_id': line_order,
+        'line_number': line_number,
+        'product_id': product_ids,
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'line_total': line_total,
+    })
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': customer_ids,
+        'order_date': ORDER_START + (uniform(seed, "date", order_ids) * 365).astype('timedelta64[D]'),
+        'n_items': n_items,
+        'order_total': np.bincount(line_order - start - 1, weights=line_total, minlength=len(order_ids)).round(2),
+    })
+    return orders, items
+
+
+# ----------------------------------------------------------------------------
+# Parallel writing
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StarTask:
+    source: str       # customers, products or orders (orders also yields order_items)
+    chunk_index: int
+    start: int
+    stop: int
+    seed: int
+    sizes: StarSizes
+    fmt: str
+
+
+def build_chunk(task: StarTask) -> Tuple[str, Dict[str, Tuple[int, object]]]:
+    """Worker entry point: build and encode one chunk of one (or two) tables."""
+    if task.source == "orders":
+        frames = dict(zip(("orders", "order_items"), orders_chunk(task.seed, task.sizes, task.start, task.stop)))
+    else:
+        build = customers_chunk if task.source == "customers" else products_chunk
+        frames = {task.source: build(task.seed, task.start, task.stop)}
+    first = task.chunk_index == 0
+    return task.source, {name: (len(df), gen.encode_chunk(apply_schema(df, SCHEMAS[name]), task.fmt, first))
+                         for name, df in frames.items()}
+
+
+def write_star(
+    out_dir: Path,
+    scale: float = 1.0,
+    chunk_rows: int = gen.DEFAULT_CHUNK_ROWS,
+    fmt: str = "csv",
+    workers: int = 1,
+    seed: int = gen.DEFAULT_SEED,
+) -> Dict[str, Tuple[Path, int]]:
+    """Write the four tables to out_dir; returns {table: (path, rows)}."""
+    sizes = StarSizes.at_scale(scale)
+    tasks = [
+        StarTask(source, i, start, stop, seed, sizes, fmt)
+        for source in ("customers", "products", "orders")
+        for i, (start, stop) in enumerate(gen.chunk_bounds(getattr(sizes, source), chunk_rows))
+    ]
+    written: Dict[str, Tuple[Path, int]] = {}
+    for _, group in groupby(ordered_map(build_chunk, tasks, workers), key=lambda r: r[0]):
+        writers: Dict[str, gen.ChunkWriter] = {}
+        rows: Dict[str, int] = {}
+        try:
+            for _, payloads in group:
+                for name, (n, payload) in payloads.items():
+                    if name not in writers:
+                        writers[name] = gen.ChunkWriter(out_dir / f"{name}{gen.FORMATS[fmt]}", fmt)
+                        rows[name] = 0
+                    writers[name].write(payload)
+                    rows[name] += n
+        finally:
+            for writer in writers.values():
+                writer.close()
+        written.update({name: (writers[name].path, rows[name]) for name in writers})
+    return written
+
+
+def check_integrity(written: Dict[str, Tuple[Path, int]]) -> List[str]:
+    """Key checks: unique primary keys, every foreign key present in its parent table."""
+    from dataset_schema import read_typed
+
+    customers = read_typed(written["customers"][0], columns=["customer_id"])["customer_id"]
+    products = read_typed(written["products"][0], columns=["product_id"])["product_id"]
+    orders = read_typed(written["orders"][0], columns=["order_id", "customer_id"])
+    items = read_typed(written["order_items"][0], columns=["order_id", "line_number", "product_id"])
+    problems = []
+    if not customers.is_unique:
+        problems.append("duplicate customer_id")
+    if not products.is_unique:
+        problems.append("duplicate product_id")
+    if not orders["order_id"].is_unique:
+        problems.append("duplicate order_id")
+    if items.duplicated(["order_id", "line_number"]).any():
+        problems.append("duplicate (order_id, line_number)")
+    if not orders["customer_id"].isin(customers).all():
+        problems.append("orders.customer_id not in customers")
+    if not items["product_id"].isin(products).all():
+        problems.append("order_items.product_id not in products")
+    if not items["order_id"].isin(orders["order_id"]).all():
+        problems.append("order_items.order_id not in orders")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the e-commerce star schema")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor (1: 5,000 customers, 500 products, 20,000 orders)")
+    parser.add_argument("--chunk-rows", type=int, default=gen.DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--format", choices=sorted(gen.FORMATS), default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=gen.DEFAULT_SEED)
+    parser.add_argument("--out-dir", default=None,
+                        help="Default: Class4/data/ecommerce_star (scale 1) or Class4/data/sf<scale>/ecommerce_star")
+    parser.add_argument("--check", action="store_true", help="Verify primary and foreign keys afterwards")
+    args = parser.parse_args()
+
+    if args.out_dir:
+        out_dir = Path(args.out_dir)
+    elif args.scale == 1:
+        out_dir = gen.DEFAULT_OUT_DIR / "ecommerce_star"
+    else:
+        out_dir = gen.DEFAULT_OUT_DIR / f"sf{args.scale:g}" / "ecommerce_star"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written = write_star(out_dir, args.scale, args.chunk_rows, args.format, args.workers, args.seed)
+    for name in TABLES:
+        path, rows = written[name]
+        print(f"Created: {path} ({rows:,} rows)")
+    if args.check:
+        problems = check_integrity(written)
+        if problems:
+            raise SystemExit("Key integrity check failed: " + "; ".join(problems))
+        print("✓ Primary and foreign keys are consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ from matplotlib.patches import FancyBboxPatch, Circle, Rectangle, FancyArrowPatc
 import warnings
 warnings.filterwarnings('ignore')
 
+from streaming_correlation import correlation, draw_correlation_heatmap
+from streaming_stats import Histogram, Moments, QuantileSketch, draw_boxplot, draw_histogram
+
 print("Generating EDA conceptual images...")
 print("="*70)
 
@@ -227,36 +230,36 @@ fig.suptitle('Common Distribution Shapes', fontsize=16, fontweight='bold')
 
 # Normal
 x_norm = np.random.normal(0, 1, 1000)
-axes[0, 0].hist(x_norm, bins=30, edgecolor='black', alpha=0.7, color='steelblue')
+draw_histogram(axes[0, 0], Histogram.of(x_norm, bins=30), edgecolor='black', alpha=0.7, color='steelblue')
 axes[0, 0].set_title('Normal (Gaussian)\nSymmetric, bell-shaped')
 axes[0, 0].set_ylabel('Frequency')
 
 # Right-skewed
 x_rskew = np.random.exponential(2, 1000)
-axes[0, 1].hist(x_rskew, bins=30, edgecolor='black', alpha=0.7, color='coral')
+draw_histogram(axes[0, 1], Histogram.of(x_rskew, bins=30), edgecolor='black', alpha=0.7, color='coral')
 axes[0, 1].set_title('Right-Skewed\nLong tail on right')
 
 # Left-skewed
 x_lskew = 10 - np.random.exponential(2, 1000)
-axes[0, 2].hist(x_lskew, bins=30, edgecolor='black', alpha=0.7, color='lightgreen')
+draw_histogram(axes[0, 2], Histogram.of(x_lskew, bins=30), edgecolor='black', alpha=0.7, color='lightgreen')
 axes[0, 2].set_title('Left-Skewed\nLong tail on left')
 
 # Bimodal
 x_bimodal = np.concatenate([np.random.normal(-2, 0.5, 500), np.random.normal(2, 0.5, 500)])
-axes[1, 0].hist(x_bimodal, bins=30, edgecolor='black', alpha=0.7, color='plum')
+draw_histogram(axes[1, 0], Histogram.of(x_bimodal, bins=30), edgecolor='black', alpha=0.7, color='plum')
 axes[1, 0].set_title('Bimodal\nTwo peaks')
 axes[1, 0].set_xlabel('Value')
 axes[1, 0].set_ylabel('Frequency')
 
 # Uniform
 x_uniform = np.random.uniform(0, 10, 1000)
-axes[1, 1].hist(x_uniform, bins=30, edgecolor='black', alpha=0.7, color='gold')
+draw_histogram(axes[1, 1], Histogram.of(x_uniform, bins=30), edgecolor='black', alpha=0.7, color='gold')
 axes[1, 1].set_title('Uniform\nFlat distribution')
 axes[1, 1].set_xlabel('Value')
 
 # Long-tailed
 x_longtail = np.random.pareto(1.5, 1000)
-axes[1, 2].hist(x_longtail, bins=30, edgecolor='black', alpha=0.7, color='lightcoral')
+draw_histogram(axes[1, 2], Histogram.of(x_longtail, bins=30), edgecolor='black', alpha=0.7, color='lightcoral')
 axes[1, 2].set_title('Long-Tailed\nHeavy tails, outliers')
 axes[1, 2].set_xlabel('Value')
 
@@ -328,13 +331,14 @@ print("\n7. Creating Univariate Numeric Example...")
 
 np.random.seed(42)
 price = np.random.lognormal(12, 0.5, 1000)
+price_moments = Moments.of(price)
 
 fig, axes = plt.subplots(2, 2, figsize=(12, 10))
 fig.suptitle('Univariate Analysis: House Prices', fontsize=16, fontweight='bold')
 
 # Histogram with mean and median
 axes[0, 0].hist(price, bins=50, edgecolor='black', alpha=0.7, color='steelblue')
-axes[0, 0].axvline(price.mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: ${price.mean()/1000:.0f}K')
+axes[0, 0].axvline(price_moments.mean, color='red', linestyle='--', linewidth=2, label=f'Mean: ${price_moments.mean/1000:.0f}K')
 axes[0, 0].axvline(np.median(price), color='green', linestyle='--', linewidth=2, label=f'Median: ${np.median(price)/1000:.0f}K')
 axes[0, 0].set_title('Histogram with Central Tendency')
 axes[0, 0].set_xlabel('Price ($)')
@@ -343,7 +347,7 @@ axes[0, 0].legend()
 
 # Box plot
 axes[0, 1].boxplot(price, vert=True)
-axes[0, 1].set_title(f'Box Plot\nSkewness: {stats.skew(price):.2f}')
+axes[0, 1].set_title(f'Box Plot\nSkewness: {price_moments.skewness:.2f}')
 axes[0, 1].set_ylabel('Price ($)')
 
 # KDE
@@ -379,26 +383,26 @@ fig, axes = plt.subplots(2, 2, figsize=(12, 10))
 fig.suptitle('Transforming Skewed Data', fontsize=16, fontweight='bold')
 
 # Original
-axes[0, 0].hist(data_skewed, bins=30, edgecolor='black', alpha=0.7, color='coral')
-axes[0, 0].set_title(f'Original\nSkewness: {stats.skew(data_skewed):.2f}')
+draw_histogram(axes[0, 0], Histogram.of(data_skewed, bins=30), edgecolor='black', alpha=0.7, color='coral')
+axes[0, 0].set_title(f'Original\nSkewness: {Moments.of(data_skewed).skewness:.2f}')
 axes[0, 0].set_ylabel('Frequency')
 
 # Log transform
 data_log = np.log(data_skewed + 1)
-axes[0, 1].hist(data_log, bins=30, edgecolor='black', alpha=0.7, color='steelblue')
-axes[0, 1].set_title(f'Log Transform\nSkewness: {stats.skew(data_log):.2f}')
+draw_histogram(axes[0, 1], Histogram.of(data_log, bins=30), edgecolor='black', alpha=0.7, color='steelblue')
+axes[0, 1].set_title(f'Log Transform\nSkewness: {Moments.of(data_log).skewness:.2f}')
 
 # Square root
 data_sqrt = np.sqrt(data_skewed)
-axes[1, 0].hist(data_sqrt, bins=30, edgecolor='black', alpha=0.7, color='lightgreen')
-axes[1, 0].set_title(f'Square Root Transform\nSkewness: {stats.skew(data_sqrt):.2f}')
+draw_histogram(axes[1, 0], Histogram.of(data_sqrt, bins=30), edgecolor='black', alpha=0.7, color='lightgreen')
+axes[1, 0].set_title(f'Square Root Transform\nSkewness: {Moments.of(data_sqrt).skewness:.2f}')
 axes[1, 0].set_xlabel('Transformed Value')
 axes[1, 0].set_ylabel('Frequency')
 
 # Box-Cox
 data_boxcox, lambda_param = stats.boxcox(data_skewed + 1)
-axes[1, 1].hist(data_boxcox, bins=30, edgecolor='black', alpha=0.7, color='plum')
-axes[1, 1].set_title(f'Box-Cox Transform\nλ={lambda_param:.2f}, Skew: {stats.skew(data_boxcox):.2f}')
+draw_histogram(axes[1, 1], Histogram.of(data_boxcox, bins=30), edgecolor='black', alpha=0.7, color='plum')
+axes[1, 1].set_title(f'Box-Cox Transform\nλ={lambda_param:.2f}, Skew: {Moments.of(data_boxcox).skewness:.2f}')
 axes[1, 1].set_xlabel('Transformed Value')
 
 plt.tight_layout()
@@ -453,12 +457,12 @@ data_with_outliers = np.concatenate([np.random.normal(50, 10, 950),
 fig, axes = plt.subplots(2, 3, figsize=(15, 10))
 fig.suptitle('Outlier Detection Methods', fontsize=16, fontweight='bold')
 
-# Box plot
-axes[0, 0].boxplot(data_with_outliers, vert=True)
+# Box plot (quartiles and whiskers from a quantile sketch)
+outlier_sketch = QuantileSketch.of(data_with_outliers)
+draw_boxplot(axes[0, 0], [outlier_sketch])
 axes[0, 0].set_title('Box Plot (IQR Method)')
 axes[0, 0].set_ylabel('Value')
-Q1 = np.percentile(data_with_outliers, 25)
-Q3 = np.percentile(data_with_outliers, 75)
+Q1, Q3 = outlier_sketch.quantiles([0.25, 0.75])
 IQR = Q3 - Q1
 axes[0, 0].text(0.6, Q3 + 1.5*IQR, f'Upper: {Q3 + 1.5*IQR:.0f}', fontsize=8)
 
@@ -470,7 +474,8 @@ axes[0, 1].set_title('Histogram with IQR Bounds')
 axes[0, 1].legend(fontsize=8)
 
 # Z-score
-z_scores = np.abs((data_with_outliers - data_with_outliers.mean()) / data_with_outliers.std())
+outlier_moments = Moments.of(data_with_outliers)
+z_scores = np.abs((data_with_outliers - outlier_moments.mean) / outlier_moments.std(ddof=0))
 axes[0, 2].scatter(range(len(z_scores)), z_scores, alpha=0.5, s=10)
 axes[0, 2].axhline(3, color='red', linestyle='--', label='|z| = 3')
 axes[0, 2].set_title('Z-Score Method')
@@ -479,8 +484,7 @@ axes[0, 2].legend()
 
 # Percentile
 axes[1, 0].hist(data_with_outliers, bins=30, alpha=0.7, edgecolor='black')
-p1 = np.percentile(data_with_outliers, 1)
-p99 = np.percentile(data_with_outliers, 99)
+p1, p99 = outlier_sketch.quantiles([0.01, 0.99])
 axes[1, 0].axvline(p1, color='red', linestyle='--', linewidth=2)
 axes[1, 0].axvline(p99, color='red', linestyle='--', linewidth=2)
 axes[1, 0].set_title('Percentile Method (1%, 99%)')
@@ -842,23 +846,17 @@ data_corr['price'] = data_corr['sqft'] * 0.15 + data_corr['bedrooms'] * 20 - dat
 fig, axes = plt.subplots(1, 3, figsize=(18, 5))
 fig.suptitle('Correlation Heatmap Best Practices', fontsize=16, fontweight='bold')
 
-# Basic heatmap
-corr = data_corr.corr()
-sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
-            square=True, linewidths=1, ax=axes[0])
+# Basic heatmap (chunked co-moment engine, same numbers as data_corr.corr())
+corr = correlation(data_corr)
+draw_correlation_heatmap(axes[0], corr, annot=True)
 axes[0].set_title('Basic Heatmap')
 
 # Lower triangle only
-mask = np.triu(np.ones_like(corr, dtype=bool))
-sns.heatmap(corr, mask=mask, annot=True, fmt='.2f', cmap='coolwarm', 
-            center=0, square=True, linewidths=1, ax=axes[1])
+draw_correlation_heatmap(axes[1], corr, triangle=True, annot=True)
 axes[1].set_title('Lower Triangle\n(Removes redundancy)')
 
 # Strong correlations only
-corr_filtered = corr.copy()
-corr_filtered[abs(corr) < 0.5] = 0
-sns.heatmap(corr_filtered, annot=True, fmt='.2f', cmap='coolwarm', 
-            center=0, square=True, linewidths=1, ax=axes[2])
+draw_correlation_heatmap(axes[2], corr, min_abs=0.5, annot=True)
 axes[2].set_title('Strong Correlations\n(|r| > 0.5)')
 
 plt.tight_layout()
@@ -1223,7 +1221,7 @@ fig, axes = plt.subplots(2, 3, figsize=(15, 10))
 fig.suptitle('Comparing Imputation Methods', fontsize=16, fontweight='bold')
 
 # Original (with missing)
-axes[0, 0].hist(original_data, bins=30, alpha=0.7, color='steelblue', edgecolor='black')
+draw_histogram(axes[0, 0], Histogram.of(original_data, bins=30), alpha=0.7, color='steelblue', edgecolor='black')
 axes[0, 0].axvline(np.mean(original_data), color='red', linestyle='--', linewidth=2, label='True mean')
 axes[0, 0].set_title(f'Original (Complete)\nMean: {np.mean(original_data):.1f}')
 axes[0, 0].legend()
@@ -1231,14 +1229,14 @@ axes[0, 0].legend()
 # Mean imputation
 data_mean = data_with_missing.copy()
 data_mean[missing_idx] = np.nanmean(data_mean)
-axes[0, 1].hist(data_mean, bins=30, alpha=0.7, color='coral', edgecolor='black')
+draw_histogram(axes[0, 1], Histogram.of(data_mean, bins=30), alpha=0.7, color='coral', edgecolor='black')
 axes[0, 1].axvline(np.mean(data_mean), color='red', linestyle='--', linewidth=2)
 axes[0, 1].set_title(f'Mean Imputation\nMean: {np.mean(data_mean):.1f}\n⚠️ Reduces variance')
 
 # Median imputation
 data_median = data_with_missing.copy()
 data_median[missing_idx] = np.nanmedian(data_median)
-axes[0, 2].hist(data_median, bins=30, alpha=0.7, color='lightgreen', edgecolor='black')
+draw_histogram(axes[0, 2], Histogram.of(data_median, bins=30), alpha=0.7, color='lightgreen', edgecolor='black')
 axes[0, 2].axvline(np.mean(data_median), color='red', linestyle='--', linewidth=2)
 axes[0, 2].set_title(f'Median Imputation\nMean: {np.mean(data_median):.1f}')
 
@@ -1246,7 +1244,7 @@ axes[0, 2].set_title(f'Median Imputation\nMean: {np.mean(data_median):.1f}')
 data_random = data_with_missing.copy()
 observed_values = data_random[~np.isnan(data_random)]
 data_random[missing_idx] = np.random.choice(observed_values, len(missing_idx))
-axes[1, 0].hist(data_random, bins=30, alpha=0.7, color='plum', edgecolor='black')
+draw_histogram(axes[1, 0], Histogram.of(data_random, bins=30), alpha=0.7, color='plum', edgecolor='black')
 axes[1, 0].axvline(np.mean(data_random), color='red', linestyle='--', linewidth=2)
 axes[1, 0].set_title(f'Random Sampling\nMean: {np.mean(data_random):.1f}\n✅ Preserves distribution')
 
@@ -1260,7 +1258,7 @@ for idx in missing_idx:
     valid_values = data_knn[valid_idx]
     nearest = np.argsort(valid_distances)[:5]
     data_knn[idx] = np.mean(valid_values[nearest])
-axes[1, 1].hist(data_knn, bins=30, alpha=0.7, color='gold', edgecolor='black')
+draw_histogram(axes[1, 1], Histogram.of(data_knn, bins=30), alpha=0.7, color='gold', edgecolor='black')
 axes[1, 1].axvline(np.mean(data_knn), color='red', linestyle='--', linewidth=2)
 axes[1, 1].set_title(f'KNN-like Imputation\nMean: {np.mean(data_knn):.1f}\n✅ Uses local patterns')
 
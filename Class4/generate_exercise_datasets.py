@@ -1,43 +1,112 @@
 """
 Generate all datasets for Class 4 Exercises
 Creates 9 CSV files with realistic synthetic data
+
+Every dataset is produced in fixed-size chunks and streamed to disk, so peak
+memory depends on --chunk-rows, not on the number of rows written. --scale is
+a TPC-style scale factor: every dataset grows proportionally (1 reproduces the
+course data sizes, 100 gives 100x the rows, ...).
+
+Each chunk draws from its own SeedSequence stream (keyed by dataset and chunk
+number), so chunks are generated on a process pool (see parallel.py) and the
+output is byte-identical whatever --workers is. --rng philox switches to
+counter-based streams keyed by (dataset, block of rows), so any row range can
+be generated on its own, e.g. to split one huge table across machines with
+--rows.
+
+The nine datasets are declarative specs (see dataset_spec.py) compiled to
+vectorized chunk builders; --spec adds more datasets from JSON/YAML files.
+
+--zip / --tar-zst stream the CSVs into DataSet.zip / DataSet.tar.zst as they
+are generated; workers compress their own chunks (see dataset_archive.py), so
+nothing is read back from disk. --archive-only skips the loose CSV files
+(--validate and --stats then read the members back out of the zip, so they
+need --zip; a .tar.zst alone cannot be read back member by member).
+
+Each run records <out_dir>/manifest.json (spec hash, seed, rows, checksum,
+generation time per dataset; see dataset_manifest.py). Datasets whose spec
+and parameters are unchanged are skipped on the next run; --force rebuilds all.
+--validate then checks every written dataset against its intended statistics
+in one streaming pass (see dataset_validate.py), and --stats writes summary
+sidecars (<name>.stats.json/.stats.parquet, see dataset_stats.py).
+
+Usage:
+  python Class4/generate_exercise_datasets.py
+  python Class4/generate_exercise_datasets.py --scale 100 --format parquet --workers 8
+  python Class4/generate_exercise_datasets.py --format feather
+  python Class4/generate_exercise_datasets.py --scale 100 --format parquet --partition
+  python Class4/generate_exercise_datasets.py --scale 1000 --datasets ecommerce_full --rows 40000000 41000000
+  python Class4/generate_exercise_datasets.py --zip
+
+Outputs:
+  Class4/data/*.csv (scale 1) or Class4/data/sf<scale>/* (other scales)
+  Class4/data/DataSet.zip, DataSet.tar.zst (with --zip / --tar-zst)
+  Class4/data/*.stats.json, *.stats.parquet (with --stats)
 """
 
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import time
+import zipfile
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 
-# Set random seed for reproducibility
-np.random.seed(42)
-
-# Create data directory if it doesn't exist
-import os
-os.makedirs('data', exist_ok=True)
+from dataset_archive import ArchiveOptions, DatasetArchives, pack_chunk
+from dataset_manifest import is_current, load_manifest, make_entry, save_manifest, spec_hash
+from dataset_schema import SCHEMAS
+from dataset_spec import compile_spec, load_spec, parse_step
+from parallel import chunk_seed, ordered_map
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_OUT_DIR = BASE_DIR / "data"
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_SEED = 42
+# "seedseq": one SeedSequence stream per chunk (output depends on --chunk-rows).
+# "philox": counter-based streams per block of rows, so any row range can be
+# generated on its own and output does not depend on --chunk-rows.
+RNG_MODES = ("seedseq", "philox")
+PHILOX_BLOCK_ROWS = 65_536
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+COLUMNAR_FORMATS = {"parquet", "feather"}
+# Parquet and Arrow IPC (Feather v2) are written zstd-compressed
+COLUMNAR_COMPRESSION = "zstd"
+
+# Hive-style partition keys (--partition). customer_transactions has no
+# region column, so it is partitioned by month only.
+PARTITION_COLUMNS = {
+    'customer_transactions': ['month'],
+    'ecommerce_full': ['region', 'month'],
+}
 
-print("Generating datasets for Class 4 exercises...")
-print("="*60)
 
 # ============================================================================
 # DATASET 1: Student Scores (Easy - Exercise 1)
 # ============================================================================
-print("\n1. Generating student_scores.csv...")
 
-n_students = 200
-student_scores = pd.DataFrame({
-    'student_id': range(1, n_students + 1),
-    'exam_score': np.random.normal(75, 12, n_students).clip(40, 100).round(1)
-})
-
-student_scores.to_csv('data/student_scores.csv', index=False)
-print(f"   ✓ Created: {len(student_scores)} students, mean={student_scores['exam_score'].mean():.1f}")
+STUDENT_SCORES = {
+    'name': 'student_scores',
+    'rows': 200,
+    'description': "students",
+    'columns': {
+        'student_id': {'kind': 'id'},
+        'exam_score': {'dist': 'normal', 'loc': 75, 'scale': 12, 'clip': [40, 100], 'round': 1},
+    },
+}
 
 # ============================================================================
 # DATASET 2: Employee Salaries (Easy - Exercise 2)
 # ============================================================================
-print("\n2. Generating employee_salaries.csv...")
 
 departments = ['Engineering', 'Sales', 'Marketing', 'HR']
-n_employees = 500
 
 # Different salary distributions by department
 dept_salaries = {
@@ -47,148 +116,123 @@ dept_salaries = {
     'HR': (65000, 12000)
 }
 
-emp_data = []
-emp_id = 1
-
-for dept in departments:
-    n_dept = n_employees // len(departments)
-    mean_sal, std_sal = dept_salaries[dept]
-    
-    salaries = np.random.normal(mean_sal, std_sal, n_dept).clip(40000, 200000)
-    years_exp = np.random.exponential(5, n_dept).clip(0, 30)
-    
-    for i in range(n_dept):
-        emp_data.append({
-            'employee_id': emp_id,
-            'department': dept,
-            'salary': round(salaries[i], 2),
-            'years_experience': round(years_exp[i], 1)
-        })
-        emp_id += 1
-
-employee_salaries = pd.DataFrame(emp_data)
-employee_salaries.to_csv('data/employee_salaries.csv', index=False)
-print(f"   ✓ Created: {len(employee_salaries)} employees across {len(departments)} departments")
+EMPLOYEE_SALARIES = {
+    'name': 'employee_salaries',
+    'rows': 500,
+    'description': "employees across 4 departments",
+    'columns': {
+        'employee_id': {'kind': 'id'},
+        # Employees are laid out in equal, contiguous department blocks
+        'department': {'kind': 'blocks', 'values': departments},
+        'salary': {
+            'dist': 'normal',
+            'loc': {'map': 'department', 'values': {d: m for d, (m, _) in dept_salaries.items()}},
+            'scale': {'map': 'department', 'values': {d: s for d, (_, s) in dept_salaries.items()}},
+            'clip': [40000, 200000], 'round': 2,
+        },
+        'years_experience': {'dist': 'exponential', 'scale': 5, 'clip': [0, 30], 'round': 1},
+    },
+}
 
 # ============================================================================
 # DATASET 3: House Simple (Easy - Exercise 3)
 # ============================================================================
-print("\n3. Generating house_simple.csv...")
 
-n_houses = 300
-sqft = np.random.normal(2000, 600, n_houses).clip(800, 5000)
-# Price correlates with sqft with some noise
-price = 150000 + (sqft * 150) + np.random.normal(0, 40000, n_houses)
-price = price.clip(100000, 1500000)
-
-house_simple = pd.DataFrame({
-    'house_id': range(1, n_houses + 1),
-    'sqft': sqft.round(0).astype(int),
-    'price': price.round(0).astype(int)
-})
-
-house_simple.to_csv('data/house_simple.csv', index=False)
-correlation = house_simple['sqft'].corr(house_simple['price'])
-print(f"   ✓ Created: {len(house_simple)} houses, correlation={correlation:.3f}")
+HOUSE_SIMPLE = {
+    'name': 'house_simple',
+    'rows': 300,
+    'description': "houses",
+    'columns': {
+        'house_id': {'kind': 'id'},
+        'sqft': {'dist': 'normal', 'loc': 2000, 'scale': 600, 'clip': [800, 5000],
+                 'round': 0, 'dtype': 'int'},
+        # Price correlates with sqft with some noise
+        'price': {'linear': {'sqft': 150}, 'intercept': 150000,
+                  'noise': {'dist': 'normal', 'loc': 0, 'scale': 40000},
+                  'clip': [100000, 1500000], 'round': 0, 'dtype': 'int'},
+    },
+}
 
 # ============================================================================
 # DATASET 4: Customer Transactions (Medium - Exercise 4)
 # ============================================================================
-print("\n4. Generating customer_transactions.csv...")
 
-n_transactions = 10000
-# Create right-skewed distribution
-amounts = np.random.lognormal(3.5, 1.2, n_transactions)
-
-categories = ['Electronics', 'Clothing', 'Home', 'Books']
+transaction_categories = ['Electronics', 'Clothing', 'Home', 'Books']
 customer_types = ['New', 'Regular', 'Premium']
 
-transactions = pd.DataFrame({
-    'transaction_id': range(1, n_transactions + 1),
-    'amount': amounts.round(2),
-    'date': [datetime(2023, 1, 1) + timedelta(days=int(x)) 
-             for x in np.random.uniform(0, 365, n_transactions)],
-    'category': np.random.choice(categories, n_transactions),
-    'customer_type': np.random.choice(customer_types, n_transactions, 
-                                     p=[0.3, 0.5, 0.2])
-})
-
-transactions.to_csv('data/customer_transactions.csv', index=False)
-print(f"   ✓ Created: {len(transactions)} transactions, skewness={transactions['amount'].skew():.2f}")
+CUSTOMER_TRANSACTIONS = {
+    'name': 'customer_transactions',
+    'rows': 10000,
+    'description': "transactions",
+    'columns': {
+        'transaction_id': {'kind': 'id'},
+        # Create right-skewed distribution
+        'amount': {'dist': 'lognormal', 'mean': 3.5, 'sigma': 1.2, 'round': 2},
+        'date': {'kind': 'date', 'start': '2023-01-01',
+                 'days': {'dist': 'integers', 'low': 0, 'high': 365}},
+        'category': {'dist': 'categorical', 'values': transaction_categories},
+        'customer_type': {'dist': 'categorical', 'values': customer_types, 'p': [0.3, 0.5, 0.2]},
+    },
+}
 
 # ============================================================================
 # DATASET 5: Real Estate (Medium - Exercise 5)
 # ============================================================================
-print("\n5. Generating real_estate.csv...")
-
-n_properties = 1000
-
-# Create correlated features
-sqft = np.random.normal(2200, 700, n_properties).clip(800, 6000)
-bedrooms = (sqft / 500 + np.random.normal(0, 0.5, n_properties)).clip(1, 7).round(0)
-bathrooms = (bedrooms * 0.75 + np.random.normal(0, 0.3, n_properties)).clip(1, 5).round(1)
-age = np.random.exponential(15, n_properties).clip(0, 100).round(0)
-lot_size = np.random.gamma(3, 0.15, n_properties).clip(0.05, 2).round(2)
-garage_spaces = np.random.choice([0, 1, 2, 3], n_properties, p=[0.1, 0.3, 0.5, 0.1])
-distance_to_city = np.random.gamma(2, 3, n_properties).clip(0.5, 50).round(1)
-crime_rate = np.random.beta(2, 5, n_properties) * 100
-school_rating = np.random.normal(6.5, 1.5, n_properties).clip(1, 10).round(1)
-condition_score = np.random.normal(7, 1.5, n_properties).clip(1, 10).round(1)
-renovation_year = np.where(
-    np.random.random(n_properties) < 0.3,
-    np.random.randint(1990, 2024, n_properties),
-    0
-)
-
-# Price based on multiple factors
-price = (
-    100000 + 
-    sqft * 120 + 
-    bedrooms * 15000 + 
-    bathrooms * 10000 - 
-    age * 1000 + 
-    lot_size * 50000 +
-    garage_spaces * 8000 -
-    distance_to_city * 2000 -
-    crime_rate * 500 +
-    school_rating * 5000 +
-    condition_score * 8000 +
-    np.random.normal(0, 30000, n_properties)
-)
-price = price.clip(80000, 1000000)
-
-real_estate = pd.DataFrame({
-    'price': price.round(0).astype(int),
-    'sqft': sqft.round(0).astype(int),
-    'bedrooms': bedrooms.astype(int),
-    'bathrooms': bathrooms,
-    'age': age.astype(int),
-    'lot_size': lot_size,
-    'garage_spaces': garage_spaces,
-    'distance_to_city': distance_to_city,
-    'crime_rate': crime_rate.round(2),
-    'school_rating': school_rating,
-    'condition_score': condition_score,
-    'renovation_year': renovation_year.astype(int)
-})
-
-real_estate.to_csv('data/real_estate.csv', index=False)
-print(f"   ✓ Created: {len(real_estate)} properties with 12 features")
+
+def _normal(loc, scale):
+    return {'dist': 'normal', 'loc': loc, 'scale': scale}
+
+
+REAL_ESTATE = {
+    'name': 'real_estate',
+    'rows': 1000,
+    'description': "properties with 12 features",
+    # Create correlated features
+    'columns': {
+        'sqft': {**_normal(2200, 700), 'clip': [800, 6000], 'round': 0, 'dtype': 'int'},
+        'bedrooms': {'linear': {'sqft': 1 / 500}, 'noise': _normal(0, 0.5),
+                     'clip': [1, 7], 'round': 0, 'dtype': 'int'},
+        'bathrooms': {'linear': {'bedrooms': 0.75}, 'noise': _normal(0, 0.3),
+                      'clip': [1, 5], 'round': 1},
+        'age': {'dist': 'exponential', 'scale': 15, 'clip': [0, 100], 'round': 0, 'dtype': 'int'},
+        'lot_size': {'dist': 'gamma', 'shape': 3, 'scale': 0.15, 'clip': [0.05, 2], 'round': 2},
+        'garage_spaces': {'dist': 'categorical', 'values': [0, 1, 2, 3], 'p': [0.1, 0.3, 0.5, 0.1]},
+        'distance_to_city': {'dist': 'gamma', 'shape': 2, 'scale': 3, 'clip': [0.5, 50], 'round': 1},
+        'crime_rate': {'dist': 'beta', 'a': 2, 'b': 5, 'multiply': 100, 'round': 2},
+        'school_rating': {**_normal(6.5, 1.5), 'clip': [1, 10], 'round': 1},
+        'condition_score': {**_normal(7, 1.5), 'clip': [1, 10], 'round': 1},
+        # 30% of homes were renovated, the rest report 0
+        'renovation_year': {'dist': 'integers', 'low': 1990, 'high': 2024,
+                            'inflate': {'prob': 0.7, 'value': 0}},
+        # Price based on multiple factors
+        'price': {
+            'linear': {
+                'sqft': 120,
+                'bedrooms': 15000,
+                'bathrooms': 10000,
+                'age': -1000,
+                'lot_size': 50000,
+                'garage_spaces': 8000,
+                'distance_to_city': -2000,
+                'crime_rate': -500,
+                'school_rating': 5000,
+                'condition_score': 8000,
+            },
+            'intercept': 100000,
+            'noise': _normal(0, 30000),
+            'clip': [80000, 1000000], 'round': 0, 'dtype': 'int',
+        },
+    },
+    'output': ['price', 'sqft', 'bedrooms', 'bathrooms', 'age', 'lot_size', 'garage_spaces',
+               'distance_to_city', 'crime_rate', 'school_rating', 'condition_score', 'renovation_year'],
+}
 
 # ============================================================================
 # DATASET 6: Daily Sales (Medium - Exercise 6)
 # ============================================================================
-print("\n6. Generating daily_sales.csv...")
-
-days = 730  # 2 years
-start_date = datetime(2022, 1, 1)
 
-dates = [start_date + timedelta(days=i) for i in range(days)]
-day_names = [d.strftime('%A') for d in dates]
-
-# Base sales with trend, seasonality, and day-of-week effects
-trend = np.linspace(50000, 60000, days)
-seasonal = 5000 * np.sin(np.linspace(0, 4*np.pi, days))  # 2-year cycle
+SALES_BASE_DAYS = 730  # 2 years at scale 1
+SALES_BASE_HOLIDAYS = 15
 
 day_effects = {
     'Monday': 0.95,
@@ -200,85 +244,114 @@ day_effects = {
     'Sunday': 0.85
 }
 
-daily_sales = trend + seasonal + np.random.normal(0, 3000, days)
-
-# Apply day-of-week effects
-for i, day in enumerate(day_names):
-    daily_sales[i] *= day_effects[day]
-
-# Add holiday effects
-holidays = np.random.choice(range(days), 15, replace=False)
-is_holiday = np.zeros(days, dtype=bool)
-is_holiday[holidays] = True
-daily_sales[holidays] *= 1.3
-
-daily_sales = daily_sales.clip(20000, 100000).round(2)
-
-sales_df = pd.DataFrame({
-    'date': dates,
-    'daily_sales': daily_sales,
-    'day_of_week': day_names,
-    'is_holiday': is_holiday
-})
+DAILY_SALES = {
+    'name': 'daily_sales',
+    'rows': SALES_BASE_DAYS,
+    'description': "days with seasonal patterns",
+    'columns': {
+        'date': {'kind': 'date', 'start': '2022-01-01', 'days': '_row'},
+        'day_of_week': {'kind': 'weekday', 'of': 'date'},
+        # Same holiday density as the 2-year base series, at any scale
+        'is_holiday': {'dist': 'bernoulli', 'p': SALES_BASE_HOLIDAYS / SALES_BASE_DAYS, 'exact': True},
+        # Base sales with trend, seasonality, and day-of-week effects. The
+        # trend spans the whole series; the sine keeps its yearly period.
+        'daily_sales': {
+            'product': [
+                {'sum': [
+                    {'linear': {'_row_fraction': 10000}, 'intercept': 50000, 'noise': _normal(0, 3000)},
+                    {'sine': '_row', 'amplitude': 5000, 'period': (SALES_BASE_DAYS - 1) / 2},
+                ]},
+                {'map': 'day_of_week', 'values': day_effects},
+                {'map': 'is_holiday', 'values': {True: 1.3, False: 1.0}},
+            ],
+            'clip': [20000, 100000], 'round': 2,
+        },
+    },
+    'output': ['date', 'daily_sales', 'day_of_week', 'is_holiday'],
+}
 
-sales_df.to_csv('data/daily_sales.csv', index=False)
-print(f"   ✓ Created: {len(sales_df)} days with seasonal patterns and {is_holiday.sum()} holidays")
+SALES_NOISE_SIGMA = 0.5  # lognormal noise per high-frequency period
+
+
+def sales_timeseries_spec(step: str = '1m', years: float = 2.0) -> Dict[str, Any]:
+    """daily_sales at minute/second resolution: 'sales' is the amount sold in each period.
+
+    Same trend, yearly sine, day-of-week multipliers and holiday bump as
+    daily_sales, divided evenly over the periods of a day, times mean-one
+    lognormal noise. Timestamps are start + row * step, so any chunk is
+    computed on its own with datetime64 arithmetic; holidays are a per-day
+    hash, so all periods of a holiday agree.
+    """
+    per_day = int(np.timedelta64(1, 'D') / parse_step(step))
+    if per_day < 1:
+        raise ValueError(f"Step {step!r} is longer than a day; use daily_sales instead")
+    rows = int(round(years * 365 * per_day))
+    return {
+        'name': f'sales_{step}',
+        'rows': rows,
+        'description': f"{step} sales periods over {years:g} years",
+        'columns': {
+            'timestamp': {'kind': 'timestamp', 'start': '2022-01-01', 'step': step},
+            'day_of_week': {'kind': 'weekday', 'of': 'timestamp'},
+            'is_holiday': {'kind': 'day_flag', 'of': 'timestamp',
+                           'p': SALES_BASE_HOLIDAYS / SALES_BASE_DAYS, 'key': 6},
+            'sales': {
+                'product': [
+                    {'sum': [
+                        {'linear': {'_row_fraction': 10000}, 'intercept': 50000},
+                        {'sine': '_row', 'amplitude': 5000, 'period': (SALES_BASE_DAYS - 1) / 2 * per_day},
+                    ]},
+                    {'map': 'day_of_week', 'values': day_effects},
+                    {'map': 'is_holiday', 'values': {True: 1.3, False: 1.0}},
+                    {'dist': 'lognormal', 'mean': -SALES_NOISE_SIGMA ** 2 / 2, 'sigma': SALES_NOISE_SIGMA},
+                    1 / per_day,
+                ],
+                'clip': [0, None], 'round': 4,
+            },
+        },
+        'output': ['timestamp', 'sales', 'day_of_week', 'is_holiday'],
+        'schema': {'timestamp': 'datetime64[s]', 'sales': 'float32',
+                   'day_of_week': 'category', 'is_holiday': 'bool'},
+    }
 
 # ============================================================================
 # DATASET 7: Customer Survey (Hard - Exercise 7)
 # ============================================================================
-print("\n7. Generating customer_survey.csv...")
 
-n_respondents = 5000
-
-# Demographics
-age = np.random.normal(45, 15, n_respondents).clip(18, 90).round(0)
-income = np.random.lognormal(11, 0.6, n_respondents).clip(20000, 300000).round(0)
-education = np.random.choice(['High School', 'Bachelor', 'Master', 'PhD'], 
-                             n_respondents, p=[0.3, 0.4, 0.25, 0.05])
-
-survey_data = {
-    'respondent_id': range(1, n_respondents + 1),
-    'age': age,
-    'income': income,
-    'education': education
-}
-
-# Add 20 survey questions (1-5 scale)
-for q in range(1, 21):
-    responses = np.random.choice([1, 2, 3, 4, 5], n_respondents, 
-                                 p=[0.05, 0.15, 0.4, 0.3, 0.1])
-    survey_data[f'q{q}'] = responses
-
-survey_df = pd.DataFrame(survey_data)
-
-# Introduce structured missingness (MAR pattern)
-# Higher income people less likely to report income
-income_missing_prob = 1 / (1 + np.exp((income - 100000) / 30000))
-income_missing = np.random.random(n_respondents) < income_missing_prob
-survey_df.loc[income_missing, 'income'] = np.nan
+education_levels = ['High School', 'Bachelor', 'Master', 'PhD']
+likert = {'dist': 'categorical', 'values': [1, 2, 3, 4, 5], 'p': [0.05, 0.15, 0.4, 0.3, 0.1],
+          'dtype': 'int8'}
 
+survey_questions = {f'q{q}': dict(likert) for q in range(1, 21)}
 # Older people skip some questions
 for q in [15, 16, 17, 18]:
-    age_missing_prob = (age - 18) / 100
-    age_missing = np.random.random(n_respondents) < age_missing_prob
-    survey_df.loc[age_missing, f'q{q}'] = np.nan
-
+    survey_questions[f'q{q}']['missing'] = {'prob': {'linear': {'age': 1 / 100}, 'intercept': -18 / 100}}
 # Random missingness for other questions (MCAR)
 for q in [5, 10]:
-    random_missing = np.random.random(n_respondents) < 0.05
-    survey_df.loc[random_missing, f'q{q}'] = np.nan
-
-survey_df.to_csv('data/customer_survey.csv', index=False)
-missing_pct = survey_df.isnull().sum().sum() / (survey_df.shape[0] * survey_df.shape[1]) * 100
-print(f"   ✓ Created: {len(survey_df)} respondents, {missing_pct:.1f}% missing data (structured)")
+    survey_questions[f'q{q}']['missing'] = {'prob': 0.05}
+
+CUSTOMER_SURVEY = {
+    'name': 'customer_survey',
+    'rows': 5000,
+    'description': "respondents with structured missingness",
+    'columns': {
+        'respondent_id': {'kind': 'id'},
+        # Demographics
+        'age': {**_normal(45, 15), 'clip': [18, 90], 'round': 0},
+        # Higher income people less likely to report income:
+        # P(missing) = 1 / (1 + exp((income - 100000) / 30000))
+        'income': {'dist': 'lognormal', 'mean': 11, 'sigma': 0.6, 'clip': [20000, 300000], 'round': 0,
+                   'missing': {'prob': {'linear': {'income': -1 / 30000}, 'intercept': 100000 / 30000,
+                                        'link': 'logistic'}}},
+        'education': {'dist': 'categorical', 'values': education_levels, 'p': [0.3, 0.4, 0.25, 0.05]},
+        # 20 survey questions (1-5 scale)
+        **survey_questions,
+    },
+}
 
 # ============================================================================
 # DATASET 8: E-commerce Full (Hard - Exercise 8)
 # ============================================================================
-print("\n8. Generating ecommerce_full.csv...")
-
-n_trans = 50000
 
 segments = ['New', 'Regular', 'Premium']
 categories = ['Electronics', 'Clothing', 'Home', 'Books', 'Sports']
@@ -287,123 +360,621 @@ regions = ['North', 'South', 'East', 'West']
 # Segment characteristics
 segment_probs = [0.25, 0.55, 0.2]
 segment_avg_values = {'New': 50, 'Regular': 100, 'Premium': 250}
-
-trans_data = []
-for i in range(1, n_trans + 1):
-    segment = np.random.choice(segments, p=segment_probs)
-    category = np.random.choice(categories)
-    region = np.random.choice(regions)
-    
-    # Order value depends on segment and category
-    base_value = segment_avg_values[segment]
-    if category == 'Electronics':
-        base_value *= 2.5
-    elif category == 'Home':
-        base_value *= 1.5
-    
-    order_value = np.random.gamma(2, base_value/2)
-    quantity = np.random.poisson(2) + 1
-    customer_age = np.random.normal(40, 12, 1)[0]
-    
-    trans_data.append({
-        'transaction_id': i,
-        'customer_segment': segment,
-        'product_category': category,
-        'region': region,
-        'order_value': round(order_value, 2),
-        'quantity': quantity,
-        'date': datetime(2023, 1, 1) + timedelta(days=int(np.random.uniform(0, 365))),
-        'customer_age': int(customer_age),
-        'is_repeat_customer': np.random.choice([True, False], p=[0.7, 0.3])
-    })
-
-ecommerce_df = pd.DataFrame(trans_data)
-ecommerce_df.to_csv('data/ecommerce_full.csv', index=False)
-print(f"   ✓ Created: {len(ecommerce_df)} transactions with segment and regional data")
+# Electronics orders are 2.5x the segment average, Home orders 1.5x
+category_multipliers = {'Electronics': 2.5, 'Home': 1.5}
+
+ECOMMERCE_FULL = {
+    'name': 'ecommerce_full',
+    'rows': 50000,
+    'description': "transactions with segment and regional data",
+    'columns': {
+        'transaction_id': {'kind': 'id'},
+        'customer_segment': {'dist': 'categorical', 'values': segments, 'p': segment_probs},
+        'product_category': {'dist': 'categorical', 'values': categories},
+        'region': {'dist': 'categorical', 'values': regions},
+        # Order value depends on segment and category: gamma(2, base / 2)
+        'order_value': {
+            'dist': 'gamma', 'shape': 2,
+            'scale': {'product': [
+                {'map': 'customer_segment', 'values': segment_avg_values},
+                {'map': 'product_category', 'values': category_multipliers, 'default': 1.0},
+                0.5,
+            ]},
+            'round': 2,
+        },
+        'quantity': {'dist': 'poisson', 'lam': 2, 'add': 1},
+        'date': {'kind': 'date', 'start': '2023-01-01',
+                 'days': {'dist': 'integers', 'low': 0, 'high': 365}},
+        'customer_age': {**_normal(40, 12), 'dtype': 'int'},
+        'is_repeat_customer': {'dist': 'bernoulli', 'p': 0.7},
+    },
+}
 
 # ============================================================================
 # DATASET 9: Credit Risk (Hard - Exercise 9)
 # ============================================================================
-print("\n9. Generating credit_risk.csv...")
-
-n_applicants = 8000
-
-# Generate features
-age = np.random.normal(40, 12, n_applicants).clip(18, 75).round(0)
-income = np.random.lognormal(10.5, 0.7, n_applicants).clip(15000, 250000).round(0)
-employment_length = np.random.exponential(6, n_applicants).clip(0, 40).round(1)
-debt = income * np.random.beta(2, 5, n_applicants)
-credit_score = np.random.normal(680, 80, n_applicants).clip(300, 850).round(0)
-loan_amount = np.random.lognormal(9.5, 0.8, n_applicants).clip(1000, 100000).round(0)
-interest_rate = (20 - (credit_score - 300) / 550 * 15) + np.random.normal(0, 2, n_applicants)
-interest_rate = interest_rate.clip(3, 25).round(2)
-term = np.random.choice([36, 60], n_applicants, p=[0.6, 0.4])
-purpose = np.random.choice(['debt_consolidation', 'credit_card', 'home', 'car', 'other'], 
-                          n_applicants, p=[0.3, 0.2, 0.15, 0.2, 0.15])
-grade = pd.cut(credit_score, bins=[0, 600, 650, 700, 750, 850], 
-               labels=['D', 'C', 'B', 'A', 'AA']).astype(str)
-delinquencies = np.random.poisson(0.5, n_applicants)
-inquiries = np.random.poisson(1, n_applicants)
-open_accounts = np.random.poisson(5, n_applicants) + 2
-
-# Calculate default probability based on risk factors
-default_prob = 1 / (1 + np.exp(
-    -(-5 + 
-      (debt/income) * 3 + 
-      (850 - credit_score) / 100 + 
-      delinquencies * 0.3 + 
-      inquiries * 0.2 - 
-      employment_length * 0.05 + 
-      np.random.normal(0, 1, n_applicants))
-))
-
-default = (np.random.random(n_applicants) < default_prob).astype(int)
-
-# Introduce some missing values
-income_missing = np.random.random(n_applicants) < 0.08
-employment_missing = np.random.random(n_applicants) < 0.05
-delinq_missing = np.random.random(n_applicants) < 0.03
-
-credit_risk = pd.DataFrame({
-    'applicant_id': range(1, n_applicants + 1),
-    'age': age.astype(int),
-    'income': income,
-    'employment_length': employment_length,
-    'debt': debt.round(2),
-    'credit_score': credit_score.astype(int),
-    'loan_amount': loan_amount.astype(int),
-    'interest_rate': interest_rate,
-    'term': term,
-    'purpose': purpose,
-    'grade': grade,
-    'delinquencies': delinquencies,
-    'inquiries': inquiries,
-    'open_accounts': open_accounts,
-    'default': default
-})
-
-# Apply missing values
-credit_risk.loc[income_missing, 'income'] = np.nan
-credit_risk.loc[employment_missing, 'employment_length'] = np.nan
-credit_risk.loc[delinq_missing, 'delinquencies'] = np.nan
-
-credit_risk.to_csv('data/credit_risk.csv', index=False)
-default_rate = default.mean() * 100
-print(f"   ✓ Created: {len(credit_risk)} applicants, {default_rate:.1f}% default rate")
-
-print("\n" + "="*60)
-print("✅ All datasets generated successfully!")
-print("\nDataset Summary:")
-print("-" * 60)
-print(f"1. student_scores.csv        : {len(student_scores):,} rows")
-print(f"2. employee_salaries.csv     : {len(employee_salaries):,} rows")
-print(f"3. house_simple.csv          : {len(house_simple):,} rows")
-print(f"4. customer_transactions.csv : {len(transactions):,} rows")
-print(f"5. real_estate.csv           : {len(real_estate):,} rows")
-print(f"6. daily_sales.csv           : {len(sales_df):,} rows")
-print(f"7. customer_survey.csv       : {len(survey_df):,} rows")
-print(f"8. ecommerce_full.csv        : {len(ecommerce_df):,} rows")
-print(f"9. credit_risk.csv           : {len(credit_risk):,} rows")
-print("-" * 60)
-print(f"Total data points: {sum([len(df) for df in [student_scores, employee_salaries, house_simple, transactions, real_estate, sales_df, survey_df, ecommerce_df, credit_risk]]):,}")
-print("\n💾 All files saved to 'data/' directory")
+
+loan_purposes = ['debt_consolidation', 'credit_card', 'home', 'car', 'other']
+
+CREDIT_RISK = {
+    'name': 'credit_risk',
+    'rows': 8000,
+    'description': "applicants",
+    'columns': {
+        'applicant_id': {'kind': 'id'},
+        'age': {**_normal(40, 12), 'clip': [18, 75], 'round': 0, 'dtype': 'int'},
+        'income': {'dist': 'lognormal', 'mean': 10.5, 'sigma': 0.7, 'clip': [15000, 250000],
+                   'round': 0, 'missing': {'prob': 0.08}},
+        'employment_length': {'dist': 'exponential', 'scale': 6, 'clip': [0, 40], 'round': 1,
+                              'missing': {'prob': 0.05}},
+        'debt_ratio': {'dist': 'beta', 'a': 2, 'b': 5, 'hidden': True},
+        'debt': {'product': ['income', 'debt_ratio'], 'round': 2},
+        'credit_score': {**_normal(680, 80), 'clip': [300, 850], 'round': 0, 'dtype': 'int'},
+        'loan_amount': {'dist': 'lognormal', 'mean': 9.5, 'sigma': 0.8, 'clip': [1000, 100000],
+                        'round': 0, 'dtype': 'int'},
+        # 20% at a 300 score down to 5% at 850, plus noise
+        'interest_rate': {'linear': {'credit_score': -15 / 550}, 'intercept': 20 + 300 * 15 / 550,
+                          'noise': _normal(0, 2), 'clip': [3, 25], 'round': 2},
+        'term': {'dist': 'categorical', 'values': [36, 60], 'p': [0.6, 0.4]},
+        'purpose': {'dist': 'categorical', 'values': loan_purposes, 'p': [0.3, 0.2, 0.15, 0.2, 0.15]},
+        'grade': {'kind': 'bins', 'of': 'credit_score', 'edges': [0, 600, 650, 700, 750, 850],
+                  'labels': ['D', 'C', 'B', 'A', 'AA']},
+        'delinquencies': {'dist': 'poisson', 'lam': 0.5, 'missing': {'prob': 0.03}},
+        'inquiries': {'dist': 'poisson', 'lam': 1},
+        'open_accounts': {'dist': 'poisson', 'lam': 5, 'add': 2},
+        # Default probability based on risk factors:
+        # logit = -5 + 3 debt/income + (850 - score)/100 + 0.3 delinq + 0.2 inq - 0.05 emp + noise
+        'default_prob': {
+            'linear': {
+                'debt_ratio': 3,
+                'credit_score': -1 / 100,
+                'delinquencies': 0.3,
+                'inquiries': 0.2,
+                'employment_length': -0.05,
+            },
+            'intercept': -5 + 850 / 100,
+            'noise': _normal(0, 1),
+            'link': 'logistic',
+            'hidden': True,
+        },
+        'default': {'dist': 'bernoulli', 'p': 'default_prob', 'dtype': 'int'},
+    },
+}
+
+
+# ============================================================================
+# Registry, seeding and chunk tasks
+# ============================================================================
+
+@dataclass(frozen=True)
+class DatasetDef:
+    name: str
+    base_rows: int
+    make_chunk: Callable[[np.random.Generator, int, int, int], pd.DataFrame]
+    description: str
+    spec: Optional[Dict[str, Any]] = None
+
+    def rows_at(self, scale: float) -> int:
+        return max(1, int(round(self.base_rows * scale)))
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "DatasetDef":
+        if 'schema' not in spec and spec['name'] in SCHEMAS:
+            spec = {**spec, 'schema': SCHEMAS[spec['name']]}
+        return cls(spec['name'], spec['rows'], compile_spec(spec), spec.get('description', "rows"), spec)
+
+
+DATASET_SPECS = [
+    STUDENT_SCORES,
+    EMPLOYEE_SALARIES,
+    HOUSE_SIMPLE,
+    CUSTOMER_TRANSACTIONS,
+    REAL_ESTATE,
+    DAILY_SALES,
+    CUSTOMER_SURVEY,
+    ECOMMERCE_FULL,
+    CREDIT_RISK,
+]
+DATASETS = [DatasetDef.from_spec(spec) for spec in DATASET_SPECS]
+DATASETS_BY_NAME = {d.name: d for d in DATASETS}
+# Position in DATASETS is part of each dataset's seed, so it must never be reordered
+DATASET_INDEX = {d.name: i for i, d in enumerate(DATASETS)}
+
+
+def register_specs(specs: Sequence[Dict[str, Any]]) -> List[DatasetDef]:
+    """Add datasets from extra specs (e.g. --spec files) to the registry.
+
+    They are seeded by their position after the built-in datasets. Registering
+    the same spec again is a no-op, so pool workers can call this safely.
+    """
+    added = []
+    for spec in specs:
+        existing = DATASETS_BY_NAME.get(spec['name'])
+        if existing is not None:
+            if existing.spec != spec:
+                raise ValueError(f"A different dataset named {spec['name']!r} is already registered")
+            added.append(existing)
+            continue
+        dataset = DatasetDef.from_spec(spec)
+        DATASET_INDEX[dataset.name] = len(DATASETS)
+        DATASETS.append(dataset)
+        DATASETS_BY_NAME[dataset.name] = dataset
+        added.append(dataset)
+    return added
+
+
+@dataclass(frozen=True)
+class ChunkTask:
+    dataset: str
+    chunk_index: int
+    start: int
+    stop: int
+    n_total: int
+    seed: int
+    rng: str = "seedseq"
+
+
+def philox_block_rng(seed: int, dataset: str, block: int) -> np.random.Generator:
+    """Counter-based stream for one fixed-size block of rows.
+
+    The Philox key is derived from (seed, dataset) and the block number sits
+    in the high words of the 256-bit counter, so every block owns a disjoint
+    2**128-draw slice of the stream and can be generated without the rows
+    before it.
+    """
+    key = np.random.SeedSequence(seed, spawn_key=(DATASET_INDEX[dataset],)).generate_state(2, np.uint64)
+    return np.random.Generator(np.random.Philox(key=key, counter=[0, 0, block, 0]))
+
+
+def generate_rows(dataset: str, start: int, stop: int, n_total: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Rows [start, stop) of a dataset with n_total rows, in random-access mode.
+
+    Rows are drawn in PHILOX_BLOCK_ROWS blocks keyed by (dataset, block), so
+    any slice (e.g. rows 40M-41M of ecommerce_full) comes out identical to
+    the same rows of a full run, whichever machine or process produces it.
+    Distributions draw a variable number of raw numbers per value, so blocks
+    rather than single rows are the unit of random access; at most two
+    partial blocks are generated and trimmed.
+    """
+    if not 0 <= start < stop <= n_total:
+        raise ValueError(f"Row range [{start}, {stop}) is outside 0..{n_total}")
+    make_chunk = DATASETS_BY_NAME[dataset].make_chunk
+    pieces = []
+    for block in range(start // PHILOX_BLOCK_ROWS, (stop - 1) // PHILOX_BLOCK_ROWS + 1):
+        block_start = block * PHILOX_BLOCK_ROWS
+        block_stop = min(block_start + PHILOX_BLOCK_ROWS, n_total)
+        df = make_chunk(philox_block_rng(seed, dataset, block), block_start, block_stop, n_total)
+        pieces.append(df.iloc[max(start, block_start) - block_start:min(stop, block_stop) - block_start])
+    return pd.concat(pieces, ignore_index=True)
+
+
+def chunk_bounds(n_rows: int, chunk_rows: int, first_row: int = 0) -> Iterator[Tuple[int, int]]:
+    """Yield (start, stop) row ranges of at most chunk_rows rows."""
+    for start in range(first_row, n_rows, chunk_rows):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def plan_chunks(
+    dataset: DatasetDef,
+    n_rows: int,
+    chunk_rows: int,
+    seed: int = DEFAULT_SEED,
+    rng: str = "seedseq",
+    row_range: Optional[Tuple[int, int]] = None,
+) -> List[ChunkTask]:
+    """Split a dataset (or, in philox mode, a row range of it) into chunk tasks."""
+    if rng not in RNG_MODES:
+        raise ValueError(f"Unknown rng mode: {rng!r} (expected one of {RNG_MODES})")
+    if row_range is not None and rng != "philox":
+        raise ValueError("Row ranges need rng='philox' (seedseq chunks depend on all earlier rows)")
+
+    first_row, last_row = row_range if row_range is not None else (0, n_rows)
+    if rng == "philox":
+        # Align chunks to whole Philox blocks so no block is generated twice
+        chunk_rows = max(PHILOX_BLOCK_ROWS, chunk_rows // PHILOX_BLOCK_ROWS * PHILOX_BLOCK_ROWS)
+    return [
+        ChunkTask(dataset.name, i, start, stop, n_rows, seed, rng)
+        for i, (start, stop) in enumerate(chunk_bounds(last_row, chunk_rows, first_row))
+    ]
+
+
+def generate_chunk(task: ChunkTask) -> pd.DataFrame:
+    if task.rng == "philox":
+        return generate_rows(task.dataset, task.start, task.stop, task.n_total, task.seed)
+    rng = np.random.default_rng(chunk_seed(task.seed, DATASET_INDEX[task.dataset], task.chunk_index))
+    return DATASETS_BY_NAME[task.dataset].make_chunk(rng, task.start, task.stop, task.n_total)
+
+
+# ============================================================================
+# Streaming writers
+# ============================================================================
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet/Feather output needs pyarrow. Install it with:\n  pip install pyarrow"
+        ) from exc
+    return pa, pq
+
+
+def encode_chunk(chunk: pd.DataFrame, fmt: str, first: bool):
+    """Serialize one chunk for write_encoded (CSV bytes or an Arrow table).
+
+    Runs on the worker, so the expensive formatting happens in parallel.
+    """
+    if fmt == "csv":
+        return chunk.to_csv(index=False, header=first).encode("utf-8")
+    if fmt in COLUMNAR_FORMATS:
+        pa, _ = _require_pyarrow()
+        return pa.Table.from_pandas(chunk, preserve_index=False)
+    raise ValueError(f"Unknown output format: {fmt!r} (expected one of {sorted(FORMATS)})")
+
+
+class ChunkWriter:
+    """Appends encoded chunks, in order, to a single CSV, Parquet or Feather file.
+
+    Each chunk becomes one Parquet row group (with min/max/null-count
+    statistics, so readers can skip row groups) or one Arrow record batch.
+    Several writers can be open at once, e.g. for tables built from the
+    same chunks.
+    """
+
+    def __init__(self, path: Path, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt!r} (expected one of {sorted(FORMATS)})")
+        self.path = path
+        self.fmt = fmt
+        self.writer = None
+        self.schema = None
+        if fmt == "csv":
+            self.writer = open(path, "wb")
+
+    def write(self, payload) -> None:
+        if self.fmt == "csv":
+            self.writer.write(payload)
+            return
+        pa, pq = _require_pyarrow()
+        if self.writer is None:
+            self.schema = payload.schema
+            if self.fmt == "parquet":
+                self.writer = pq.ParquetWriter(
+                    self.path,
+                    self.schema,
+                    compression=COLUMNAR_COMPRESSION,
+                    use_dictionary=True,
+                    write_statistics=True,
+                )
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION)
+                self.writer = pa.ipc.new_file(str(self.path), self.schema, options=options)
+        else:
+            payload = payload.cast(self.schema)
+        if self.fmt == "parquet":
+            self.writer.write_table(payload, row_group_size=len(payload))
+        else:
+            self.writer.write_table(payload, max_chunksize=len(payload))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def write_encoded(encoded: Iterable, path: Path, fmt: str) -> None:
+    """Append encoded chunks, in order, to a single CSV, Parquet or Feather file."""
+    writer = ChunkWriter(path, fmt)
+    try:
+        for payload in encoded:
+            writer.write(payload)
+    finally:
+        writer.close()
+
+
+def partition_key_values(chunk: pd.DataFrame, column: str) -> np.ndarray:
+    """Values of a partition key; 'month' is derived from the date column."""
+    if column == 'month':
+        return chunk['date'].to_numpy().astype('datetime64[M]').astype(str)
+    return np.asarray(chunk[column].astype(str))
+
+
+def encode_partitioned(chunk: pd.DataFrame, fmt: str, partition_by: List[str]) -> List[Tuple[str, object]]:
+    """Split a chunk by partition keys and encode each piece.
+
+    Returns (relative directory, payload) pairs such as
+    ('region=North/month=2023-03', ...), in sorted order. Partition columns
+    live in the directory names only, as in Hive/Arrow datasets.
+    """
+    keys = pd.DataFrame({col: partition_key_values(chunk, col) for col in partition_by})
+    data = chunk.drop(columns=[c for c in partition_by if c in chunk.columns])
+    pieces = []
+    for values, index in keys.groupby(partition_by, sort=True).indices.items():
+        if not isinstance(values, tuple):
+            values = (values,)
+        rel_dir = "/".join(f"{col}={val}" for col, val in zip(partition_by, values))
+        piece = data.iloc[index].reset_index(drop=True)
+        pieces.append((rel_dir, encode_chunk(piece, fmt, first=True)))
+    return pieces
+
+
+def _generate_encoded(
+    job: Tuple[ChunkTask, str, Optional[List[str]], Optional[ArchiveOptions]]
+) -> Tuple[str, int, object, Optional[Dict[str, object]]]:
+    """Worker entry point: build one chunk, serialize it and compress it for the archives."""
+    task, fmt, partition_by, archive = job
+    chunk = generate_chunk(task)
+    if partition_by:
+        return task.dataset, len(chunk), encode_partitioned(chunk, fmt, partition_by), None
+    payload = encode_chunk(chunk, fmt, first=(task.chunk_index == 0))
+    if archive is None:
+        return task.dataset, len(chunk), payload, None
+    packed = pack_chunk(payload, archive)
+    return task.dataset, len(chunk), payload if archive.keep_files else None, packed
+
+
+def write_partitioned(results: Iterable[Tuple[str, int, object, Any]], root: Path, fmt: str) -> int:
+    """Write partitioned chunks as root/<key>=<value>/.../part-<chunk>.<ext>."""
+    if root.exists():
+        shutil.rmtree(root)
+    rows = 0
+    for chunk_index, (_, n, pieces, _) in enumerate(results):
+        rows += n
+        for rel_dir, payload in pieces:
+            part_dir = root / rel_dir
+            part_dir.mkdir(parents=True, exist_ok=True)
+            write_encoded([payload], part_dir / f"part-{chunk_index:05d}{FORMATS[fmt]}", fmt)
+    return rows
+
+
+def write_datasets(
+    datasets: List[DatasetDef],
+    out_dir: Path,
+    scale: float = 1.0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    fmt: str = "csv",
+    workers: int = 1,
+    seed: int = DEFAULT_SEED,
+    partition: bool = False,
+    rng: str = "seedseq",
+    row_range: Optional[Tuple[int, int]] = None,
+    archives: Optional[DatasetArchives] = None,
+) -> Iterator[Tuple[DatasetDef, Path, int]]:
+    """Generate and write datasets, yielding (dataset, path, rows) as each finishes.
+
+    Chunks of every dataset share one process pool. Each chunk has its own
+    seed, so the files are byte-identical for any number of workers (for a
+    given seed, scale and chunk size).
+
+    With partition=True, datasets listed in PARTITION_COLUMNS are written as
+    Hive-style directory trees (out_dir/<name>/region=North/month=2023-03/...).
+
+    With rng='philox', row_range=(start, stop) writes only those rows, as
+    <name>.rows-<start>-<stop>.<ext>; slices written by separate runs
+    concatenate to exactly the full dataset.
+
+    With archives, every CSV also becomes a member of the archives as it is
+    generated (CSV only, not partitioned).
+    """
+    if archives is not None and (fmt != "csv" or partition):
+        raise ValueError("Archives hold the CSV files; use --format csv without --partition")
+    options = archives.options if archives is not None else None
+    jobs = [
+        (task, fmt, PARTITION_COLUMNS.get(dataset.name) if partition else None, options)
+        for dataset in datasets
+        for task in plan_chunks(dataset, dataset.rows_at(scale), chunk_rows, seed, rng, row_range)
+    ]
+    # Datasets added with register_specs() must also exist in spawned workers
+    extra_specs = [d.spec for d in DATASETS[len(DATASET_SPECS):]]
+    results = ordered_map(_generate_encoded, jobs, workers, register_specs, (extra_specs,))
+
+    for name, group in groupby(results, key=lambda r: r[0]):
+        dataset = DATASETS_BY_NAME[name]
+        if partition and name in PARTITION_COLUMNS:
+            path = out_dir / (dataset.name if row_range is None
+                              else f"{dataset.name}.rows-{row_range[0]}-{row_range[1]}")
+            rows = write_partitioned(group, path, fmt)
+            yield dataset, path, rows
+            continue
+
+        stem = dataset.name if row_range is None else f"{dataset.name}.rows-{row_range[0]}-{row_range[1]}"
+        path = out_dir / f"{stem}{FORMATS[fmt]}"
+        rows = 0
+        member = archives.add_member(path.name) if archives is not None else None
+
+        def payloads():
+            nonlocal rows
+            for _, n, payload, packed in group:
+                rows += n
+                if member is not None:
+                    member.write(packed)
+                if payload is not None:
+                    yield payload
+
+        if options is None or options.keep_files:
+            write_encoded(payloads(), path, fmt)
+        else:
+            for _ in payloads():
+                pass
+        if member is not None:
+            member.close()
+        yield dataset, path, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the Class 4 exercise datasets")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor: every dataset gets scale x its base row count (default: 1)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Rows generated and written per chunk; bounds peak memory")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--out-dir", default=None,
+                        help="Output directory. Default: Class4/data (scale 1) or Class4/data/sf<scale>")
+    parser.add_argument("--datasets", nargs="+", default=None,
+                        help=f"Only generate these datasets (default: all). Built in: {', '.join(DATASETS_BY_NAME)}")
+    parser.add_argument("--spec", nargs="+", default=[], metavar="FILE",
+                        help="Extra dataset spec files (.json/.yaml, see dataset_spec.py) to generate as well")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: all CPUs). Output does not depend on it")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--partition", action="store_true",
+                        help="Write customer_transactions and ecommerce_full as Hive-style "
+                             "region=/month= directory trees")
+    parser.add_argument("--rng", choices=RNG_MODES, default="seedseq",
+                        help="philox: counter-based per-block streams (random access, "
+                             "chunk-size independent; chunks are rounded to 65,536-row blocks)")
+    parser.add_argument("--rows", nargs=2, type=int, metavar=("START", "STOP"), default=None,
+                        help="Only write rows [START, STOP) of a single --datasets entry (implies --rng philox)")
+    parser.add_argument("--zip", nargs="?", const="DataSet.zip", default=None, metavar="NAME",
+                        help="Stream the CSVs into a zip in the output directory (default name: DataSet.zip)")
+    parser.add_argument("--tar-zst", nargs="?", const="DataSet.tar.zst", default=None, metavar="NAME",
+                        help="Stream the CSVs into a zstd-compressed tar (needs zstandard)")
+    parser.add_argument("--archive-only", action="store_true",
+                        help="With --zip/--tar-zst, do not also write the loose CSV files")
+    parser.add_argument("--zip-level", type=int, default=6, help="Deflate level for --zip (default: 6)")
+    parser.add_argument("--zstd-level", type=int, default=10, help="zstd level for --tar-zst (default: 10)")
+    parser.add_argument("--sales-step", default=None, metavar="STEP",
+                        help="Also write daily_sales at high frequency: one row per STEP (e.g. 1m, 1s), "
+                             "as sales_STEP, even when --datasets lists others")
+    parser.add_argument("--sales-years", type=float, default=2.0,
+                        help="Years covered by --sales-step (default: 2; --scale multiplies it)")
+    parser.add_argument("--validate", action="store_true",
+                        help="Check each written dataset's statistics against its spec (streaming)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Write .stats.json/.stats.parquet summary sidecars next to each dataset")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate every dataset, even if manifest.json says it is up to date")
+    args = parser.parse_args()
+
+    if args.scale <= 0:
+        raise ValueError(f"--scale must be positive, got {args.scale}")
+    if args.chunk_rows <= 0:
+        raise ValueError(f"--chunk-rows must be positive, got {args.chunk_rows}")
+    if args.archive_only and not args.zip and (args.validate or args.stats):
+        # Datasets are read back out of the zip; a .tar.zst has no random access to members
+        raise ValueError("--validate/--stats with --archive-only need --zip to read the datasets back from")
+
+    if args.out_dir:
+        out_dir = Path(args.out_dir)
+    elif args.scale == 1:
+        out_dir = DEFAULT_OUT_DIR
+    else:
+        out_dir = DEFAULT_OUT_DIR / f"sf{args.scale:g}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    extra_specs = [load_spec(path) for path in args.spec]
+    if args.sales_step:
+        extra_specs.append(sales_timeseries_spec(args.sales_step, args.sales_years))
+    register_specs(extra_specs)
+    unknown = [n for n in args.datasets or [] if n not in DATASETS_BY_NAME]
+    if unknown:
+        raise ValueError(f"Unknown dataset(s): {', '.join(unknown)}")
+    selected = [DATASETS_BY_NAME[n] for n in args.datasets] if args.datasets else list(DATASETS)
+    if args.sales_step and DATASETS_BY_NAME[extra_specs[-1]['name']] not in selected:
+        selected.append(DATASETS_BY_NAME[extra_specs[-1]['name']])
+    row_range = None
+    if args.rows:
+        if len(selected) != 1:
+            raise ValueError("--rows needs exactly one dataset, e.g. --datasets ecommerce_full")
+        args.rng = "philox"
+        row_range = tuple(args.rows)
+    archives = None
+    if args.zip or args.tar_zst:
+        options = ArchiveOptions(args.zip_level if args.zip else None,
+                                 args.zstd_level if args.tar_zst else None,
+                                 keep_files=not args.archive_only)
+        archives = DatasetArchives(options,
+                                   out_dir / args.zip if args.zip else None,
+                                   out_dir / args.tar_zst if args.tar_zst else None)
+
+    # Everything that shapes a dataset's bytes goes into its manifest key
+    params = {name: dict(seed=args.seed, scale=args.scale, format=args.format, rng=args.rng,
+                         chunk_rows=args.chunk_rows,
+                         partition=PARTITION_COLUMNS.get(name) if args.partition else None)
+              for name in DATASETS_BY_NAME}
+    keys = {d.name: spec_hash(d.spec, **params[d.name]) for d in selected}
+    # Slices and archives need every selected dataset generated in this run
+    manifest = load_manifest(out_dir) if row_range is None else None
+    up_to_date = []
+    if manifest is not None and archives is None and not args.force:
+        up_to_date = [d for d in selected if is_current(manifest.get(d.name), keys[d.name], out_dir)]
+        selected = [d for d in selected if d not in up_to_date]
+
+    print("Generating datasets for Class 4 exercises...")
+    print(f"Scale factor: {args.scale:g}  |  chunk size: {args.chunk_rows:,} rows  |  "
+          f"format: {args.format}  |  workers: {args.workers}  |  rng: {args.rng}")
+    print("="*60)
+
+    for dataset in up_to_date:
+        print(f"   = Up to date: {manifest[dataset.name]['path']} (unchanged since "
+              f"{manifest[dataset.name]['generated_at']})")
+
+    written = []
+    generated = []
+    results = write_datasets(selected, out_dir, args.scale, args.chunk_rows,
+                             args.format, args.workers, args.seed, args.partition,
+                             args.rng, row_range, archives)
+    started = time.perf_counter()
+    for i, (dataset, path, rows) in enumerate(results, start=1):
+        finished = time.perf_counter()
+        label = f"{path.name}/" if path.is_dir() else path.name
+        written.append((label, rows))
+        generated.append((dataset, path))
+        print(f"\n{i}. Generated {label}")
+        print(f"   ✓ Created: {rows:,} {dataset.description}")
+        # --archive-only leaves no loose file to record
+        if manifest is not None and path.exists():
+            manifest[dataset.name] = make_entry(out_dir, path, keys[dataset.name], rows,
+                                                finished - started, **params[dataset.name])
+            save_manifest(out_dir, manifest)
+        started = finished
+    if archives is not None:
+        archives.close()
+        for path in archives.paths:
+            print(f"\n📦 Archive: {path} ({path.stat().st_size:,} bytes)")
+
+    print("\n" + "="*60)
+    print("✅ All datasets generated successfully!")
+    print("\nDataset Summary:")
+    print("-" * 60)
+    for i, (label, rows) in enumerate(written, start=1):
+        print(f"{i}. {label:<26}: {rows:,} rows")
+    print("-" * 60)
+    print(f"Total data points: {sum(rows for _, rows in written):,}")
+    print(f"\n💾 All files saved to '{out_dir}'")
+
+    # --archive-only: read members straight out of the zip (checked above that there is one)
+    generated = [(dataset, path if path.exists() else zipfile.Path(out_dir / args.zip, at=path.name))
+                 for dataset, path in generated]
+
+    if args.stats:
+        from dataset_stats import load_stats, write_sidecars
+
+        print("\nWriting statistics sidecars...")
+        # Up-to-date datasets keep their sidecars unless those are missing or stale
+        stale = [(d, out_dir / manifest[d.name]['path']) for d in up_to_date]
+        stale = [(d, path) for d, path in stale if load_stats(path) is None]
+        for dataset, path in generated + stale:
+            sidecars = write_sidecars(path, dataset.name, chunk_rows=args.chunk_rows)
+            print(f"   📊 {', '.join(p.name for p in sidecars.values())}")
+
+    if args.validate:
+        from dataset_validate import expectations, print_results, validate_path
+
+        print("\nValidating generated datasets...")
+        failed = 0
+        for dataset, path in generated:
+            if not expectations(dataset.name):
+                print(f"   ✗ {path.name}: no checks for this dataset")
+                failed += 1
+                continue
+            results = validate_path(path, dataset.name, args.chunk_rows)
+            print_results(path.name, results)
+            failed += sum(not ok for _, _, ok in results)
+        if failed:
+            raise SystemExit(f"❌ {failed} statistical check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ import seaborn as sns
 from matplotlib.patches import FancyBboxPatch
 import os
 
+from streaming_correlation import correlation, draw_correlation_heatmap
+from streaming_stats import QuantileSketch, draw_boxplot
+
 print("Generating exercise example images...")
 print("="*70)
 
@@ -74,8 +77,8 @@ fig.suptitle('Exercise 2: Outlier Investigation - Example Solution',
              fontsize=16, fontweight='bold')
 
 # Time series with outliers marked
-Q1 = df_rev['revenue'].quantile(0.25)
-Q3 = df_rev['revenue'].quantile(0.75)
+revenue_sketch = QuantileSketch.of(df_rev['revenue'])
+Q1, Q3 = revenue_sketch.quantiles([0.25, 0.75])
 IQR = Q3 - Q1
 outlier_mask = (df_rev['revenue'] < Q1 - 1.5*IQR) | (df_rev['revenue'] > Q3 + 1.5*IQR)
 
@@ -89,7 +92,7 @@ axes[0, 0].legend()
 axes[0, 0].tick_params(axis='x', rotation=45)
 
 # Box plot
-axes[0, 1].boxplot(df_rev['revenue'])
+draw_boxplot(axes[0, 1], [revenue_sketch])
 axes[0, 1].set_title('Box Plot')
 axes[0, 1].set_ylabel('Revenue ($)')
 
@@ -156,10 +159,8 @@ fig.suptitle('Exercise 3: Relationship Mapping - Example Solution',
              fontsize=16, fontweight='bold')
 
 # Correlation heatmap
-corr = df_house.corr()
-mask = np.triu(np.ones_like(corr, dtype=bool))
-sns.heatmap(corr, mask=mask, annot=True, fmt='.2f', cmap='coolwarm', 
-            center=0, square=True, linewidths=1, ax=axes[0, 0])
+corr = correlation(df_house)
+draw_correlation_heatmap(axes[0, 0], corr, triangle=True, annot=True)
 axes[0, 0].set_title('Correlation Heatmap')
 
 # Top correlations scatter
@@ -0,0 +1,87 @@
+"""Class 4 – Vectorized missingness injection.
+
+Missingness rules come from the "missing" entries of a dataset spec (see
+dataset_spec.py). Each rule is a probability expression, and its mechanism
+follows from which columns that expression reads, so all three use one form:
+
+  MCAR  constant probability                     {"prob": 0.05}
+  MAR   driven by another column (age -> q15)    {"prob": {"linear": {"age": 0.01}, ...}}
+  MNAR  driven by the column's own value         income: {"prob": {"linear": {"income": ...}}}
+
+For one chunk, every rule's probabilities are stacked into a (rules x rows)
+matrix and compared with a single matrix of uniforms, so all masks come from
+one vectorized pass. apply_masks() attaches the boolean masks to the data as
+pandas nullable arrays, so integer columns such as the 1-5 Likert answers
+stay int8 instead of being upcast to float64 by NaN; Arrow/Parquet then
+store the nulls as validity bitmaps.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class MissingRule:
+    column: str
+    prob: Any
+
+    @classmethod
+    def from_spec(cls, column: str, rule: Dict[str, Any]) -> "MissingRule":
+        return cls(column, rule["prob"])
+
+
+def rules_from_spec(spec: Dict[str, Any]) -> List[MissingRule]:
+    columns = [(column, col.get("missing", [])) for column, col in spec["columns"].items()]
+    columns += list(spec.get("copula", {}).get("missing", {}).items())
+    rules = []
+    for column, entries in columns:
+        for entry in [entries] if isinstance(entries, dict) else entries:
+            rules.append(MissingRule.from_spec(column, entry))
+    return rules
+
+
+def draw_masks(
+    rules: List[MissingRule], evaluate: Callable[[Any], Any], rng: np.random.Generator, n: int
+) -> Dict[str, np.ndarray]:
+    """Draw every rule's mask in one pass; rules on the same column are OR-ed.
+
+    `evaluate` turns a probability expression into a scalar or length-n array.
+    """
+    if not rules:
+        return {}
+    probs = np.empty((len(rules), n))
+    for i, rule in enumerate(rules):
+        probs[i] = evaluate(rule.prob)
+    hits = rng.random((len(rules), n)) < probs
+
+    masks: Dict[str, np.ndarray] = {}
+    for rule, mask in zip(rules, hits):
+        masks[rule.column] = masks[rule.column] | mask if rule.column in masks else mask
+    return masks
+
+
+def with_mask(values: Any, nulls: np.ndarray):
+    """Attach a null mask (True = missing) to column values as a pandas nullable array (dtype kept)."""
+    if isinstance(values, pd.Categorical):
+        codes = np.where(nulls, -1, values.codes)
+        return pd.Categorical.from_codes(codes, values.categories, ordered=values.ordered)
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return pd.arrays.IntegerArray(values, nulls)
+    if values.dtype.kind == "b":
+        return pd.arrays.BooleanArray(values, nulls)
+    if values.dtype.kind == "f":
+        return pd.arrays.FloatingArray(values, nulls)
+    if values.dtype.kind == "M":
+        return np.where(nulls, np.datetime64("NaT"), values)
+    raise TypeError(f"Cannot attach a null mask to dtype {values.dtype}")
+
+
+def apply_masks(data: Dict[str, Any], masks: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    return {name: with_mask(values, masks[name]) if name in masks else values
+            for name, values in data.items()}
@@ -0,0 +1,52 @@
+"""Class 4 – Process-pool helpers shared by the generators and the analytics.
+
+ordered_map() runs a function over tasks on a process pool and yields the
+results in input order with a bounded number in flight; chunk_seed() gives
+every chunk of a stream its own SeedSequence. Both live here, away from
+generate_exercise_datasets, so the streaming statistics can fan out over
+chunks without importing (and registering) every dataset spec.
+
+Usage:
+  from parallel import chunk_seed, ordered_map
+  for result in ordered_map(work, tasks, workers=8):
+      ...
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+
+def chunk_seed(seed: int, stream: int, chunk_index: int) -> np.random.SeedSequence:
+    """Independent random stream for one chunk of stream `stream` (e.g. a dataset's index).
+
+    Equivalent to SeedSequence(seed).spawn(...)[stream].spawn(...)[chunk_index],
+    built directly from the spawn key so any chunk can be seeded on its own.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(stream, chunk_index))
+
+
+def ordered_map(
+    fn: Callable, items: Iterable, workers: int = 1, initializer: Optional[Callable] = None, initargs: tuple = ()
+) -> Iterator:
+    """Like map(), but on a process pool, yielding results in input order.
+
+    At most 2 x workers results are in flight, so memory stays bounded by a
+    few chunks however many tasks there are.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
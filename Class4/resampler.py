@@ -0,0 +1,338 @@
+"""Class 4 – Fit a real dataset's distributions and resample it at any size.
+
+fit() makes one streaming pass over a source file (CSV, Parquet, Feather or a
+partitioned directory) and returns an ordinary dataset spec (see
+dataset_spec.py) that imitates it:
+
+  few distinct values       exact frequency table      (<= --max-levels values)
+  numbers and dates         empirical quantile table   (QUANTILE_POINTS points)
+  1, 2, 3, ... columns      {"kind": "id"}
+  dependence                Gaussian copula on the normal scores of the ranks
+  nulls                     MCAR at each column's observed rate
+
+Frequency tables, null counts and min/max are exact. Quantiles and rank
+correlations come from a uniform reservoir sample of --sample-rows rows (all
+rows when the file is smaller), so the pass needs fixed memory however large
+the source is.
+
+The fitted spec is then written by generate_exercise_datasets.write_datasets
+like any other: every chunk is sampled with whole-array operations, chunks
+run on --workers processes, and the output does not depend on the number of
+workers. --spec-out saves the spec, e.g. for generate_exercise_datasets.py --spec.
+
+Only marginals and pairwise rank correlations are reproduced; nonlinear
+relationships and MAR/MNAR missingness become monotone dependence and MCAR.
+
+Usage:
+  python Class4/resampler.py Class4/data/real_estate.csv --scale 1000 --format parquet --workers 8
+  python Class4/resampler.py customers.csv --rows 50000000 --spec-out customers.fit.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from dataset_loader import iter_dataset_chunks
+from dataset_schema import dataset_name
+
+
+QUANTILE_POINTS = 1001
+DEFAULT_SAMPLE_ROWS = 200_000
+DEFAULT_MAX_LEVELS = 256
+DEFAULT_CHUNK_ROWS = 500_000
+MAX_DECIMALS = 6
+
+
+# ----------------------------------------------------------------------------
+# Reading the source
+# ----------------------------------------------------------------------------
+
+def _sniff_dates(path: Path, nrows: int = 1000) -> List[str]:
+    """Text columns of a CSV whose first rows all parse as ISO dates."""
+    head = pd.read_csv(path, nrows=nrows)
+    dates = []
+    for column in head.columns:
+        values = head[column].dropna()
+        if values.empty or pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            continue
+        if pd.to_datetime(values, format="ISO8601", errors="coerce").notna().all():
+            dates.append(column)
+    return dates
+
+
+def iter_source(path: Path | str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Chunks of a source file or partitioned directory, all columns."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        yield from pd.read_csv(path, parse_dates=_sniff_dates(path), chunksize=chunk_rows)
+    else:
+        yield from iter_dataset_chunks(path, None, chunk_rows)
+
+
+# ----------------------------------------------------------------------------
+# One-pass fitting
+# ----------------------------------------------------------------------------
+
+def _is_datetime(values: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(values.dtype)
+
+
+def _plain(value: Any) -> Any:
+    """numpy scalar -> JSON-friendly Python value."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _rank_scores(ranks: np.ndarray, n: int) -> np.ndarray:
+    """Van der Waerden normal scores of 1-based ranks among n values."""
+    return special.ndtri(ranks / (n + 1))
+
+
+def _decimals(x: np.ndarray) -> Optional[int]:
+    """Fewest decimals that reproduce every value, or None if more than MAX_DECIMALS."""
+    for digits in range(MAX_DECIMALS + 1):
+        scaled = x * 10.0 ** digits
+        if np.all(np.abs(scaled - np.round(scaled)) < 1e-3):
+            return digits
+    return None
+
+
+class SourceProfile:
+    """Exact per-column counts plus a fixed-size uniform sample of rows."""
+
+    def __init__(self, sample_rows: int = DEFAULT_SAMPLE_ROWS, max_levels: int = DEFAULT_MAX_LEVELS, seed: int = 0):
+        self.sample_rows = sample_rows
+        self.max_levels = max_levels
+        self.rng = np.random.default_rng(seed)
+        self.columns: List[str] = []
+        self.rows = 0
+        self.nulls: Dict[str, int] = {}
+        self.levels: Dict[str, Optional[pd.Series]] = {}  # None once past max_levels
+        self.low: Dict[str, Any] = {}
+        self.high: Dict[str, Any] = {}
+        self.id_next: Dict[str, int] = {}  # next value of each column that is still 1, 2, 3, ...
+        self.id_start: Dict[str, int] = {}
+        self.sample: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if not self.columns:
+            self.columns = list(chunk.columns)
+            self.nulls = dict.fromkeys(self.columns, 0)
+            self.levels = {c: pd.Series(dtype=float) for c in self.columns}
+            self.id_next = {c: None for c in self.columns if pd.api.types.is_integer_dtype(chunk[c].dtype)}
+        for column in self.columns:
+            values = chunk[column]
+            self.nulls[column] += int(values.isna().sum())
+            counts = self.levels[column]
+            if counts is not None:
+                counts = counts.add(values.value_counts(), fill_value=0)
+                self.levels[column] = counts if len(counts) <= self.max_levels else None
+            if column in self.id_next:
+                self._update_id(column, values)
+            present = values.dropna()
+            if len(present) and (_is_datetime(values) or pd.api.types.is_numeric_dtype(values.dtype)):
+                low, high = present.min(), present.max()
+                self.low[column] = min(self.low.get(column, low), low)
+                self.high[column] = max(self.high.get(column, high), high)
+        self._update_sample(chunk)
+        self.rows += len(chunk)
+
+    def _update_id(self, column: str, values: pd.Series) -> None:
+        x = values.to_numpy()
+        expected = self.id_next[column] if self.rows else (x[0] if len(x) else 0)
+        if pd.api.types.is_integer_dtype(values.dtype) and np.array_equal(x, np.arange(expected, expected + len(x))):
+            self.id_start.setdefault(column, int(expected))
+            self.id_next[column] = expected + len(x)
+        else:
+            del self.id_next[column]
+            self.id_start.pop(column, None)
+
+    def _update_sample(self, chunk: pd.DataFrame) -> None:
+        # Bottom-k reservoir: every row gets a uniform key and the k smallest
+        # keys seen so far are the sample
+        keys = self.rng.random(len(chunk))
+        if len(self.keys) >= self.sample_rows:
+            take = keys < self.keys.max()
+            chunk, keys = chunk[take], keys[take]
+        if not len(chunk):
+            return
+        sample = chunk if self.sample is None else pd.concat([self.sample, chunk], ignore_index=True)
+        keys = np.concatenate([self.keys, keys])
+        if len(keys) > self.sample_rows:
+            keep = np.sort(np.argpartition(keys, self.sample_rows)[:self.sample_rows])
+            sample, keys = sample.iloc[keep].reset_index(drop=True), keys[keep]
+        self.sample, self.keys = sample.reset_index(drop=True), keys
+
+    def _categorical(self, column: str, values: pd.Series):
+        counts = self.levels[column]
+        if counts is None:
+            # Too many distinct values for a frequency table: use the sample's
+            counts = values.value_counts()
+        counts = counts[counts > 0].sort_index()
+        codes = pd.Categorical(values, categories=counts.index).codes.astype(float)
+        codes[codes < 0] = np.nan
+        # Mid-interval of each value on the cumulative (uniform) scale
+        cumulative = counts.cumsum().to_numpy() - counts.to_numpy() / 2
+        u = cumulative[np.nan_to_num(codes).astype(int)] / counts.sum()
+        scores = np.where(np.isnan(codes), np.nan, special.ndtri(u))
+
+        levels = [_plain(v) for v in counts.index]
+        if all(isinstance(v, float) and v.is_integer() for v in levels):
+            levels = [int(v) for v in levels]
+        marginal = {"dist": "categorical", "values": levels, "p": (counts / counts.sum()).round(10).tolist()}
+        return marginal, scores
+
+    def _quantiles(self, column: str, values: pd.Series):
+        present = values.dropna()
+        if _is_datetime(values):
+            present = present.astype("datetime64[s]")
+            unit = "D" if (present == present.dt.normalize()).all() else "s"
+            per_unit = 86_400 if unit == "D" else 1
+            x = present.astype("int64").to_numpy() / per_unit
+            bounds = [np.datetime64(self.low[column], "s").astype(np.int64) / per_unit,
+                      np.datetime64(self.high[column], "s").astype(np.int64) / per_unit]
+            marginal: Dict[str, Any] = {"dist": "empirical", "unit": unit}
+        else:
+            x = present.to_numpy(dtype=float)
+            bounds = [float(self.low[column]), float(self.high[column])]
+            marginal = {"dist": "empirical"}
+            digits = _decimals(x)
+            if digits is not None:
+                marginal["round"] = digits
+
+        quantiles = np.quantile(x, np.linspace(0, 1, QUANTILE_POINTS)) if len(x) else np.array(bounds)
+        quantiles[0], quantiles[-1] = bounds
+        marginal["quantiles"] = quantiles.tolist()
+
+        ranks = values.rank(method="average").to_numpy(dtype=float)
+        return marginal, _rank_scores(ranks, len(present))
+
+    def to_spec(self, name: str, description: str = "rows") -> Dict[str, Any]:
+        """The fitted dataset spec (rows = the source's row count)."""
+        if self.sample is None:
+            raise ValueError("Nothing to fit: the source has no rows")
+        columns: Dict[str, Any] = {}
+        copula_columns: List[str] = []
+        marginals: Dict[str, Any] = {}
+        missing: Dict[str, Any] = {}
+        schema: Dict[str, str] = {}
+        scores: Dict[str, np.ndarray] = {}
+
+        for column in self.columns:
+            values = self.sample[column]
+            nullable = self.nulls[column] > 0
+            if column in self.id_start:
+                columns[column] = {"kind": "id", "start": self.id_start[column]}
+                schema[column] = "int64"
+                continue
+            copula_columns.append(column)
+            if _is_datetime(values) or (self.levels[column] is None and column in self.low):
+                marginals[column], scores[column] = self._quantiles(column, values)
+            else:
+                marginals[column], scores[column] = self._categorical(column, values)
+            if nullable:
+                missing[column] = {"prob": round(self.nulls[column] / self.rows, 8)}
+            schema[column] = _schema_dtype(marginals[column], nullable)
+
+        spec: Dict[str, Any] = {"name": name, "rows": self.rows, "description": description}
+        if copula_columns:
+            # Pairwise-complete correlation of normal scores ~ the latent Gaussian correlation
+            corr = pd.DataFrame(scores).corr().fillna(0.0).to_numpy(copy=True)
+            np.fill_diagonal(corr, 1.0)
+            spec["copula"] = {
+                "columns": copula_columns,
+                "corr": corr.round(4).tolist(),
+                "marginals": marginals,
+                "missing": missing,
+            }
+        spec["columns"] = columns
+        spec["output"] = list(self.columns)
+        spec["schema"] = schema
+        return spec
+
+
+def _schema_dtype(marginal: Dict[str, Any], nullable: bool) -> str:
+    if "unit" in marginal:
+        return "datetime64[s]"
+    if marginal["dist"] == "categorical":
+        values = marginal["values"]
+        if all(isinstance(v, bool) for v in values):
+            return "boolean" if nullable else "bool"
+        if all(isinstance(v, int) for v in values):
+            return "Int64" if nullable else "int64"
+        if all(isinstance(v, str) for v in values):
+            return "category"
+        return "float64"
+    if marginal.get("round") == 0:
+        return "Int64" if nullable else "int64"
+    return "float64"
+
+
+def fit(
+    path: Path | str,
+    name: Optional[str] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    max_levels: int = DEFAULT_MAX_LEVELS,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Fit a source file or partitioned directory in one pass; returns a dataset spec."""
+    path = Path(path)
+    profile = SourceProfile(sample_rows, max_levels, seed)
+    for chunk in iter_source(path, chunk_rows):
+        profile.update(chunk)
+    name = name or f"{dataset_name(path)}_resampled"
+    return profile.to_spec(name, f"rows resampled from {path.name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit a dataset's distributions and write a larger look-alike")
+    parser.add_argument("source", help="CSV/Parquet/Feather file or partitioned directory")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", type=float, default=1.0, help="Output rows as a multiple of the source's")
+    size.add_argument("--rows", type=int, default=None, help="Exact number of output rows")
+    parser.add_argument("--name", default=None, help="Output dataset name (default: <source>_resampled)")
+    parser.add_argument("--sample-rows", type=int, default=DEFAULT_SAMPLE_ROWS,
+                        help="Reservoir size for quantiles and correlations")
+    parser.add_argument("--max-levels", type=int, default=DEFAULT_MAX_LEVELS,
+                        help="Columns with at most this many values get exact frequency tables")
+    parser.add_argument("--spec-out", default=None, help="Also save the fitted spec as JSON")
+    parser.add_argument("--fit-only", action="store_true", help="Only fit (use with --spec-out)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None, help="Sampling seed (default: the generator's)")
+    parser.add_argument("--out-dir", default=str(Path(__file__).resolve().parent / "data" / "resampled"))
+    args = parser.parse_args()
+
+    import generate_exercise_datasets as gen
+
+    spec = fit(args.source, args.name, args.sample_rows, args.max_levels, args.chunk_rows)
+    print(f"Fitted {args.source}: {spec['rows']:,} rows, {len(spec['output'])} columns")
+    if args.spec_out:
+        spec_path = Path(args.spec_out)
+        spec_path.parent.mkdir(parents=True, exist_ok=True)
+        spec_path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+        print(f"   Spec: {spec_path}")
+    if args.fit_only:
+        return
+
+    (dataset,) = gen.register_specs([spec])
+    scale = args.rows / dataset.base_rows if args.rows else args.scale
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    seed = gen.DEFAULT_SEED if args.seed is None else args.seed
+    for _, path, rows in gen.write_datasets([dataset], out_dir, scale, args.chunk_rows, args.format,
+                                            args.workers, seed):
+        print(f"Created: {path} ({rows:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
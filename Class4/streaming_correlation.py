@@ -0,0 +1,249 @@
+"""Class 4 – Correlation matrices of tables too wide or long to load.
+
+df.corr() needs the whole frame in memory and its pairwise loop is slow for
+hundreds of columns. CoMoments accumulates the same matrix chunk by chunk:
+
+  complete chunks   one centred X'X per chunk (a single BLAS syrk)
+  chunks with NaN   pairwise-complete sums from a few GEMMs with the
+                    missing-value mask, as df.corr() treats NaN
+  merging           per-pair count, means and co-moments combined with the
+                    Chan et al. update, across chunks, parts and processes
+
+correlation_matrix() scans a dataset (CSV, Parquet, Feather, partitioned
+directory or DataSet.zip member) in parts split by
+dataset_loader.split_dataset(), one --workers process per part, and merges
+the results. method="spearman" takes a first pass that builds a
+QuantileSketch per column, then correlates each value's mid-rank read off
+the sketch (exact while a column fits in the sketch; with NaN, ranks are
+over each column's non-null values rather than each pair's). The result is
+a DataFrame shaped like df.corr(), ready for sns.heatmap() or
+draw_correlation_heatmap().
+
+Usage:
+  python Class4/streaming_correlation.py Class4/data/sf100/ecommerce_full.csv --workers 8
+  python Class4/streaming_correlation.py Class4/data/credit_risk.csv --method spearman --out corr.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import DEFAULT_CHUNK_ROWS, ScanPart, iter_part_chunks, split_dataset
+from dataset_schema import dataset_name
+from parallel import ordered_map
+from streaming_stats import DEFAULT_QUANTILE_ERROR, QuantileSketch, is_numeric_column, numeric_values, profile
+
+
+CHUNK_VALUES = 1 << 24  # at most ~128 MB of float64 per chunk, however wide the table
+METHODS = ("pearson", "spearman")
+
+RankTable = Tuple[np.ndarray, np.ndarray]  # distinct values and their mid-rank fractions
+
+
+def _divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a / b, and 0 where b is 0."""
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b > 0)
+
+
+class CoMoments:
+    """Pairwise counts, means and co-moments of a set of columns, mergeable."""
+
+    def __init__(self, columns: Sequence[str], pairwise: bool = True):
+        self.columns = list(columns)
+        self.pairwise = pairwise
+        p = len(self.columns)
+        self.n = np.zeros((p, p))    # rows where both i and j are present
+        self.mx = np.zeros((p, p))   # mean of column i over those rows
+        self.cxy = np.zeros((p, p))  # sum of (x_i - mean)(x_j - mean) over them
+        self.cxx = np.zeros((p, p))  # sum of (x_i - mean)^2 over them
+
+    def _matrix(self, values) -> np.ndarray:
+        if isinstance(values, pd.DataFrame):
+            return np.column_stack([numeric_values(values[c]) for c in self.columns])
+        return np.asarray(values, dtype=float).reshape(-1, len(self.columns))
+
+    def update(self, values) -> None:
+        """Add a chunk (a DataFrame with these columns, or an n x p array; NaN = missing)."""
+        x = self._matrix(values)
+        present = ~np.isnan(x)
+        if not self.pairwise:
+            x = x[present.all(axis=1)]
+        if not len(x):
+            return
+        p = len(self.columns)
+        if not self.pairwise or present.all():
+            mean = x.mean(axis=0)
+            d = x - mean
+            cxy = d.T @ d  # numpy hands a.T @ a to BLAS syrk
+            n = np.full((p, p), float(len(x)))
+            self._merge(n, np.repeat(mean[:, None], p, axis=1), cxy, np.repeat(np.diag(cxy)[:, None], p, axis=1))
+            return
+        # Shift by the chunk's column means, then sum over rows where both columns are present
+        m = present.astype(float)
+        n = m.T @ m
+        shift = _divide(np.where(present, x, 0.0).sum(axis=0), n.diagonal())
+        z = np.where(present, x - shift, 0.0)
+        sx = z.T @ m  # sum of x_i - shift_i over rows where j is present too
+        mean = _divide(sx, n)
+        self._merge(n, shift[:, None] + mean, z.T @ z - sx * mean.T, (z * z).T @ m - sx * mean)
+
+    def _merge(self, nb: np.ndarray, mxb: np.ndarray, cxyb: np.ndarray, cxxb: np.ndarray) -> None:
+        n = self.n + nb
+        w = _divide(self.n * nb, n)
+        dx = mxb - self.mx
+        self.cxy += cxyb + dx * dx.T * w
+        self.cxx += cxxb + dx * dx * w
+        self.mx += dx * _divide(nb, n)
+        self.n = n
+
+    def merge(self, other: "CoMoments") -> "CoMoments":
+        if other.columns != self.columns:
+            raise ValueError("cannot merge co-moments of different columns")
+        self._merge(other.n, other.mx, other.cxy, other.cxx)
+        return self
+
+    def counts(self) -> pd.DataFrame:
+        """Rows behind each correlation."""
+        return pd.DataFrame(self.n.astype(np.int64), index=self.columns, columns=self.columns)
+
+    def corr(self, min_periods: int = 1) -> pd.DataFrame:
+        """Pearson correlations, NaN where a column is constant or pairs are too few (as df.corr)."""
+        denom = np.sqrt(self.cxx * self.cxx.T)
+        valid = (denom > 0) & (self.n >= max(min_periods, 2))
+        r = np.clip(np.divide(self.cxy, denom, out=np.full(denom.shape, np.nan), where=valid), -1, 1)
+        diagonal = np.diag_indices_from(r)
+        r[diagonal] = np.where(valid[diagonal], 1.0, np.nan)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+
+# ----------------------------------------------------------------------------
+# Spearman ranks
+# ----------------------------------------------------------------------------
+
+def rank_table(sketch: QuantileSketch) -> RankTable:
+    """Each distinct retained value with its mid-rank as a fraction of the column."""
+    items, weights = sketch.values()
+    cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+    values = np.unique(items)
+    below = cumulative[np.searchsorted(items, values, side="left")]
+    upto = cumulative[np.searchsorted(items, values, side="right")]
+    return values, (below + upto) / 2 / max(sketch.n, 1)
+
+
+def ranks(table: RankTable, values) -> np.ndarray:
+    """Mid-rank fractions of `values`, interpolated between retained values; NaN stays NaN."""
+    x = numeric_values(values)
+    known, rank = table
+    if not len(known):
+        return np.full(x.shape, np.nan)
+    return np.where(np.isnan(x), np.nan, np.interp(x, known, rank))
+
+
+def _ranked(chunk: pd.DataFrame, columns: List[str], tables: Optional[Dict[str, RankTable]]) -> np.ndarray:
+    if tables is None:
+        return np.column_stack([numeric_values(chunk[c]) for c in columns])
+    return np.column_stack([ranks(tables[c], chunk[c]) for c in columns])
+
+
+# ----------------------------------------------------------------------------
+# In memory and on disk
+# ----------------------------------------------------------------------------
+
+def _chunk_rows(columns: Sequence[str], chunk_rows: int) -> int:
+    return max(1_000, min(chunk_rows, CHUNK_VALUES // max(len(columns), 1)))
+
+
+def correlation(
+    frame: pd.DataFrame, method: str = "pearson", pairwise: bool = True,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS, error: float = DEFAULT_QUANTILE_ERROR,
+) -> pd.DataFrame:
+    """frame.corr(method) over its numeric columns, computed chunk by chunk."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    columns = [c for c in frame.columns if is_numeric_column(frame[c])]
+    tables = None
+    if method == "spearman":
+        tables = {c: rank_table(QuantileSketch.of(frame[c], error)) for c in columns}
+    acc = CoMoments(columns, pairwise)
+    step = _chunk_rows(columns, chunk_rows)
+    for start in range(0, len(frame), step):
+        acc.update(_ranked(frame.iloc[start:start + step], columns, tables))
+    return acc.corr()
+
+
+def _correlate_part(job: Tuple[ScanPart, List[str], int, str, bool, Optional[Dict[str, RankTable]]]) -> CoMoments:
+    part, columns, chunk_rows, name, pairwise, tables = job
+    acc = CoMoments(columns, pairwise)
+    for chunk in iter_part_chunks(part, columns, chunk_rows, name):
+        acc.update(_ranked(chunk, columns, tables))
+    return acc
+
+
+def correlation_matrix(
+    path: Path | str, columns: Optional[List[str]] = None, method: str = "pearson", pairwise: bool = True,
+    workers: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS, name: Optional[str] = None,
+    error: float = DEFAULT_QUANTILE_ERROR,
+) -> pd.DataFrame:
+    """Correlation matrix of a dataset's numeric columns (or `columns`), in parallel chunked passes."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    name = name or dataset_name(path)
+    parts = split_dataset(path)
+    if columns is None and parts:
+        head = next(iter_part_chunks(parts[0], None, 1000, name), pd.DataFrame())
+        columns = [c for c in head.columns if is_numeric_column(head[c])]
+    columns = columns or []
+    chunk_rows = _chunk_rows(columns, chunk_rows)
+    tables = None
+    if method == "spearman":
+        sketches = profile(path, columns, workers, chunk_rows, name, partial(QuantileSketch, error=error))
+        tables = {c: rank_table(sketches.get(c, QuantileSketch(error))) for c in columns}
+    jobs = [(part, columns, chunk_rows, name, pairwise, tables) for part in parts]
+    acc = CoMoments(columns, pairwise)
+    for result in ordered_map(_correlate_part, jobs, workers):
+        acc.merge(result)
+    return acc.corr()
+
+
+def draw_correlation_heatmap(ax, corr: pd.DataFrame, triangle: bool = False, min_abs: float = 0.0, **kwargs):
+    """sns.heatmap of a correlation matrix: lower triangle only, |r| < min_abs shown as 0."""
+    import seaborn as sns
+
+    if min_abs:
+        corr = corr.where(corr.abs() >= min_abs, 0.0)
+    options = dict(annot=len(corr) <= 20, fmt=".2f", cmap="coolwarm", center=0, square=True, linewidths=1)
+    if triangle:
+        options["mask"] = np.triu(np.ones_like(corr, dtype=bool))
+    options.update(kwargs)
+    return sns.heatmap(corr, ax=ax, **options)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Correlation matrix of a dataset, in parallel chunks")
+    parser.add_argument("path", help="CSV/Parquet/Feather file, partitioned directory or zip member")
+    parser.add_argument("--columns", nargs="+", default=None)
+    parser.add_argument("--method", choices=METHODS, default="pearson")
+    parser.add_argument("--complete-rows", action="store_true",
+                        help="Use only rows with no missing values (default: pairwise-complete, as df.corr)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--error", type=float, default=DEFAULT_QUANTILE_ERROR, help="Rank error for spearman")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the matrix to this CSV")
+    args = parser.parse_args()
+
+    corr = correlation_matrix(args.path, args.columns, args.method, not args.complete_rows,
+                              args.workers, args.chunk_rows, error=args.error)
+    if args.out:
+        corr.to_csv(args.out)
+    with pd.option_context("display.width", 160, "display.max_columns", 30, "display.float_format", "{:.3f}".format):
+        print(corr.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,728 @@
+"""Class 4 – One-pass, mergeable summaries of columns too large to load.
+
+Every accumulator here is fed one chunk at a time with update() and combined
+with merge(), so a column can be summarized chunk by chunk, across the
+parts of a partitioned dataset, or on several processes whose results are
+merged at the end. The answer is the same however the data was split.
+
+  Moments         count, nulls, min, max, mean, variance, skewness, kurtosis
+  QuantileSketch  any quantile to within a rank error, e.g. box plots, IQR fences
+  Histogram       counts over fixed, log-scaled or adaptive bins
+  HyperLogLog     number of distinct values, to about 1%
+  HeavyHitters    the most frequent values and their counts (Misra-Gries)
+  CategorySketch  both, per categorical column, with a high-cardinality flag
+
+Moments keeps the mean and the central sums M2, M3, M4. Each chunk's sums
+are computed around the chunk's own mean and merged with the higher-order
+Welford/Chan update (Pébay 2008), so no power sums of raw values are ever
+formed and the result is as accurate as a two-pass computation.
+
+QuantileSketch is a KLL sketch (Karnin, Lang & Liberty 2016): a stack of
+buffers where level h holds values standing for 2**h rows each. A full
+buffer is sorted and every other value moves up a level. About 3 * 2/error
+values are kept however long the column is, and a quantile's rank stays
+within `error` * n with high probability (typically half that). Until the first
+compaction the sketch holds every value and its quantiles are exact
+(np.quantile). box_stats() and draw_boxplot() turn sketches into box plots
+through Axes.bxp(), so no box plot needs its column in memory.
+
+Histogram bins over a fixed range when one is given. Without one it is
+adaptive: the bins sit on a grid of power-of-two width that doubles
+(merging neighbouring bins in pairs) whenever a value falls outside, so the
+counts stay exact for the bins they end up in and any two histograms can be
+merged. log=True bins log10 of the values instead. draw_histogram() hands
+the counts to Axes.hist() as weights, so drawing costs O(bins) and looks
+exactly like ax.hist() on the raw column.
+
+HyperLogLog hashes each value (pandas' hash_pandas_object, the same on every
+worker) into 2**precision registers of one byte each; 16 KB per column at
+the default precision gives a ~0.8% standard error on any number of
+distinct values. HeavyHitters keeps at most k counters: whenever there are
+more, the (k+1)-th largest count is subtracted from all of them, so every
+count is low by at most n / (k + 1) and any value with a larger share is
+guaranteed to be kept. Until that first happens the counts are exact.
+
+profile() runs one accumulator per column (Moments by default, or e.g.
+partial(QuantileSketch, error=0.001)) over a whole dataset (CSV, Parquet,
+Feather, partitioned directory or DataSet.zip member), splitting it with
+dataset_loader.split_dataset() so --workers processes read disjoint parts.
+
+Usage:
+  python Class4/streaming_stats.py Class4/data/sf100/ecommerce_full.csv --workers 8
+  python Class4/streaming_stats.py Class4/data/sf100/ecommerce_full.csv --quantiles --error 0.001
+  python Class4/streaming_stats.py Class4/data/sf100/ecommerce_full.csv --categorical
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import DEFAULT_CHUNK_ROWS, ScanPart, iter_part_chunks, split_dataset
+from dataset_schema import dataset_name
+from parallel import ordered_map
+
+
+DEFAULT_QUANTILE_ERROR = 0.001
+DEFAULT_BINS = 50
+DEFAULT_PRECISION = 14  # HyperLogLog registers = 2**precision
+DEFAULT_TOP_K = 100
+MAX_LEVELS = 50         # more distinct values than this is too many to one-hot encode
+
+
+def numeric_values(values: pd.Series | np.ndarray) -> np.ndarray:
+    """Float64 copy of a column (nullable, int, float or datetime as epoch seconds); nulls -> NaN."""
+    if isinstance(values, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            seconds = values.astype("datetime64[s]").astype("int64").to_numpy(dtype=float)
+            return np.where(values.isna().to_numpy(), np.nan, seconds)
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def is_numeric_column(values: pd.Series) -> bool:
+    """Numbers, not bools (which pandas also counts as numeric)."""
+    return pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype)
+
+
+def is_categorical_column(values: pd.Series) -> bool:
+    """Text, category and bool columns."""
+    return not is_numeric_column(values) and not pd.api.types.is_datetime64_any_dtype(values.dtype)
+
+
+class Moments:
+    """Count, nulls, min, max and central moments up to the fourth, mergeable."""
+
+    __slots__ = ("n", "nulls", "mean", "m2", "m3", "m4", "low", "high")
+
+    def __init__(self):
+        self.n = self.nulls = 0
+        self.mean = self.m2 = self.m3 = self.m4 = 0.0
+        self.low, self.high = math.inf, -math.inf
+
+    @classmethod
+    def of(cls, values) -> "Moments":
+        moments = cls()
+        moments.update(values)
+        return moments
+
+    def update(self, values) -> None:
+        """Add a chunk of values (NaN/NA count as nulls)."""
+        x = numeric_values(values)
+        missing = np.isnan(x)
+        if missing.any():
+            self.nulls += int(missing.sum())
+            x = x[~missing]
+        if not len(x):
+            return
+        chunk = Moments()
+        chunk.n, chunk.mean = len(x), float(x.mean())
+        d = x - chunk.mean
+        d2 = d * d
+        chunk.m2, chunk.m3, chunk.m4 = float(d2.sum()), float(d2 @ d), float(d2 @ d2)
+        chunk.low, chunk.high = float(x.min()), float(x.max())
+        self.merge(chunk)
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Fold another accumulator into this one (returns self)."""
+        self.nulls += other.nulls
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = other.n, other.mean, other.m2, other.m3, other.m4
+            self.low, self.high = other.low, other.high
+            return self
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        d_n = delta / n
+        self.m4 += (other.m4 + delta * d_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                    + 6 * d_n ** 2 * (na * na * other.m2 + nb * nb * self.m2)
+                    + 4 * d_n * (na * other.m3 - nb * self.m3))
+        self.m3 += (other.m3 + delta * d_n ** 2 * na * nb * (na - nb)
+                    + 3 * d_n * (na * other.m2 - nb * self.m2))
+        self.m2 += other.m2 + delta * d_n * na * nb
+        self.mean += d_n * nb
+        self.n = n
+        self.low, self.high = min(self.low, other.low), max(self.high, other.high)
+        return self
+
+    def __add__(self, other: "Moments") -> "Moments":
+        return Moments().merge(self).merge(other)
+
+    @property
+    def count(self) -> int:
+        return self.n
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.n - ddof) if self.n > ddof else math.nan
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    @property
+    def skewness(self) -> float:
+        """Fisher-Pearson g1, as scipy.stats.skew (bias=True)."""
+        return math.sqrt(self.n) * self.m3 / self.m2 ** 1.5 if self.m2 > 0 else math.nan
+
+    @property
+    def kurtosis(self) -> float:
+        """Excess kurtosis g2, as scipy.stats.kurtosis (fisher=True, bias=True)."""
+        return self.n * self.m4 / self.m2 ** 2 - 3 if self.m2 > 0 else math.nan
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.n, "nulls": self.nulls,
+            "mean": self.mean if self.n else math.nan, "std": self.std(),
+            "skewness": self.skewness, "kurtosis": self.kurtosis,
+            "min": self.low if self.n else math.nan, "max": self.high if self.n else math.nan,
+        }
+
+
+class QuantileSketch:
+    """KLL quantile sketch: rank error within `error` * n, mergeable, O(1/error) memory."""
+
+    __slots__ = ("k", "n", "nulls", "low", "high", "levels", "_rng")
+
+    def __init__(self, error: float = DEFAULT_QUANTILE_ERROR, seed: int = 0):
+        if not 0 < error < 1:
+            raise ValueError(f"error must be in (0, 1), got {error}")
+        self.k = max(8, math.ceil(2 / error))
+        self.n = self.nulls = 0
+        self.low, self.high = math.inf, -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def of(cls, values, error: float = DEFAULT_QUANTILE_ERROR) -> "QuantileSketch":
+        sketch = cls(error)
+        sketch.update(values)
+        return sketch
+
+    @property
+    def exact(self) -> bool:
+        """True until the first compaction: every value is still held."""
+        return len(self.levels) == 1
+
+    def _capacity(self, level: int) -> int:
+        # Lower levels get geometrically smaller buffers (c = 2/3)
+        return max(2, int(self.k * (2 / 3) ** (len(self.levels) - 1 - level)))
+
+    def _compress(self) -> None:
+        while sum(map(len, self.levels)) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, items in enumerate(self.levels) if len(items) > self._capacity(h))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            odd = len(items) % 2
+            self.levels[level] = items[len(items) - odd:]
+            promoted = items[self._rng.integers(2):len(items) - odd:2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def update(self, values) -> None:
+        """Add a chunk of values (NaN/NA count as nulls)."""
+        x = numeric_values(values)
+        missing = np.isnan(x)
+        if missing.any():
+            self.nulls += int(missing.sum())
+            x = x[~missing]
+        if not len(x):
+            return
+        self.n += len(x)
+        self.low, self.high = min(self.low, float(x.min())), max(self.high, float(x.max()))
+        self.levels[0] = np.concatenate([self.levels[0], x])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch (with the same error) into this one (returns self)."""
+        if other.k != self.k:
+            raise ValueError(f"cannot merge sketches with different error bounds (k={self.k} vs k={other.k})")
+        self.nulls += other.nulls
+        if other.n == 0:
+            return self
+        self.levels += [np.empty(0)] * (len(other.levels) - len(self.levels))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.low, self.high = min(self.low, other.low), max(self.high, other.high)
+        self._compress()
+        return self
+
+    def __add__(self, other: "QuantileSketch") -> "QuantileSketch":
+        return QuantileSketch(2 / self.k).merge(self).merge(other)
+
+    @property
+    def count(self) -> int:
+        return self.n
+
+    def values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The retained values, sorted, and the number of rows each stands for."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        qs = np.asarray(qs, dtype=float)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], qs)
+        items, weights = self.values()
+        # First retained value whose cumulative weight reaches q * n
+        index = np.searchsorted(np.cumsum(weights), qs * self.n, side="left")
+        result = items[np.minimum(index, len(items) - 1)]
+        return np.where(qs <= 0, self.low, np.where(qs >= 1, self.high, result))
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def cdf(self, x) -> np.ndarray:
+        """Approximate fraction of values <= x."""
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)
+        items, weights = self.values()
+        return np.concatenate([[0.0], np.cumsum(weights)])[np.searchsorted(items, x, side="right")] / self.n
+
+    def iqr_fences(self, whis: float = 1.5) -> Tuple[float, float]:
+        """Tukey's fences Q1 - whis * IQR and Q3 + whis * IQR."""
+        q1, q3 = self.quantiles([0.25, 0.75])
+        return q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+
+    def summary(self) -> Dict[str, float]:
+        p1, q1, median, q3, p99 = self.quantiles([0.01, 0.25, 0.5, 0.75, 0.99])
+        low, high = self.iqr_fences()
+        return {"count": self.n, "nulls": self.nulls, "p1": p1, "q1": q1, "median": median,
+                "q3": q3, "p99": p99, "fence_low": low, "fence_high": high}
+
+
+class Histogram:
+    """Counts over fixed (range given), log10-scaled or adaptive bins, mergeable."""
+
+    __slots__ = ("bins", "log", "fixed", "span", "counts", "n", "nulls", "outside")
+
+    def __init__(self, bins: int = DEFAULT_BINS, range: Optional[Tuple[float, float]] = None, log: bool = False):
+        if bins < 1:
+            raise ValueError(f"bins must be positive, got {bins}")
+        self.bins, self.log = bins, log
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.n = self.nulls = 0
+        self.outside = 0  # out of a fixed range, or <= 0 on a log scale
+        self.fixed = range is not None
+        self.span: Optional[Tuple[float, float]] = None
+        if range is not None:
+            low, high = (math.log10(v) for v in range) if log else map(float, range)
+            if not low < high:
+                raise ValueError(f"range must be increasing, got {range}")
+            self.span = (low, high)
+
+    @classmethod
+    def of(cls, values, bins: int = DEFAULT_BINS, range: Optional[Tuple[float, float]] = None,
+           log: bool = False) -> "Histogram":
+        """Histogram of an in-memory column, over its own range like np.histogram (ax.hist)."""
+        if range is None:
+            x = numeric_values(values)
+            x = x[np.isfinite(x) & (x > 0)] if log else x[np.isfinite(x)]
+            range = (x.min(), x.max()) if len(x) else (0.0, 1.0)
+            if range[0] == range[1]:
+                range = (range[0] / 10, range[0] * 10) if log else (range[0] - 0.5, range[1] + 0.5)
+        histogram = cls(bins, range, log)
+        histogram.update(values)
+        return histogram
+
+    @property
+    def width(self) -> float:
+        return (self.span[1] - self.span[0]) / self.bins
+
+    @property
+    def edges(self) -> np.ndarray:
+        low, high = self.span or (0.0, 1.0)
+        grid = np.histogram_bin_edges([], self.bins, range=(low, high))
+        return 10 ** grid if self.log else grid
+
+    def _cover(self, low: float, high: float, width: float = 0.0) -> None:
+        """Double the adaptive bin width until [low, high] (and the bins in use) fit."""
+        if self.span is None:
+            spread = (high - low) or abs(low) or 1.0
+            step = max(2.0 ** math.ceil(math.log2(spread / self.bins)), width)
+        else:
+            step = max(self.width, width)
+            used = np.flatnonzero(self.counts)
+            if len(used):
+                low = min(low, self.span[0] + used[0] * self.width)
+                high = max(high, self.span[0] + used[-1] * self.width)
+        origin = math.floor(low / step) * step
+        while high >= origin + self.bins * step:
+            step *= 2
+            origin = math.floor(low / step) * step
+        span = (origin, origin + self.bins * step)
+        if self.span is not None and span != self.span:
+            self.counts = self._rebin(self.counts, self.span[0], self.width, origin, step)
+        self.span = span
+
+    def _rebin(self, counts: np.ndarray, origin: float, step: float, new_origin: float, new_step: float) -> np.ndarray:
+        # Both grids are power-of-two multiples, so every old bin falls inside one new bin
+        offset, ratio = round((origin - new_origin) / step), round(new_step / step)
+        index = (offset + np.arange(len(counts))) // ratio
+        keep = counts > 0
+        return np.bincount(index[keep], weights=counts[keep], minlength=self.bins).astype(np.int64)
+
+    def update(self, values) -> None:
+        """Add a chunk of values (NaN/NA count as nulls)."""
+        x = numeric_values(values)
+        missing = np.isnan(x)
+        if missing.any():
+            self.nulls += int(missing.sum())
+            x = x[~missing]
+        if self.log:
+            positive = x > 0
+            self.outside += int(len(x) - positive.sum())
+            x = np.log10(x[positive])
+        if not len(x):
+            return
+        if not self.fixed:
+            self._cover(float(x.min()), float(x.max()))
+        counts = np.histogram(x, self.bins, range=self.span)[0]
+        self.counts += counts
+        binned = int(counts.sum())
+        self.n += binned
+        self.outside += len(x) - binned
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Fold another histogram into this one (returns self); fixed bins must match."""
+        if (self.bins, self.log, self.fixed) != (other.bins, other.log, other.fixed):
+            raise ValueError("cannot merge histograms with different bins, scales or modes")
+        if self.fixed and self.span != other.span:
+            raise ValueError(f"cannot merge fixed histograms over {self.span} and {other.span}")
+        self.nulls += other.nulls
+        self.outside += other.outside
+        if other.n == 0:
+            return self
+        if self.fixed:
+            self.counts += other.counts
+        else:
+            used = np.flatnonzero(other.counts)
+            step = other.width
+            self._cover(other.span[0] + used[0] * step, other.span[0] + used[-1] * step, step)
+            self.counts += self._rebin(other.counts, other.span[0], step, self.span[0], self.width)
+        self.n += other.n
+        return self
+
+    def __add__(self, other: "Histogram") -> "Histogram":
+        empty = Histogram(self.bins, log=self.log)
+        if self.fixed:
+            empty.fixed, empty.span = True, self.span
+        return empty.merge(self).merge(other)
+
+    @property
+    def count(self) -> int:
+        return self.n
+
+    def summary(self) -> Dict[str, float]:
+        edges = self.edges
+        return {"count": self.n, "nulls": self.nulls, "outside": self.outside,
+                "bins": self.bins, "low": edges[0], "high": edges[-1]}
+
+
+def draw_histogram(ax, histogram: Histogram, **kwargs):
+    """Draw a Histogram as ax.hist() would draw the raw values (kwargs go to Axes.hist)."""
+    edges = histogram.edges
+    return ax.hist(edges[:-1], bins=edges, weights=histogram.counts, **kwargs)
+
+
+# ----------------------------------------------------------------------------
+# Categorical sketches
+# ----------------------------------------------------------------------------
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hashes of a column's non-null values, equal for equal values in any chunk."""
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    values = values.dropna()
+    if is_numeric_column(values):
+        # A CSV chunk with nulls reads ints as floats; hash 3 and 3.0 alike
+        values = pd.Series(numeric_values(values))
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Number of significant bits of each uint64."""
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >> np.uint64(shift) > 0
+        length += high * shift
+        x = np.where(high, x >> np.uint64(shift), x)
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    """Distinct-value count with a standard error of about 1.04 / sqrt(2**precision), mergeable."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values) -> None:
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # Rank = position of the first 1 bit in the remaining 64 - p bits
+        rest = hashes << p
+        rank = np.minimum(64 - _bit_length(rest) + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError(f"cannot merge precision {other.precision} into precision {self.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def __add__(self, other: "HyperLogLog") -> "HyperLogLog":
+        return HyperLogLog(self.precision).merge(self).merge(other)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(raw)
+
+    def __len__(self) -> int:
+        return int(round(self.estimate()))
+
+
+class HeavyHitters:
+    """Misra-Gries summary: the values with more than n / (k + 1) rows, counts low by at most that."""
+
+    __slots__ = ("k", "n", "nulls", "error", "counts")
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        if k < 1:
+            raise ValueError(f"k must be positive, got {k}")
+        self.k = k
+        self.n = self.nulls = 0
+        self.error = 0  # how far any count may be below the truth
+        self.counts = pd.Series(dtype="int64")
+
+    @classmethod
+    def of(cls, values, k: int = DEFAULT_TOP_K) -> "HeavyHitters":
+        heavy = cls(k)
+        heavy.update(values)
+        return heavy
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    def _add(self, counts: pd.Series) -> None:
+        counts = self.counts.add(counts, fill_value=0).astype("int64")
+        if len(counts) > self.k:
+            cut = int(counts.nlargest(self.k + 1).iloc[-1])
+            counts = counts[counts > cut] - cut
+            self.error += cut
+        self.counts = counts
+
+    def update(self, values) -> None:
+        values = values if isinstance(values, pd.Series) else pd.Series(values)
+        self.nulls += int(values.isna().sum())
+        self.n += int(values.notna().sum())
+        counts = values.value_counts(dropna=True)
+        self._add(counts[counts > 0])
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        if other.k != self.k:
+            raise ValueError(f"cannot merge k={other.k} into k={self.k}")
+        self.n += other.n
+        self.nulls += other.nulls
+        self.error += other.error
+        self._add(other.counts)
+        return self
+
+    def __add__(self, other: "HeavyHitters") -> "HeavyHitters":
+        return HeavyHitters(self.k).merge(self).merge(other)
+
+    def top(self, n: int = 10) -> pd.Series:
+        """The n most frequent values with their (lower-bound) counts, largest first."""
+        return self.counts.sort_values(ascending=False, kind="stable").head(n)
+
+
+class CategorySketch:
+    """Distinct count and most frequent values of one categorical column."""
+
+    __slots__ = ("distinct_values", "heavy")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, k: int = DEFAULT_TOP_K):
+        self.distinct_values = HyperLogLog(precision)
+        self.heavy = HeavyHitters(k)
+
+    def update(self, values) -> None:
+        values = values if isinstance(values, pd.Series) else pd.Series(values)
+        self.distinct_values.update(values)
+        self.heavy.update(values)
+
+    def merge(self, other: "CategorySketch") -> "CategorySketch":
+        self.distinct_values.merge(other.distinct_values)
+        self.heavy.merge(other.heavy)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.heavy.n
+
+    @property
+    def distinct(self) -> int:
+        # Exact when every value is still counted
+        return len(self.heavy.counts) if self.heavy.exact else len(self.distinct_values)
+
+    def top(self, n: int = 10) -> pd.Series:
+        return self.heavy.top(n)
+
+    def high_cardinality(self, max_levels: int = MAX_LEVELS) -> bool:
+        """Too many distinct values to one-hot encode (or to draw as bars)."""
+        return self.distinct > max_levels
+
+    def summary(self) -> Dict[str, Any]:
+        top = self.top(1)
+        return {"count": self.count, "nulls": self.heavy.nulls, "distinct": self.distinct,
+                "top": top.index[0] if len(top) else None,
+                "top_share": top.iloc[0] / self.count if len(top) else math.nan,
+                "high_cardinality": self.high_cardinality()}
+
+
+# ----------------------------------------------------------------------------
+# Box plots
+# ----------------------------------------------------------------------------
+
+def box_stats(sketch: QuantileSketch, whis: float = 1.5, label: Any = None) -> Dict[str, Any]:
+    """The statistics Axes.bxp() draws, as matplotlib.cbook.boxplot_stats computes them.
+
+    Whiskers end at the most extreme retained value inside the fences, and the
+    fliers are the retained values outside them plus the true min and max, so
+    a sketch of a billion rows draws at most a few thousand points.
+    """
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    low, high = sketch.iqr_fences(whis)
+    items = sketch.values()[0]
+    if sketch.n:
+        items = np.union1d(items, [sketch.low, sketch.high])
+    inside = items[(items >= low) & (items <= high)]
+    stats = {
+        "med": median, "q1": q1, "q3": q3,
+        "whislo": min(inside.min(), q1) if len(inside) else q1,
+        "whishi": max(inside.max(), q3) if len(inside) else q3,
+        "fliers": items[(items < low) | (items > high)],
+    }
+    if label is not None:
+        stats["label"] = label
+    return stats
+
+
+def draw_boxplot(ax, sketches: Sequence[QuantileSketch], labels: Optional[Sequence[Any]] = None,
+                 whis: float = 1.5, **kwargs):
+    """Box plots of sketched columns on `ax` (kwargs go to Axes.bxp)."""
+    labels = labels if labels is not None else [None] * len(sketches)
+    return ax.bxp([box_stats(sketch, whis, label) for sketch, label in zip(sketches, labels)], **kwargs)
+
+
+# ----------------------------------------------------------------------------
+# Dataset profiles
+# ----------------------------------------------------------------------------
+
+Profile = Dict[str, Any]         # column -> Moments, QuantileSketch, ...
+Accumulator = Callable[[], Any]  # a class or partial() with update() and merge()
+
+
+def merge_profiles(profiles) -> Profile:
+    merged: Profile = {}
+    for profile in profiles:
+        for column, acc in profile.items():
+            if column in merged:
+                merged[column].merge(acc)
+            else:
+                merged[column] = acc
+    return merged
+
+
+def profile_chunk(
+    chunk: pd.DataFrame, profile: Optional[Profile] = None, accumulator: Accumulator = Moments,
+    select: Callable[[pd.Series], bool] = is_numeric_column,
+) -> Profile:
+    """Update (or start) a profile with every numeric (or `select`ed) column of a chunk."""
+    profile = {} if profile is None else profile
+    for column in chunk.columns:
+        if select(chunk[column]):
+            if column not in profile:
+                profile[column] = accumulator()
+            profile[column].update(chunk[column])
+    return profile
+
+
+def _profile_part(job: Tuple[ScanPart, Optional[List[str]], int, str, Accumulator, Callable]) -> Profile:
+    part, columns, chunk_rows, name, accumulator, select = job
+    profile: Profile = {}
+    for chunk in iter_part_chunks(part, columns, chunk_rows, name):
+        profile_chunk(chunk, profile, accumulator, select)
+    return profile
+
+
+def profile(
+    path: Path | str, columns: Optional[List[str]] = None, workers: int = 1,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS, name: Optional[str] = None, accumulator: Accumulator = Moments,
+    select: Callable[[pd.Series], bool] = is_numeric_column,
+) -> Profile:
+    """One accumulator per numeric (or `select`ed, or listed) column, filled in one parallel pass."""
+    name = name or dataset_name(path)
+    parts = split_dataset(path)
+    if columns is None and parts:
+        # Parse only the selected columns, found from the first rows
+        head = next(iter_part_chunks(parts[0], None, 1000, name), pd.DataFrame())
+        columns = [c for c in head.columns if select(head[c])]
+    jobs = [(part, columns, chunk_rows, name, accumulator, select) for part in parts]
+    merged = merge_profiles(ordered_map(_profile_part, jobs, workers))
+    return {column: merged[column] for column in columns or [] if column in merged}
+
+
+def profile_frame(result: Profile) -> pd.DataFrame:
+    return pd.DataFrame({column: acc.summary() for column, acc in result.items()}).T
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="One-pass moments, quantiles or category counts of a dataset's columns")
+    parser.add_argument("path", help="CSV/Parquet/Feather file, partitioned directory or zip member")
+    parser.add_argument("--columns", nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--quantiles", action="store_true", help="Percentiles and IQR fences instead of moments")
+    parser.add_argument("--error", type=float, default=DEFAULT_QUANTILE_ERROR, help="Rank error of --quantiles")
+    parser.add_argument("--categorical", action="store_true",
+                        help="Distinct counts and top values of the text/category columns instead")
+    args = parser.parse_args()
+
+    if args.categorical:
+        result = profile(args.path, args.columns, args.workers, args.chunk_rows,
+                         accumulator=CategorySketch, select=is_categorical_column)
+    else:
+        accumulator = partial(QuantileSketch, error=args.error) if args.quantiles else Moments
+        result = profile(args.path, args.columns, args.workers, args.chunk_rows, accumulator=accumulator)
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.4f}".format):
+        print(profile_frame(result).to_string())
+    for column, acc in result.items():
+        if args.categorical and acc.high_cardinality():
+            print(f"⚠️  {column}: ~{acc.distinct:,} distinct values, too many to one-hot encode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Put Class4/ on sys.path, so tests import its modules the way its scripts do."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,79 @@
+"""HyperLogLog and Misra-Gries: merges equal one pass, estimates stay within their bounds."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import CategorySketch, HeavyHitters, HyperLogLog
+
+
+@pytest.fixture
+def zipf_values() -> pd.Series:
+    rng = np.random.default_rng(0)
+    return pd.Series(rng.zipf(1.3, 200_000) % 50_000).astype(str)
+
+
+def test_hll_merge_equals_one_pass(zipf_values):
+    one_pass = HyperLogLog()
+    one_pass.update(zipf_values)
+    merged = HyperLogLog()
+    for chunk in np.array_split(zipf_values, 9):
+        part = HyperLogLog()
+        part.update(chunk)
+        merged.merge(part)
+    np.testing.assert_array_equal(merged.registers, one_pass.registers)
+
+
+@pytest.mark.parametrize("distinct", [100, 5_000, 300_000])
+def test_hll_estimate_within_three_standard_errors(distinct):
+    hll = HyperLogLog(12)
+    values = pd.Series(np.arange(distinct)).astype(str)
+    hll.update(pd.concat([values, values.sample(frac=0.5, random_state=0)]))
+    assert hll.estimate() == pytest.approx(distinct, rel=3 * 1.04 / math.sqrt(1 << 12))
+
+
+def test_hll_hashes_ints_and_floats_alike():
+    ints, floats = HyperLogLog(), HyperLogLog()
+    ints.update(pd.Series([1, 2, 3]))
+    floats.update(pd.Series([1.0, 2.0, 3.0, np.nan]))
+    np.testing.assert_array_equal(ints.registers, floats.registers)
+
+
+def test_heavy_hitters_exact_while_values_fit():
+    values = pd.Series(list("aabbbcdddd") * 100)
+    heavy = HeavyHitters(k=4)
+    for chunk in np.array_split(values, 7):
+        heavy.merge(HeavyHitters.of(chunk, k=4))
+    assert heavy.exact
+    pd.testing.assert_series_equal(heavy.top(4), values.value_counts(), check_names=False, check_index_type=False)
+
+
+def test_heavy_hitters_bounds_one_pass_and_merged(zipf_values):
+    k = 50
+    truth = zipf_values.value_counts()
+    one_pass = HeavyHitters.of(zipf_values, k)
+    merged = HeavyHitters(k)
+    for chunk in np.array_split(zipf_values, 9):
+        merged.merge(HeavyHitters.of(chunk, k))
+    threshold = len(zipf_values) / (k + 1)
+    for heavy in (one_pass, merged):
+        assert heavy.n == len(zipf_values)
+        assert 0 < heavy.error <= threshold
+        true_counts = truth.reindex(heavy.counts.index)
+        assert (heavy.counts <= true_counts).all()
+        assert (heavy.counts >= true_counts - heavy.error).all()
+        # Every value with more than n / (k + 1) rows is kept
+        assert set(truth[truth > threshold].index) <= set(heavy.counts.index)
+    assert list(one_pass.top(3).index) == list(truth.index[:3])
+
+
+def test_category_sketch_distinct_is_exact_while_counts_are(zipf_values):
+    sketch = CategorySketch(k=10)
+    sketch.update(pd.Series(["x", "y", "y", None]))
+    assert (sketch.count, sketch.distinct, sketch.heavy.nulls) == (3, 2, 1)
+    assert not sketch.high_cardinality()
+    big = CategorySketch()
+    big.update(zipf_values)
+    assert big.high_cardinality()
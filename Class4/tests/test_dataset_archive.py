@@ -0,0 +1,64 @@
+"""Streamed zip/tar.zst members: merged CRCs and concatenated segments read back intact."""
+
+import io
+import tarfile
+import zipfile
+import zlib
+
+import numpy as np
+import pytest
+
+from dataset_archive import ArchiveOptions, DatasetArchives, crc32_combine, pack_chunk
+
+TIMESTAMP = 1_700_000_000.0
+
+
+def _chunks(seed: int, count: int):
+    rng = np.random.default_rng(seed)
+    return [b"".join(b"%d,%.3f\n" % (i, v) for i, v in enumerate(rng.normal(size=rng.integers(0, 5_000))))
+            for _ in range(count)]
+
+
+def test_crc32_combine_matches_one_pass():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        data = rng.bytes(int(rng.integers(0, 10_000)))
+        cut = int(rng.integers(0, len(data) + 1))
+        a, b = data[:cut], data[cut:]
+        assert crc32_combine(zlib.crc32(a), zlib.crc32(b), len(b)) == zlib.crc32(data)
+
+
+def test_zip_round_trip(tmp_path):
+    members = {"a.csv": _chunks(1, 5), "b.csv": _chunks(2, 1), "empty.csv": []}
+    archives = DatasetArchives(ArchiveOptions(zip_level=6), zip_path=tmp_path / "DataSet.zip")
+    for name, chunks in members.items():
+        member = archives.add_member(name)
+        for chunk in chunks:
+            member.write(pack_chunk(chunk, archives.options))
+        member.close()
+    archives.close()
+
+    with zipfile.ZipFile(tmp_path / "DataSet.zip") as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == list(members)
+        for name, chunks in members.items():
+            assert zf.read(name) == b"".join(chunks)
+
+
+def test_tar_zst_round_trip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    members = {"a.csv": _chunks(3, 4), "b.csv": _chunks(4, 2)}
+    options = ArchiveOptions(zstd_level=3)
+    archives = DatasetArchives(options, tar_path=tmp_path / "DataSet.tar.zst")
+    for name, chunks in members.items():
+        member = archives.add_member(name)
+        for chunk in chunks:
+            member.write(pack_chunk(chunk, options))
+        member.close()
+    archives.close()
+
+    raw = zstandard.ZstdDecompressor().decompressobj(read_across_frames=True)
+    with tarfile.open(fileobj=io.BytesIO(raw.decompress((tmp_path / "DataSet.tar.zst").read_bytes()))) as tar:
+        assert tar.getnames() == list(members)
+        for name, chunks in members.items():
+            assert tar.extractfile(name).read() == b"".join(chunks)
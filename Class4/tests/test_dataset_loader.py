@@ -0,0 +1,42 @@
+"""load_dataset: the Parquet cache and a plain CSV read accept the same filters and agree."""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dataset_loader import load_dataset
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory) -> Path:
+    # A copy, so the cache is built in a scratch directory
+    root = tmp_path_factory.mktemp("data")
+    shutil.copy(DATA_DIR / "ecommerce_full.csv", root)
+    return root
+
+
+@pytest.mark.parametrize("filters", [
+    [("date", "=", "2023-06-01")],
+    [("date", "in", ["2023-06-01", "2023-07-04"])],
+    [("date", ">=", "2023-06-01")],
+    [("date", ">=", "2023-06-01"), ("date", "<", pd.Timestamp("2023-07-01"))],
+    [("region", "in", ["North", "East"]), ("quantity", ">", 4)],
+])
+def test_cached_and_uncached_agree(data_dir, filters):
+    columns = ["date", "region", "quantity", "order_value"]
+    cached = load_dataset("ecommerce_full", columns, filters, data_dir=data_dir)
+    plain = load_dataset("ecommerce_full", columns, filters, data_dir=data_dir, cache=False)
+    assert len(cached) > 0
+    pd.testing.assert_frame_equal(cached.reset_index(drop=True), plain.reset_index(drop=True))
+
+
+def test_string_and_timestamp_targets_agree(data_dir):
+    text = load_dataset("ecommerce_full", ["date"], [("date", ">=", "2023-06-01")], data_dir=data_dir)
+    stamp = load_dataset("ecommerce_full", ["date"], [("date", ">=", pd.Timestamp("2023-06-01"))],
+                         data_dir=data_dir)
+    pd.testing.assert_frame_equal(text, stamp)
+    assert (text["date"] >= pd.Timestamp("2023-06-01")).all()
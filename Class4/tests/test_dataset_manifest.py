@@ -0,0 +1,100 @@
+"""Manifest: what counts as current, and which datasets a regeneration changed."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from dataset_manifest import changed_datasets, is_current, load_manifest, make_entry, spec_hash
+
+GENERATOR = Path(__file__).resolve().parents[1] / "generate_exercise_datasets.py"
+KEY = spec_hash({"name": "toy"}, seed=42)
+
+
+def toy_spec(name: str, loc: float) -> dict:
+    return {"name": name, "rows": 50, "description": "toy rows",
+            "columns": {"id": {"kind": "id"}, "x": {"dist": "normal", "loc": loc, "scale": 1, "round": 3}}}
+
+
+def generate(out_dir: Path, specs) -> str:
+    """Run the generator on spec files named <dataset>.json, for those datasets only."""
+    command = [sys.executable, str(GENERATOR), "--out-dir", str(out_dir), "--workers", "1",
+               "--spec", *map(str, specs), "--datasets", *(spec.stem for spec in specs)]
+    return subprocess.run(command, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def entry(tmp_path):
+    path = tmp_path / "toy.csv"
+    path.write_text("id,x\n1,0.5\n", encoding="utf-8")
+    return make_entry(tmp_path, path, KEY, 1, 0.0, seed=42)
+
+
+def test_untouched_output_is_current(entry, tmp_path):
+    assert is_current(entry, KEY, tmp_path)
+
+
+def test_spec_or_parameter_change_is_not_current(entry, tmp_path):
+    assert not is_current(entry, spec_hash({"name": "toy"}, seed=43), tmp_path)
+    assert not is_current(None, KEY, tmp_path)
+
+
+def test_size_change_is_not_current(entry, tmp_path):
+    with open(tmp_path / "toy.csv", "a", encoding="utf-8") as fh:
+        fh.write("2,1.5\n")
+    assert not is_current(entry, KEY, tmp_path)
+
+
+def test_mtime_change_is_not_current(entry, tmp_path):
+    path = tmp_path / "toy.csv"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert path.stat().st_size == entry["bytes"]
+    assert not is_current(entry, KEY, tmp_path)
+    # Entries from before mtimes were recorded fall back to the size check
+    assert is_current({k: v for k, v in entry.items() if k != "mtime_ns"}, KEY, tmp_path)
+
+
+def test_missing_output_is_not_current(entry, tmp_path):
+    (tmp_path / "toy.csv").unlink()
+    assert not is_current(entry, KEY, tmp_path)
+
+
+def test_changed_datasets_lists_new_and_changed():
+    before = {"a": {"checksum": "sha256:1"}, "b": {"checksum": "sha256:2"}}
+    after = {"a": {"checksum": "sha256:1"}, "b": {"checksum": "sha256:3"}, "c": {"checksum": "sha256:4"}}
+    assert changed_datasets(before, after) == ["b", "c"]
+    assert changed_datasets(after, after) == []
+
+
+def test_spec_edit_regenerates_only_that_dataset(tmp_path):
+    specs = [tmp_path / "toy_a.json", tmp_path / "toy_b.json"]
+    specs[0].write_text(json.dumps(toy_spec("toy_a", 0)), encoding="utf-8")
+    specs[1].write_text(json.dumps(toy_spec("toy_b", 0)), encoding="utf-8")
+    out_dir = tmp_path / "out"
+    generate(out_dir, specs)
+    before = load_manifest(out_dir)
+
+    specs[1].write_text(json.dumps(toy_spec("toy_b", 10)), encoding="utf-8")
+    stdout = generate(out_dir, specs)
+    after = load_manifest(out_dir)
+
+    assert "Up to date: toy_a.csv" in stdout
+    assert after["toy_a"] == before["toy_a"]
+    assert after["toy_b"]["spec_hash"] != before["toy_b"]["spec_hash"]
+    assert changed_datasets(before, after) == ["toy_b"]
+
+
+def test_touched_output_is_regenerated(tmp_path):
+    spec = tmp_path / "toy_a.json"
+    spec.write_text(json.dumps(toy_spec("toy_a", 0)), encoding="utf-8")
+    out_dir = tmp_path / "out"
+    generate(out_dir, [spec])
+    path = out_dir / "toy_a.csv"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert "Up to date" not in generate(out_dir, [spec])
+    assert load_manifest(out_dir)["toy_a"]["mtime_ns"] == path.stat().st_mtime_ns
@@ -0,0 +1,76 @@
+"""Star schema: keys resolve across tables and order totals add up from their lines."""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_exercise_datasets as gen
+from dataset_schema import read_typed
+from ecommerce_star import StarSizes, check_integrity, orders_chunk, scatter_ids, write_star
+
+SCALE = 0.1
+CHUNK_ROWS = 700  # several chunks per table
+
+
+@pytest.fixture(scope="module")
+def written(tmp_path_factory):
+    return write_star(tmp_path_factory.mktemp("star"), SCALE, CHUNK_ROWS)
+
+
+@pytest.fixture(scope="module")
+def tables(written):
+    return {name: read_typed(path) for name, (path, _) in written.items()}
+
+
+def test_row_counts(written, tables):
+    sizes = StarSizes.at_scale(SCALE)
+    assert written["customers"][1] == len(tables["customers"]) == sizes.customers
+    assert written["products"][1] == len(tables["products"]) == sizes.products
+    assert written["orders"][1] == len(tables["orders"]) == sizes.orders
+    assert written["order_items"][1] == len(tables["order_items"]) == tables["orders"]["n_items"].sum()
+
+
+def test_keys_resolve(written, tables):
+    assert check_integrity(written) == []
+    assert tables["orders"]["customer_id"].isin(tables["customers"]["customer_id"]).all()
+    assert tables["order_items"]["product_id"].isin(tables["products"]["product_id"]).all()
+    assert tables["order_items"]["order_id"].isin(tables["orders"]["order_id"]).all()
+
+
+def test_broken_foreign_key_is_reported(written, tmp_path):
+    copied = {name: (shutil.copy(path, tmp_path), rows) for name, (path, rows) in written.items()}
+    orders = pd.read_csv(copied["orders"][0])
+    orders.loc[3, "customer_id"] = StarSizes.at_scale(SCALE).customers + 1
+    orders.to_csv(copied["orders"][0], index=False)
+    assert check_integrity(copied) == ["orders.customer_id not in customers"]
+
+
+def test_order_totals_equal_sum_of_lines(tables):
+    items = tables["order_items"]
+    lines = items.groupby("order_id").agg(total=("line_total", "sum"), lines=("line_number", "count"))
+    orders = tables["orders"].set_index("order_id").loc[lines.index]
+    np.testing.assert_allclose(orders["order_total"], lines["total"], atol=0.005)
+    np.testing.assert_array_equal(orders["n_items"], lines["lines"])
+    np.testing.assert_allclose(items["line_total"], items["unit_price"] * items["quantity"], atol=0.005)
+
+
+def test_line_prices_match_products(tables):
+    prices = tables["products"].set_index("product_id")["list_price"]
+    items = tables["order_items"]
+    np.testing.assert_allclose(items["unit_price"], prices.loc[items["product_id"]].to_numpy(), rtol=1e-6)
+
+
+def test_orders_chunks_are_independent():
+    sizes = StarSizes.at_scale(SCALE)
+    orders, items = orders_chunk(gen.DEFAULT_SEED, sizes, 0, 300)
+    parts = [orders_chunk(gen.DEFAULT_SEED, sizes, start, stop) for start, stop in [(0, 120), (120, 300)]]
+    pd.testing.assert_frame_equal(orders, pd.concat([o for o, _ in parts], ignore_index=True))
+    pd.testing.assert_frame_equal(items, pd.concat([i for _, i in parts], ignore_index=True))
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 500, 5_000, 4_096])
+def test_scatter_ids_is_a_bijection(n):
+    ids = scatter_ids(np.arange(1, n + 1), n)
+    np.testing.assert_array_equal(np.sort(ids), np.arange(1, n + 1))
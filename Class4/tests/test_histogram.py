@@ -0,0 +1,68 @@
+"""Histogram: matches np.histogram, and chunked updates or merges equal one pass."""
+
+import numpy as np
+import pytest
+
+from streaming_stats import Histogram
+
+
+@pytest.fixture
+def values() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.normal(0, 1, 20_000), rng.normal(30, 1, 200)])
+    rng.shuffle(x)
+    return x
+
+
+def _adaptive(chunks, bins: int = 50) -> Histogram:
+    histogram = Histogram(bins)
+    for chunk in chunks:
+        histogram.update(chunk)
+    return histogram
+
+
+def test_of_matches_numpy(values):
+    counts, edges = np.histogram(values, bins=30)
+    histogram = Histogram.of(values, bins=30)
+    np.testing.assert_array_equal(histogram.counts, counts)
+    np.testing.assert_allclose(histogram.edges, edges)
+
+
+def test_fixed_range_merge_equals_one_pass(values):
+    one_pass = Histogram(40, range=(-3, 3))
+    one_pass.update(values)
+    merged = Histogram(40, range=(-3, 3))
+    for chunk in np.array_split(values, 11):
+        part = Histogram(40, range=(-3, 3))
+        part.update(chunk)
+        merged.merge(part)
+    np.testing.assert_array_equal(merged.counts, one_pass.counts)
+    np.testing.assert_array_equal(one_pass.counts, np.histogram(values, 40, range=(-3, 3))[0])
+    assert merged.outside == one_pass.outside == np.sum((values < -3) | (values > 3))
+
+
+def test_adaptive_chunks_and_merges_equal_one_pass(values):
+    one_pass = _adaptive([values])
+    chunks = np.array_split(values, 13)
+    streamed = _adaptive(chunks)
+    merged = Histogram(50)
+    for chunk in chunks:
+        merged.merge(_adaptive([chunk]))
+    for histogram in (streamed, merged):
+        assert histogram.span == one_pass.span
+        np.testing.assert_array_equal(histogram.counts, one_pass.counts)
+    assert one_pass.count == len(values)
+    # Adaptive bins are numpy's bins over the final power-of-two grid
+    np.testing.assert_array_equal(one_pass.counts, np.histogram(values, 50, range=one_pass.span)[0])
+
+
+def test_log_scale_counts_non_positive_as_outside():
+    values = np.array([-1.0, 0.0, 1.0, 10.0, 100.0, np.nan])
+    histogram = Histogram.of(values, bins=2, log=True)
+    assert (histogram.count, histogram.outside, histogram.nulls) == (3, 2, 1)
+    np.testing.assert_allclose(histogram.edges, [1, 10, 100])
+
+
+def test_merge_rejects_different_fixed_ranges():
+    with pytest.raises(ValueError):
+        Histogram(10, range=(0, 1)).merge(Histogram(10, range=(0, 2)))
@@ -0,0 +1,54 @@
+"""Moments: chunked merges equal a one-pass result, and both match numpy/scipy."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from streaming_stats import Moments
+
+
+@pytest.fixture
+def values() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.concatenate([rng.lognormal(3, 1, 50_000), rng.normal(-40, 5, 7_000)])
+
+
+def _assert_same(a: Moments, b: Moments) -> None:
+    assert (a.n, a.nulls, a.low, a.high) == (b.n, b.nulls, b.low, b.high)
+    for name in ("mean", "m2", "m3", "m4"):
+        assert getattr(a, name) == pytest.approx(getattr(b, name), rel=1e-10)
+
+
+def test_matches_numpy_and_scipy(values):
+    m = Moments.of(values)
+    assert m.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert m.variance() == pytest.approx(values.var(ddof=1), rel=1e-12)
+    assert m.std(ddof=0) == pytest.approx(values.std(), rel=1e-12)
+    assert m.skewness == pytest.approx(stats.skew(values), rel=1e-10)
+    assert m.kurtosis == pytest.approx(stats.kurtosis(values), rel=1e-10)
+    assert (m.low, m.high) == (values.min(), values.max())
+
+
+def test_merged_chunks_equal_one_pass(values):
+    one_pass = Moments.of(values)
+    rng = np.random.default_rng(1)
+    cuts = np.sort(rng.integers(0, len(values), 12))
+    merged = Moments()
+    for chunk in np.split(values, cuts):  # includes empty chunks
+        merged.merge(Moments.of(chunk))
+    _assert_same(merged, one_pass)
+    _assert_same(Moments.of(values[:100]) + Moments.of(values[100:]), one_pass)
+
+
+def test_nulls_are_counted_not_averaged(values):
+    with_nan = values.copy()
+    with_nan[::10] = np.nan
+    m = Moments.of(with_nan)
+    assert m.nulls == len(values[::10])
+    assert m.mean == pytest.approx(np.nanmean(with_nan), rel=1e-12)
+
+
+def test_empty():
+    m = Moments.of(np.array([np.nan]))
+    assert (m.count, m.nulls) == (0, 1)
+    assert np.isnan(m.variance()) and np.isnan(m.skewness)
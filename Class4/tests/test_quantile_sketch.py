@@ -0,0 +1,57 @@
+"""KLL QuantileSketch: exact while small, within its rank error once compacted, merged or not."""
+
+import numpy as np
+import pytest
+from matplotlib import cbook
+
+from streaming_stats import QuantileSketch, box_stats
+
+QS = np.linspace(0, 1, 201)
+
+
+def _rank_error(sorted_values: np.ndarray, sketch: QuantileSketch) -> float:
+    """Largest distance between q and the rank range of the value returned for q."""
+    found = sketch.quantiles(QS)
+    below = np.searchsorted(sorted_values, found, side="left") / len(sorted_values)
+    upto = np.searchsorted(sorted_values, found, side="right") / len(sorted_values)
+    return float(np.maximum(below - QS, QS - upto).clip(0).max())
+
+
+def test_exact_until_first_compaction():
+    values = np.random.default_rng(0).normal(size=150)
+    merged = QuantileSketch(0.01)
+    for chunk in np.array_split(values, 7):
+        merged.merge(QuantileSketch.of(chunk, 0.01))
+    one_pass = QuantileSketch.of(values, 0.01)
+    assert one_pass.exact and merged.exact
+    np.testing.assert_array_equal(merged.quantiles(QS), np.quantile(values, QS))
+    np.testing.assert_array_equal(one_pass.quantiles(QS), np.quantile(values, QS))
+
+
+@pytest.mark.parametrize("error", [0.01, 0.001])
+def test_rank_error_one_pass_and_merged(error):
+    values = np.random.default_rng(1).lognormal(0, 1, 300_000)
+    sorted_values = np.sort(values)
+    one_pass = QuantileSketch.of(values, error)
+    merged = QuantileSketch(error)
+    for chunk in np.array_split(values, 37):
+        merged.merge(QuantileSketch.of(chunk, error))
+    for sketch in (one_pass, merged):
+        assert not sketch.exact
+        assert sketch.count == len(values)
+        assert (sketch.low, sketch.high) == (values.min(), values.max())
+        assert _rank_error(sorted_values, sketch) <= error
+
+
+def test_box_stats_match_matplotlib_when_exact():
+    values = np.concatenate([np.random.default_rng(2).normal(50, 10, 300), [120.0, -30.0]])
+    ours = box_stats(QuantileSketch.of(values))
+    theirs = cbook.boxplot_stats(values)[0]
+    for key in ("med", "q1", "q3", "whislo", "whishi"):
+        assert ours[key] == pytest.approx(theirs[key])
+    np.testing.assert_array_equal(np.sort(ours["fliers"]), np.sort(theirs["fliers"]))
+
+
+def test_merge_rejects_other_error_bound():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.001))
@@ -0,0 +1,38 @@
+"""Philox random access: any row slice equals the same rows of a full run."""
+
+import pandas as pd
+import pytest
+
+import generate_exercise_datasets as gen
+
+DATASET = "ecommerce_full"
+BLOCK = gen.PHILOX_BLOCK_ROWS
+N_ROWS = BLOCK + 1_000
+
+
+@pytest.fixture(scope="module")
+def full_run() -> pd.DataFrame:
+    return gen.generate_rows(DATASET, 0, N_ROWS, N_ROWS)
+
+
+@pytest.mark.parametrize("start, stop", [
+    (0, 10),
+    (BLOCK - 5, BLOCK + 5),         # across a block boundary
+    (0, BLOCK),                     # exactly one block
+    (1_000, N_ROWS),                # partial first block through the short last one
+])
+def test_slice_matches_full_run(full_run, start, stop):
+    rows = gen.generate_rows(DATASET, start, stop, N_ROWS)
+    pd.testing.assert_frame_equal(rows, full_run.iloc[start:stop].reset_index(drop=True))
+
+
+def test_chunked_row_range_matches_full_run(full_run):
+    tasks = gen.plan_chunks(gen.DATASETS_BY_NAME[DATASET], N_ROWS, BLOCK, rng="philox",
+                            row_range=(7, N_ROWS))
+    rows = pd.concat(map(gen.generate_chunk, tasks), ignore_index=True)
+    pd.testing.assert_frame_equal(rows, full_run.iloc[7:].reset_index(drop=True))
+
+
+def test_slice_outside_dataset_is_rejected():
+    with pytest.raises(ValueError):
+        gen.generate_rows(DATASET, 10, N_ROWS + 1, N_ROWS)
@@ -0,0 +1,82 @@
+"""CoMoments: chunked and merged correlations match df.corr(), with and without NaN."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_correlation import CoMoments, correlation, correlation_matrix
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 20_000
+    x = rng.normal(size=n)
+    return pd.DataFrame({
+        "x": x,
+        "y": 2 * x + rng.normal(size=n),
+        "z": np.exp(x) + rng.normal(scale=3, size=n),
+        "w": rng.integers(0, 10, n),
+        "label": rng.choice(["a", "b"], n),
+    })
+
+
+@pytest.fixture
+def with_nan(frame) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    df = frame.copy()
+    for column, rate in (("x", 0.1), ("y", 0.3), ("z", 0.05)):
+        df.loc[rng.random(len(df)) < rate, column] = np.nan
+    return df
+
+
+def test_pearson_matches_pandas(frame):
+    expected = frame.corr(numeric_only=True)
+    pd.testing.assert_frame_equal(correlation(frame, chunk_rows=1_000), expected, atol=1e-12, rtol=0)
+
+
+def test_pairwise_nan_matches_pandas(with_nan):
+    expected = with_nan.corr(numeric_only=True)
+    pd.testing.assert_frame_equal(correlation(with_nan, chunk_rows=1_000), expected, atol=1e-12, rtol=0)
+
+
+def test_complete_rows_matches_dropna(with_nan):
+    numeric = with_nan.drop(columns="label")
+    expected = numeric.dropna().corr()
+    pd.testing.assert_frame_equal(correlation(with_nan, pairwise=False, chunk_rows=1_000), expected,
+                                  atol=1e-12, rtol=0)
+
+
+def test_merge_equals_one_pass(with_nan):
+    columns = ["x", "y", "z", "w"]
+    one_pass = CoMoments(columns)
+    one_pass.update(with_nan[columns])
+    merged = CoMoments(columns)
+    for chunk in np.array_split(with_nan[columns], 7):
+        part = CoMoments(columns)
+        part.update(chunk)
+        merged.merge(part)
+    pd.testing.assert_frame_equal(merged.counts(), one_pass.counts())
+    for name in ("mx", "cxy", "cxx"):
+        np.testing.assert_allclose(getattr(merged, name), getattr(one_pass, name), rtol=1e-10, atol=1e-8)
+    pd.testing.assert_frame_equal(merged.corr(), one_pass.corr(), atol=1e-12, rtol=0)
+
+
+def test_spearman_matches_pandas(frame):
+    expected = frame.corr(method="spearman", numeric_only=True)
+    pd.testing.assert_frame_equal(correlation(frame, method="spearman"), expected, atol=5e-4, rtol=0)
+
+
+def test_constant_column_and_min_periods_are_nan_like_pandas():
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0, np.nan], "b": [5.0, 5.0, 5.0, 5.0], "c": [np.nan, np.nan, 1.0, 2.0]})
+    acc = CoMoments(list(df.columns))
+    acc.update(df)
+    pd.testing.assert_frame_equal(acc.corr(), df.corr())
+    pd.testing.assert_frame_equal(acc.corr(min_periods=3), df.corr(min_periods=3))
+
+
+def test_correlation_matrix_reads_a_csv(tmp_path, with_nan):
+    path = tmp_path / "sample.csv"
+    with_nan.to_csv(path, index=False)
+    expected = with_nan.corr(numeric_only=True)
+    pd.testing.assert_frame_equal(correlation_matrix(path, chunk_rows=3_000), expected, atol=1e-12, rtol=0)
@@ -0,0 +1,78 @@
+"""TransactionStream: rows, event-time rate, wall-clock pacing and the async iterator."""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_exercise_datasets as gen
+from transaction_stream import DATASET, TransactionStream
+
+START = np.datetime64("2024-01-01T00:00:00", "ns")
+
+
+def fast_stream(**kwargs) -> TransactionStream:
+    return TransactionStream(**{"rate": 10_000, "start": START, "realtime": False, **kwargs})
+
+
+async def collect(stream: TransactionStream, limit: int):
+    return [batch async for batch in stream.abatches(limit)]
+
+
+def test_schema_matches_file_with_timestamp():
+    batch = fast_stream().make_batch(0)
+    rows = gen.DATASETS_BY_NAME[DATASET].make_chunk(np.random.default_rng(0), 0, 5, 5)
+    columns = list(rows.columns)
+    columns.remove("date")
+    columns.insert(1, "timestamp")
+    assert list(batch.columns) == columns
+    assert batch["timestamp"].dtype == "datetime64[ns]"
+    assert batch["transaction_id"].dtype == np.int64
+
+
+def test_batch_size_and_ids():
+    stream = fast_stream()
+    assert stream.batch_rows == 1_000  # rate / 10
+    batches = list(stream.batches(limit=3))
+    assert [len(b) for b in batches] == [1_000] * 3
+    ids = pd.concat(batches)["transaction_id"].to_numpy()
+    np.testing.assert_array_equal(ids, np.arange(1, 3_001))
+
+
+def test_event_time_follows_rate():
+    stream = fast_stream(rate=2_000, batch_rows=500)
+    interval = np.timedelta64(250, "ms")  # 500 rows at 2,000/s
+    for k, batch in enumerate(stream.batches(limit=4)):
+        stamps = batch["timestamp"].to_numpy()
+        assert (np.diff(stamps) >= np.timedelta64(0)).all()
+        assert START + k * interval <= stamps[0] and stamps[-1] < START + (k + 1) * interval
+
+
+def test_realtime_batches_hold_the_rate():
+    stream = TransactionStream(rate=2_000, batch_rows=200, start=START)  # one batch per 0.1s
+    began = time.monotonic()
+    assert len(list(stream.batches(limit=5))) == 5
+    assert time.monotonic() - began >= 0.45
+
+
+def test_abatches_yields_the_same_rows():
+    expected = list(fast_stream().batches(limit=4))
+    for got in (asyncio.run(collect(fast_stream(), 4)),
+                asyncio.run(collect(fast_stream(realtime=True), 4))):
+        assert len(got) == len(expected)
+        for a, b in zip(got, expected):
+            pd.testing.assert_frame_equal(a, b)
+
+
+def test_batches_are_reproducible_per_seed():
+    a = fast_stream(seed=7).make_batch(5)
+    pd.testing.assert_frame_equal(a, fast_stream(seed=7).make_batch(5))
+    assert not a["amount"].equals(fast_stream(seed=8).make_batch(5)["amount"])
+
+
+@pytest.mark.parametrize("rate", [0, -5])
+def test_rate_must_be_positive(rate):
+    with pytest.raises(ValueError):
+        TransactionStream(rate=rate)
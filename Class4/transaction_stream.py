@@ -0,0 +1,154 @@
+"""Class 4 – Unbounded, rate-limited stream of customer_transactions batches.
+
+Drives live-updating charts and incremental aggregation code without a
+message broker. Rows come from the customer_transactions spec (lognormal
+amounts, the same category and customer_type mix), with the date column
+replaced by an event timestamp. Each batch covers batch_rows / rate seconds
+of event time, and its rows are spread over that interval in order.
+
+The stream is both a plain generator and an asyncio async iterator:
+
+  stream = TransactionStream(rate=100_000)
+  for batch in stream.batches(limit=50):           # blocks to hold the rate
+      ...
+  async for batch in TransactionStream(rate=100_000):   # awaits instead
+      ...
+
+realtime=False emits as fast as batches can be built (event timestamps
+still advance at the nominal rate), e.g. to benchmark consumers. Batch k
+always has the same rows for a given seed, so runs are reproducible.
+
+Usage:
+  python Class4/transaction_stream.py --rate 100000 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+import generate_exercise_datasets as gen
+from dataset_spec import compile_spec
+from parallel import chunk_seed
+
+
+DATASET = "customer_transactions"
+
+
+class TransactionStream:
+    """Endless customer_transactions batches at `rate` events per second."""
+
+    def __init__(
+        self,
+        rate: float = 100_000,
+        batch_rows: Optional[int] = None,
+        seed: int = gen.DEFAULT_SEED,
+        start: Optional[np.datetime64] = None,
+        realtime: bool = True,
+    ):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        # Default: 10 batches per second of event time
+        self.batch_rows = batch_rows or max(1, int(rate // 10))
+        self.seed = seed
+        self.start = np.datetime64(start if start is not None else "now", "ns")
+        self.realtime = realtime
+        self.interval = self.batch_rows / rate
+        # An endless stream outgrows the file schema's uint32 ids (4.3B events)
+        spec = gen.DATASETS_BY_NAME[DATASET].spec
+        self.make_chunk = compile_spec({**spec, "schema": {**spec["schema"], "transaction_id": "int64"}})
+
+    def make_batch(self, index: int) -> pd.DataFrame:
+        """Batch `index` (0-based): rows index*batch_rows .. (index+1)*batch_rows - 1."""
+        first = index * self.batch_rows
+        rng = np.random.default_rng(chunk_seed(self.seed, gen.DATASET_INDEX[DATASET], index))
+        batch = self.make_chunk(rng, first, first + self.batch_rows, first + self.batch_rows)
+        # Event times: sorted uniform offsets within this batch's slice of the timeline
+        offsets = np.sort(rng.random(self.batch_rows))
+        seconds = (first + offsets * self.batch_rows) / self.rate
+        batch = batch.drop(columns="date")
+        batch.insert(1, "timestamp", self.start + (seconds * 1e9).astype("timedelta64[ns]"))
+        return batch
+
+    def _due(self, index: int, started: float) -> float:
+        """Seconds until batch `index` may be emitted."""
+        return started + (index + 1) * self.interval - time.monotonic()
+
+    def batches(self, limit: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Yield batches, sleeping as needed to hold the rate (unless realtime=False)."""
+        started = time.monotonic()
+        index = 0
+        while limit is None or index < limit:
+            batch = self.make_batch(index)
+            if self.realtime:
+                delay = self._due(index, started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield batch
+            index += 1
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return self.batches()
+
+    async def abatches(self, limit: Optional[int] = None) -> AsyncIterator[pd.DataFrame]:
+        """Async version of batches(): awaits instead of blocking the event loop."""
+        started = time.monotonic()
+        index = 0
+        while limit is None or index < limit:
+            batch = self.make_batch(index)
+            delay = self._due(index, started) if self.realtime else 0
+            # Yield to the loop even when behind schedule, so consumers can run
+            await asyncio.sleep(max(delay, 0))
+            yield batch
+            index += 1
+
+    def __aiter__(self) -> AsyncIterator[pd.DataFrame]:
+        return self.abatches()
+
+
+async def _consume(stream: TransactionStream, limit: int) -> pd.Series:
+    totals = pd.Series(dtype=float)
+    async for batch in stream.abatches(limit):
+        totals = totals.add(batch.groupby("category", observed=True)["amount"].sum(), fill_value=0)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream customer_transactions batches at a fixed rate")
+    parser.add_argument("--rate", type=float, default=100_000, help="Events per second (default: 100,000)")
+    parser.add_argument("--batch-rows", type=int, default=None, help="Rows per batch (default: rate / 10)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="How much event time to stream")
+    parser.add_argument("--max-speed", action="store_true", help="Do not sleep; measure the generator's ceiling")
+    parser.add_argument("--use-async", action="store_true", help="Consume through the asyncio iterator")
+    parser.add_argument("--seed", type=int, default=gen.DEFAULT_SEED)
+    args = parser.parse_args()
+
+    stream = TransactionStream(args.rate, args.batch_rows, args.seed, realtime=not args.max_speed)
+    limit = max(1, int(round(args.seconds / stream.interval)))
+    print(f"Streaming {limit} batches of {stream.batch_rows:,} transactions "
+          f"({'as fast as possible' if args.max_speed else f'{args.rate:,.0f}/s'})...")
+
+    began = time.perf_counter()
+    if args.use_async:
+        totals = asyncio.run(_consume(stream, limit))
+    else:
+        totals = pd.Series(dtype=float)
+        for batch in stream.batches(limit):
+            totals = totals.add(batch.groupby("category", observed=True)["amount"].sum(), fill_value=0)
+    elapsed = time.perf_counter() - began
+
+    events = limit * stream.batch_rows
+    print(f"   ✓ {events:,} events in {elapsed:.2f}s ({events / elapsed:,.0f} events/s)")
+    print("   Running amount totals by category:")
+    for category, total in totals.sort_index().items():
+        print(f"     {category:<12} {total:>16,.2f}")
+
+
+if __name__ == "__main__":
+    main()